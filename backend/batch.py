@@ -0,0 +1,53 @@
+"""
+Batch get by id for cross-references.
+
+`Victim.testimonies`, `Testimony.victim_id` and `Document.victim_id` point at
+other records; a detail screen resolves all of them with one `$in` query
+instead of one request per id. Results come back in request order, and ids
+that don't exist are listed in `missing`.
+
+Victims use string ids while testimonies and documents get ObjectIds, so
+each requested id is matched both as given and as an ObjectId.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+BATCH_MAX_IDS = 200
+
+
+def parse_ids(ids: Iterable[str]) -> List[str]:
+    """Requested ids without blanks or duplicates, in request order"""
+    seen = set()
+    unique = []
+    for value in ids:
+        value = value.strip()
+        if value and value not in seen:
+            seen.add(value)
+            unique.append(value)
+    if not unique:
+        raise HTTPException(status_code=400, detail="No ids given")
+    if len(unique) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    return unique
+
+
+def _candidates(ids: List[str]) -> list:
+    values = list(ids)
+    for value in ids:
+        try:
+            values.append(ObjectId(value))
+        except (InvalidId, TypeError):
+            pass
+    return values
+
+
+async def fetch_by_ids(collection, ids: List[str], projection: Optional[dict] = None) -> Tuple[List[dict], List[str]]:
+    """(documents in the order of `ids`, ids that weren't found)"""
+    docs = await collection.find({'_id': {'$in': _candidates(ids)}}, projection).to_list(length=None)
+    by_id = {str(doc['_id']): doc for doc in docs}
+    found = [by_id[value] for value in ids if value in by_id]
+    missing = [value for value in ids if value not in by_id]
+    return found, missing
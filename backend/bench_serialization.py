@@ -0,0 +1,122 @@
+"""
+Microbenchmark: per-row cost of the list response serialization paths.
+
+Compares the previous path (build the Pydantic model per row, then let
+FastAPI validate and serialize the response_model again and encode it with
+the stdlib json module) against the fast path in serialization.py.
+
+    python bench_serialization.py [--rounds 5]
+"""
+import argparse
+import asyncio
+import copy
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models import Prison, Victim, Document, Page
+from serialization import encode_page
+
+SIZES = [100, 10000]
+
+
+def make_prison(i: int) -> dict:
+    return {
+        '_id': f'prison_{i}',
+        'name': f'Penitenciarul {i}',
+        'type': 'prison',
+        'coordinates': {'latitude': 45.0 + i % 100 / 100, 'longitude': 24.0 + i % 50 / 50},
+        'location': {'type': 'Point', 'coordinates': [24.0, 45.0]},
+        'description': 'Închisoare politică din perioada comunistă. ' * 5,
+        'history_timeline': [
+            {'date': '1948-1964', 'title': 'Perioada neagră', 'description': 'Deținuți politici încarcerați.'},
+        ],
+        'operational_years': [1948, 1964],
+        'estimated_victims': 1000 + i,
+        'visit_info': {'address': 'Str. Libertății nr. 1', 'schedule': 'Luni-Vineri'},
+        'images': [],
+        'qr_codes': [],
+        'audio_tour_tracks': [],
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow(),
+    }
+
+
+def make_victim(i: int) -> dict:
+    return {
+        '_id': f'victim_{i}',
+        'prison_id': 'gherla',
+        'name': f'Ion Popescu {i}',
+        'birth_year': 1900 + i % 50,
+        'death_year': 1950 + i % 30,
+        'profession': 'Profesor',
+        'biography': 'A fost arestat pentru activitate anticomunistă și închis la Gherla. ' * 10,
+        'testimonies': [],
+        'imprisonment_period': {'start': '1948', 'end': '1964'},
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow(),
+    }
+
+
+def make_document(i: int) -> dict:
+    return {
+        '_id': ObjectId(),
+        'title': f'Sentința nr. {i}',
+        'document_type': 'sentence',
+        'scan_url': f'https://example.org/scans/{i}.pdf',
+        'transcription': 'Tribunalul Militar condamnă pe inculpat la muncă silnică. ' * 20,
+        'prison_id': 'gherla',
+        'year': 1950 + i % 14,
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow(),
+    }
+
+
+def current_path(model, field, docs):
+    # The handler built one model per row (with the _id fix-up) ...
+    items = []
+    for doc in docs:
+        doc['_id'] = str(doc['_id'])
+        items.append(model(**doc))
+    page = Page[model](items=items, next_cursor=None)
+    # ... then FastAPI validated and serialized it against response_model
+    content = asyncio.run(serialize_response(field=field, response_content=page))
+    return JSONResponse(content).body
+
+
+def fast_path(model, field, docs):
+    return encode_page(model, docs, None)
+
+
+def bench(fn, model, field, docs, rounds: int) -> float:
+    """Best per-row time in microseconds over `rounds` runs"""
+    best = float('inf')
+    for _ in range(rounds):
+        batch = [copy.copy(doc) for doc in docs]
+        start = time.perf_counter()
+        fn(model, field, batch)
+        best = min(best, time.perf_counter() - start)
+    return best / len(docs) * 1e6
+
+
+def main(rounds: int):
+    cases = [(Prison, make_prison), (Victim, make_victim), (Document, make_document)]
+    print(f"{'model':<10}{'rows':>8}{'current µs/row':>18}{'fast µs/row':>14}{'speedup':>10}")
+    for model, make in cases:
+        field = create_response_field(name='response', type_=Page[model])
+        for size in SIZES:
+            docs = [make(i) for i in range(size)]
+            current = bench(current_path, model, field, docs, rounds)
+            fast = bench(fast_path, model, field, docs, rounds)
+            print(f"{model.__name__:<10}{size:>8}{current:>18.2f}{fast:>14.2f}{current / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare list serialization paths")
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    main(args.rounds)
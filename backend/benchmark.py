@@ -0,0 +1,317 @@
+"""
+Endpoint load test and latency benchmark for the Memorial Gherla API.
+
+Boots the FastAPI app in-process against a local mongod (--mongo-url) or an
+in-memory mongomock stand-in, seeds it to the requested size, then drives
+every route with concurrent async clients and writes throughput and
+p50/p95/p99 latency per endpoint to a JSON results file.
+
+    python benchmark.py --victims 100000 --requests 500 --concurrency 32
+    python benchmark.py --mongo-url mongodb://localhost:27017 --output after.json --compare before.json
+
+The in-memory stand-in doesn't implement $geoNear, $text or projection
+expressions. Against it the geo and search routes are skipped, and the list
+routes whose default summary projection computes excerpts or flags are
+measured with `fields=all`. Use a real mongod for complete numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from seed_data import generate_dataset
+from timeline import rebuild_timeline, with_date_range
+
+ROOT_DIR = Path(__file__).parent
+
+MEDIA_NAME = 'benchmark/track.mp3'
+MEDIA_SIZE = 4 * 1024 * 1024
+BATCH_IDS = 20
+
+PRISON_TYPES = ['memorial', 'prison', 'camp']
+DOCUMENT_TYPES = ['sentence', 'letter', 'securitate_file', 'photograph', 'other']
+EVENT_CATEGORIES = ['political', 'resistance', 'repression', 'commemoration']
+WORDS = (
+    'închisoare deținut politic securitate anchetă condamnare muncă silnică '
+    'reeducare celulă regim comunist rezistență memorie libertate proces '
+    'tortură supraviețuitor mărturie familie preot student țăran'
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+async def seed(db, media_store, args, rng: random.Random) -> dict:
+    """Fill the benchmark database and media store; returns ids the request factories sample from"""
+    await generate_dataset(
+        db,
+        prisons=args.prisons,
+        victims=args.victims,
+        testimonies_per_victim=args.testimonies_per_victim,
+        documents_per_victim=args.documents_per_victim,
+        seed=args.seed,
+    )
+
+    now = datetime.utcnow()
+    await db.historical_events.delete_many({})
+    await db.app_events.delete_many({})
+    await db.historical_events.insert_many([with_date_range({
+        'date': f'{rng.randint(1945, 1989)}-{rng.randint(1, 12):02d}-01', 'title': _text(rng, 5),
+        'description': _text(rng, 60), 'related_prisons': [], 'category': rng.choice(EVENT_CATEGORIES),
+        'images': [], 'created_at': now, 'updated_at': now,
+    }) for _ in range(200)])
+    await rebuild_timeline(db)
+    await db.app_events.insert_many([{
+        'title': _text(rng, 5), 'description': _text(rng, 30), 'date': now + timedelta(days=rng.randint(-180, 365)),
+        'location': 'București', 'type': 'commemoration', 'created_at': now, 'updated_at': now,
+    } for _ in range(50)])
+
+    with tempfile.NamedTemporaryFile(suffix='.mp3') as source:
+        source.write(rng.randbytes(MEDIA_SIZE))
+        source.flush()
+        await media_store.put(MEDIA_NAME, Path(source.name))
+
+    return {
+        'prison_ids': await db.prisons.distinct('_id'),
+        'victims': args.victims,
+        'testimony_ids': [str(t['_id']) async for t in db.testimonies.find({}, {'_id': 1}).limit(5000)],
+        'document_ids': [str(d['_id']) async for d in db.documents.find({}, {'_id': 1}).limit(5000)],
+        'qr_codes': await db.qr_locations.distinct('qr_code'),
+        'sites': [p['coordinates'] async for p in db.prisons.find({}, {'coordinates': 1})],
+    }
+
+
+def endpoints(ids: dict, rng: random.Random, writes: bool, in_memory: bool):
+    """(name, method, path factory, kwargs factory) for every route"""
+    prison = lambda: rng.choice(ids['prison_ids'])
+    victim = lambda: f"victim_{rng.randrange(ids['victims']):08d}"
+    victim_ids = lambda: [victim() for _ in range(BATCH_IDS)]
+    # Summary projections need expressions the in-memory stand-in lacks
+    list_fields = {'fields': 'all'} if in_memory else {}
+
+    def media_range():
+        start = rng.randrange(MEDIA_SIZE - 65536)
+        return {'headers': {'Range': f'bytes={start}-{start + 65535}'}}
+
+    site = lambda: rng.choice(ids['sites'])
+    counter = iter(range(10 ** 9))
+    specs = [
+        ('root', 'GET', lambda: '/api/', dict),
+        ('health', 'GET', lambda: '/api/health', dict),
+        ('health_live', 'GET', lambda: '/api/health/live', dict),
+        ('health_ready', 'GET', lambda: '/api/health/ready', dict),
+        ('prisons', 'GET', lambda: '/api/prisons', lambda: {'params': {'type': rng.choice(PRISON_TYPES)}}),
+        ('prisons_all_fields', 'GET', lambda: '/api/prisons', lambda: {'params': {'fields': 'all'}}),
+        ('prisons_near', 'GET', lambda: '/api/prisons/near',
+         lambda: {'params': {'lat': rng.uniform(44, 48), 'lng': rng.uniform(21, 29), 'radius': 100000}}),
+        ('prisons_within', 'GET', lambda: '/api/prisons/within', lambda: {'params': {'bbox': '22,45,26,47'}}),
+        ('prison', 'GET', lambda: f'/api/prisons/{prison()}', dict),
+        ('prison_full', 'GET', lambda: f'/api/prisons/{prison()}/full', dict),
+        ('victims', 'GET', lambda: '/api/victims', lambda: {'params': {'prison_id': prison(), **list_fields}}),
+        ('victim', 'GET', lambda: f'/api/victims/{victim()}', dict),
+        ('victims_batch', 'GET', lambda: '/api/victims/batch', lambda: {'params': {'ids': ','.join(victim_ids())}}),
+        ('victims_batch_post', 'POST', lambda: '/api/victims/batch', lambda: {'json': {'ids': victim_ids()}}),
+        ('testimonies_batch', 'GET', lambda: '/api/testimonies/batch',
+         lambda: {'params': {'ids': ','.join(rng.sample(ids['testimony_ids'], BATCH_IDS))}}),
+        ('documents_batch_post', 'POST', lambda: '/api/documents/batch',
+         lambda: {'json': {'ids': rng.sample(ids['document_ids'], BATCH_IDS)}}),
+        ('testimonies', 'GET', lambda: '/api/testimonies', lambda: {'params': {'victim_id': victim(), 'fields': 'all'}}),
+        ('documents', 'GET', lambda: '/api/documents',
+         lambda: {'params': {'type': rng.choice(DOCUMENT_TYPES), 'year_from': rng.randint(1945, 1985), **list_fields}}),
+        ('historical_timeline', 'GET', lambda: '/api/historical-timeline',
+         lambda: {'params': {'category': rng.choice(EVENT_CATEGORIES)}}),
+        ('timeline', 'GET', lambda: '/api/timeline',
+         lambda: {'params': {'year_from': rng.randint(1945, 1980), 'year_to': rng.randint(1981, 1989)}}),
+        ('events', 'GET', lambda: '/api/events', lambda: {'params': {'upcoming': True}}),
+        ('search', 'GET', lambda: '/api/search', lambda: {'params': {'q': rng.choice(WORDS)}}),
+        ('sync', 'GET', lambda: '/api/sync', lambda: {'params': {'since': datetime.utcnow().isoformat()}}),
+        ('export', 'GET', lambda: '/api/export/historical_events', dict),
+        ('media', 'GET', lambda: f'/api/media/{MEDIA_NAME}', dict),
+        ('media_range', 'GET', lambda: f'/api/media/{MEDIA_NAME}', media_range),
+        ('qr_scan', 'POST', lambda: '/api/qr/scan', lambda: {'json': {'qr_code': rng.choice(ids['qr_codes'])}}),
+        ('qr_scan_batch', 'POST', lambda: '/api/qr/scan/batch',
+         lambda: {'json': {'qr_codes': rng.sample(ids['qr_codes'], 20)}}),
+        ('qr_prison', 'GET', lambda: f'/api/qr/prisons/{prison()}', dict),
+        ('tour_locate', 'GET', lambda: '/api/tours/locate', lambda: (lambda s: {'params': {
+            'lat': s['latitude'] + rng.uniform(-0.0015, 0.0015), 'lng': s['longitude'] + rng.uniform(-0.002, 0.002),
+            'heading': rng.uniform(0, 359), 'radius': 50}})(site())),
+        ('cache_stats', 'GET', lambda: '/api/cache/stats', dict),
+        ('metrics', 'GET', lambda: '/api/metrics', dict),
+    ]
+    if in_memory:
+        unsupported = {'prisons_near', 'prisons_within', 'search'}
+        specs = [spec for spec in specs if spec[0] not in unsupported]
+    if writes:
+        specs += [
+            ('create_victim', 'POST', lambda: '/api/victims', lambda: {'json': {
+                'prison_id': prison(), 'name': f'Bench Victim {next(counter)}', 'profession': 'inginer',
+                'biography': _text(rng, 100), 'imprisonment_period': {'start': '1950'}}}),
+            ('create_testimony', 'POST', lambda: '/api/testimonies', lambda: {'json': {
+                'victim_id': victim(), 'text': _text(rng, 200), 'source': 'bench', 'year': 2000, 'type': 'written'}}),
+            ('create_documents_bulk', 'POST', lambda: '/api/documents/bulk', lambda: {'json': [{
+                'title': _text(rng, 4), 'document_type': 'letter', 'scan_url': 'https://example.org/x.pdf',
+                'year': 1950} for _ in range(100)]}),
+        ]
+    return specs
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+async def drive(client, method, path, kwargs, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = {}
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path(), **kwargs())
+                await response.aread()
+                status = str(response.status_code)
+                if response.status_code >= 500:
+                    errors += 1
+            except Exception as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'statuses': statuses,
+        'throughput_rps': round(requests / elapsed, 1),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+
+def compare(results: dict, baseline_path: str):
+    baseline = json.loads(Path(baseline_path).read_text())['endpoints']
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'endpoint':<24}{'p95 before':>12}{'p95 after':>12}{'Δ p95':>9}{'rps Δ':>9}")
+    for name, after in results['endpoints'].items():
+        before = baseline.get(name)
+        if not before or not before['p95_ms'] or not before['throughput_rps']:
+            continue
+        delta_p95 = (after['p95_ms'] / before['p95_ms'] - 1) * 100
+        delta_rps = (after['throughput_rps'] / before['throughput_rps'] - 1) * 100
+        flag = '  ⚠️' if delta_p95 > 20 else ''
+        print(f"{name:<24}{before['p95_ms']:>12.2f}{after['p95_ms']:>12.2f}{delta_p95:>8.0f}%{delta_rps:>8.0f}%{flag}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+async def main(args):
+    os.environ['DB_NAME'] = args.db_name
+    if args.no_cache:
+        os.environ['CACHE_MAX_ENTRIES'] = '0'
+    media_root = None
+    if os.environ.get('MEDIA_BACKEND', 'local') == 'local':
+        # Keep the benchmark's media file out of the real media directory
+        media_root = tempfile.TemporaryDirectory()
+        os.environ['MEDIA_ROOT'] = media_root.name
+    if args.mongo_url:
+        os.environ['MONGO_URL'] = args.mongo_url
+    else:
+        # Point the app at an in-memory stand-in before it creates its client
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+        os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+    import httpx
+    import server
+
+    rng = random.Random(args.seed)
+    lifespan = server.app.router.lifespan_context(server.app)
+    await lifespan.__aenter__()
+    print("🌱 Seeding benchmark database...")
+    ids = await seed(server.db, server.media_store, args, rng)
+    await server.qr_table.load(server.db)
+    await server.track_index.load(server.db)
+    server.response_cache.clear()
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'revision': git_revision(),
+            'backend': args.mongo_url or 'mongomock',
+            'sizes': {'prisons': args.prisons, 'victims': args.victims,
+                      'testimonies_per_victim': args.testimonies_per_victim,
+                      'documents_per_victim': args.documents_per_victim},
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'cache': not args.no_cache,
+        },
+        'endpoints': {},
+    }
+
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+            for name, method, path, kwargs in endpoints(ids, rng, not args.read_only, not args.mongo_url):
+                if args.only and name not in args.only:
+                    continue
+                stats = await drive(client, method, path, kwargs, args.requests, args.concurrency)
+                results['endpoints'][name] = stats
+                print(f"{name:<24}{stats['throughput_rps']:>9.0f} rps  p50 {stats['p50_ms']:>8.2f}  "
+                      f"p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}")
+    finally:
+        await lifespan.__aexit__(None, None, None)
+        if media_root is not None:
+            media_root.cleanup()
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"✅ Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every API route under concurrency")
+    parser.add_argument('--mongo-url', help="local mongod to run against (default: in-memory stand-in)")
+    parser.add_argument('--db-name', default='memorial_benchmark')
+    parser.add_argument('--prisons', type=int, default=24)
+    parser.add_argument('--victims', type=int, default=5000)
+    parser.add_argument('--testimonies-per-victim', type=float, default=2.0)
+    parser.add_argument('--documents-per-victim', type=float, default=1.5)
+    parser.add_argument('--requests', type=int, default=500, help="requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-cache', action='store_true', help="disable the response cache")
+    parser.add_argument('--read-only', action='store_true', help="skip the write endpoints")
+    parser.add_argument('--only', nargs='*', help="endpoint names to run")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="previous results file to diff against")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
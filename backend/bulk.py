@@ -0,0 +1,96 @@
+"""
+Bulk inserts for digitization batches.
+
+Items are validated one by one so a bad row only fails itself, then the valid
+ones go to Mongo as unordered insert_many calls in fixed-size chunks, a few
+chunks in flight at a time. Write errors (e.g. duplicate ids) are mapped back
+to the position of the item in the request.
+"""
+import asyncio
+from datetime import datetime
+from typing import Callable, List, Type
+
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+
+from models import DocumentCreate, TestimonyCreate, VictimCreate
+
+BULK_MAX_ITEMS = 10000
+BULK_CHUNK_SIZE = 1000
+BULK_CONCURRENCY = 4
+
+
+# Stored documents for new records, shared by the API and importer.py
+def new_victim_doc(victim: VictimCreate) -> dict:
+    victim_dict = victim.model_dump()
+    victim_dict['_id'] = victim_dict['name'].lower().replace(' ', '_')
+    victim_dict['created_at'] = datetime.utcnow()
+    victim_dict['updated_at'] = datetime.utcnow()
+    victim_dict['testimonies'] = []
+    return victim_dict
+
+
+def new_testimony_doc(testimony: TestimonyCreate) -> dict:
+    testimony_dict = testimony.model_dump()
+    testimony_dict['created_at'] = datetime.utcnow()
+    testimony_dict['updated_at'] = datetime.utcnow()
+    return testimony_dict
+
+
+def new_document_doc(document: DocumentCreate) -> dict:
+    document_dict = document.model_dump()
+    document_dict['created_at'] = datetime.utcnow()
+    document_dict['updated_at'] = datetime.utcnow()
+    return document_dict
+
+
+def validation_message(error: ValidationError) -> str:
+    """One-line summary of a ValidationError, e.g. `year: Input should be a valid integer`"""
+    return '; '.join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def _insert_chunk(collection, docs: List[dict], semaphore: asyncio.Semaphore) -> dict:
+    """Insert one chunk; return {chunk offset: error message} for failed docs"""
+    async with semaphore:
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            return {err['index']: err['errmsg'] for err in e.details.get('writeErrors', [])}
+    return {}
+
+
+async def bulk_insert(
+    collection,
+    items: List[dict],
+    model: Type[BaseModel],
+    build_doc: Callable[[BaseModel], dict],
+    chunk_size: int = BULK_CHUNK_SIZE,
+    concurrency: int = BULK_CONCURRENCY,
+) -> dict:
+    """Validate and insert `items`; results are reported per item, in order"""
+    results = [None] * len(items)
+    docs = []
+    positions = []
+    for index, item in enumerate(items):
+        try:
+            docs.append(build_doc(model.model_validate(item)))
+            positions.append(index)
+        except ValidationError as e:
+            results[index] = {'index': index, 'ok': False, 'error': validation_message(e)}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    chunks = [(start, docs[start:start + chunk_size]) for start in range(0, len(docs), chunk_size)]
+    chunk_errors = await asyncio.gather(*(_insert_chunk(collection, chunk, semaphore) for _, chunk in chunks))
+
+    for (start, chunk), errors in zip(chunks, chunk_errors):
+        for offset, doc in enumerate(chunk):
+            index = positions[start + offset]
+            if offset in errors:
+                results[index] = {'index': index, 'ok': False, 'error': errors[offset]}
+            else:
+                results[index] = {'index': index, 'ok': True, 'id': str(doc['_id'])}
+
+    inserted = sum(1 for result in results if result['ok'])
+    return {'inserted': inserted, 'failed': len(results) - inserted, 'results': results}
@@ -0,0 +1,216 @@
+"""
+In-process LRU + TTL cache for read endpoints.
+
+Cached handlers are keyed on route name plus their normalized parameters and
+store the already-encoded JSON body, so a hit skips both Mongo and Pydantic.
+Entries are tagged with the collections they were read from and dropped when
+a write route invalidates one of them.
+
+Every cached body carries a strong ETag (a hash of the body, so all workers
+agree on it) and conditional GETs with a matching If-None-Match get a 304
+without the body being rebuilt or sent.
+
+Bodies are served brotli or gzip compressed when the client accepts it;
+each compressed variant is built once and kept on the entry next to the raw
+body, with its own ETag.
+
+Misses go through a single-flight layer: identical requests that miss at
+the same time share one handler call and one encoded body.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+import anyio
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from compression import MIN_SIZE, compress, negotiate, variant_etag
+from singleflight import SingleFlight
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    collections: Tuple[str, ...]
+    expires_at: float
+    # Compressed bodies by content encoding, built on first request
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    async def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        body = self.variants.get(encoding)
+        if body is None:
+            # Compressed once per entry at the best level, off the event loop
+            body = await anyio.to_thread.run_sync(compress, self.body, encoding, True)
+            self.variants[encoding] = body
+        return body
+
+
+def encode_body(result) -> bytes:
+    """Encode a handler result the same way FastAPI would"""
+    if isinstance(result, bytes):
+        # Already encoded by the handler (see serialization.py)
+        return bytes(result)
+    if isinstance(result, BaseModel):
+        return result.model_dump_json(by_alias=True).encode('utf-8')
+    return json.dumps(jsonable_encoder(result), ensure_ascii=False).encode('utf-8')
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def make_key(route: str, params: dict) -> tuple:
+    """Normalize route parameters into a hashable cache key"""
+    return (route, tuple(sorted((k, v) for k, v in params.items() if v is not None)))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, max_age: int = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_control = f"public, max-age={max_age}"
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.not_modified = 0
+        # Bumped on every invalidation, so a call that overlapped a write isn't cached
+        self._generations = {}
+        self.flight = SingleFlight()
+
+    def get(self, key: tuple) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: tuple, body: bytes, collections: Tuple[str, ...]) -> CacheEntry:
+        entry = CacheEntry(
+            body=body,
+            etag=make_etag(body),
+            collections=collections,
+            expires_at=time.monotonic() + self.ttl
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, collection: str):
+        """Drop every entry read from `collection`"""
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        self.flight.forget(collection)
+        stale = [key for key, entry in self._entries.items() if collection in entry.collections]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "not_modified": self.not_modified,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "single_flight": self.flight.stats(),
+        }
+
+    async def _fill(self, key: tuple, func, kwargs: dict, collections: Tuple[str, ...]):
+        """Run the handler and cache its encoded body; a Response passes through"""
+        generations = [self._generations.get(c, 0) for c in collections]
+        result = await func(**kwargs)
+        if isinstance(result, Response):
+            # Handlers return a Response for results that must not be cached
+            return result
+        body = encode_body(result)
+        if generations != [self._generations.get(c, 0) for c in collections]:
+            # Invalidated while the handler ran; serve it but don't keep it
+            return CacheEntry(body=body, etag=make_etag(body), collections=collections, expires_at=0)
+        return self.set(key, body, collections)
+
+    def cached(self, *collections: str, normalize: Optional[Callable[[dict], dict]] = None):
+        """Decorate a read handler so its encoded response is served from cache
+
+        `normalize` rewrites the parameters before both the key and the handler
+        see them, so requests that should share an entry actually do.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(http_request: Request, **kwargs):
+                if normalize is not None:
+                    kwargs = normalize(kwargs)
+                key = make_key(func.__name__, kwargs)
+                entry = self.get(key)
+                if entry is None:
+                    entry = await self.flight.do(
+                        key, lambda: self._fill(key, func, kwargs, collections), collections, func.__name__
+                    )
+                    if isinstance(entry, Response):
+                        return entry
+                encoding = None
+                if len(entry.body) >= MIN_SIZE:
+                    encoding = negotiate(http_request.headers.get('accept-encoding'))
+                etag = variant_etag(entry.etag, encoding)
+                headers = {'ETag': etag, 'Cache-Control': self.cache_control, 'Vary': 'Accept-Encoding'}
+                if etag_matches(http_request.headers.get('if-none-match'), etag):
+                    self.not_modified += 1
+                    return Response(status_code=304, headers=headers)
+                if encoding:
+                    headers['Content-Encoding'] = encoding
+                body = await entry.encoded(encoding)
+                return Response(content=body, media_type='application/json', headers=headers)
+
+            # Expose the handler's own parameters plus the request to FastAPI
+            signature = inspect.signature(func)
+            request_param = inspect.Parameter(
+                'http_request', inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            )
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), request_param]
+            )
+            return wrapper
+        return decorator
@@ -0,0 +1,136 @@
+"""
+Accept-Encoding negotiation with brotli and gzip.
+
+Our JSON is mostly long Romanian prose and shrinks several-fold. Cached
+responses are compressed once per encoding and the compressed variant is kept
+on the cache entry (see cache.py), so hot responses are never recompressed.
+Everything else that isn't already encoded or streamed goes through
+`CompressionMiddleware`, which compresses on the fly at a cheaper level, in
+a worker thread for large bodies (e.g. sync bundles) so the event loop keeps
+serving other requests meanwhile.
+
+brotli is optional; without it only gzip is offered.
+"""
+import gzip
+from typing import Optional
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional speedup
+    brotli = None
+
+# Bodies smaller than this aren't worth the CPU or the header overhead
+MIN_SIZE = 1024
+
+# Bodies at least this large are compressed off the event loop
+THREAD_MIN_SIZE = 64 * 1024
+
+# Preferred first when the client weighs them equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+# Media that is already compressed or binary
+_SKIP_TYPES = ('audio/', 'video/', 'image/', 'application/gzip', 'application/zip', 'application/octet-stream', 'application/pdf')
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding we offer for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """`best` spends more CPU for bodies that are compressed once and cached"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9 if best else 6)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETags must differ between encodings of the same body"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+class CompressionMiddleware:
+    """Compresses single-message responses that aren't encoded already"""
+
+    def __init__(self, app, min_size: int = MIN_SIZE, thread_min_size: int = THREAD_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+        self.thread_min_size = thread_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get('headers') or [])
+        encoding = negotiate(headers.get(b'accept-encoding', b'').decode('latin-1'))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                # Hold the headers until we know whether the body gets compressed
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            if message['type'] != 'http.response.body':
+                await send(response_start)
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            response_headers = [(k, v) for k, v in response_start['headers']]
+            names = {k.lower() for k, _ in response_headers}
+            content_type = next((v for k, v in response_headers if k.lower() == b'content-type'), b'').decode('latin-1')
+            if (
+                message.get('more_body')
+                or b'content-encoding' in names
+                or len(body) < self.min_size
+                or content_type.startswith(_SKIP_TYPES)
+            ):
+                await send(response_start)
+                await send(message)
+                return
+
+            if len(body) >= self.thread_min_size:
+                body = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            response_headers = [(k, v) for k, v in response_headers if k.lower() not in (b'content-length', b'etag')]
+            response_headers += [
+                (b'content-encoding', encoding.encode()),
+                (b'content-length', str(len(body)).encode()),
+            ]
+            if b'vary' not in names:
+                response_headers.append((b'vary', b'Accept-Encoding'))
+            await send({**response_start, 'headers': response_headers})
+            await send({**message, 'body': body})
+
+        await self.app(scope, receive, send_wrapper)
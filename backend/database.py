@@ -0,0 +1,90 @@
+"""
+Mongo client lifecycle.
+
+The client is created inside the app lifespan rather than at import time, with
+its pool sized from the environment so it can be matched to the number of
+workers:
+
+    MONGO_MAX_POOL_SIZE                 (default 100)
+    MONGO_MIN_POOL_SIZE                 (default 10)
+    MONGO_MAX_IDLE_TIME_MS              (default: never)
+    MONGO_CONNECT_TIMEOUT_MS            (default 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS   (default 5000)
+    MONGO_SOCKET_TIMEOUT_MS             (default: none)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS         (default: none)
+    MONGO_READ_PREFERENCE               (default primary)
+
+`warm_up` opens the minimum pool up front so the first requests after a
+deploy don't pay for connection setup.
+
+`run_migrations` applies one-off data migrations at startup and records each
+in the `migrations` collection, so later starts skip them.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from metrics import mongo_listeners
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCES = {'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'}
+
+
+def _int_env(name: str, default=None):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def client_options() -> dict:
+    """Pool and timeout settings for the Mongo client, read from the environment"""
+    read_preference = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+    if read_preference not in READ_PREFERENCES:
+        raise ValueError(f"Invalid MONGO_READ_PREFERENCE: {read_preference}")
+
+    options = {
+        'maxPoolSize': _int_env('MONGO_MAX_POOL_SIZE', 100),
+        'minPoolSize': _int_env('MONGO_MIN_POOL_SIZE', 10),
+        'maxIdleTimeMS': _int_env('MONGO_MAX_IDLE_TIME_MS'),
+        'connectTimeoutMS': _int_env('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        'serverSelectionTimeoutMS': _int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        'socketTimeoutMS': _int_env('MONGO_SOCKET_TIMEOUT_MS'),
+        'waitQueueTimeoutMS': _int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        'readPreference': read_preference,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def create_client(mongo_url: str) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners(), **client_options())
+
+
+async def warm_up(db, connections: int):
+    """Open `connections` pooled connections by pinging on all of them at once"""
+    connections = max(connections, 1)
+    await asyncio.gather(*(db.command('ping') for _ in range(connections)))
+    logger.info(f"Opened {connections} Mongo connections")
+
+
+async def ping(db, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(db.command('ping'), timeout)
+        return True
+    except Exception as e:
+        logger.error(f"Database ping failed: {e}")
+        return False
+
+
+async def run_migrations(db, migrations: Iterable[Tuple[str, Callable[..., Awaitable]]]):
+    """Run each named migration that hasn't completed against this database yet"""
+    done = {doc['_id'] async for doc in db.migrations.find({}, {'_id': 1})}
+    for name, migrate in migrations:
+        if name in done:
+            continue
+        await migrate(db)
+        await db.migrations.insert_one({'_id': name, 'completed_at': datetime.utcnow()})
+        logger.info(f"Applied migration {name}")
@@ -0,0 +1,102 @@
+"""
+Upcoming app events, served from memory.
+
+Event dates are stored as real datetimes (naive UTC) with an index on
+(`date`, `_id`). The home screen only ever asks for the next page of upcoming
+commemorations, so that page is precomputed: `UpcomingEvents` keeps the
+encoded response for the events after now, and a background task rebuilds
+it periodically so past events drop off. Writes reload it immediately.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from models import AppEvent
+from pagination import SORT_KEYS, encode_cursor
+from serialization import dumps, fast_dump
+from sync import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# The largest page the events route serves
+UPCOMING_WINDOW = 100
+
+
+def parse_event_date(value) -> Optional[datetime]:
+    """Stored event date as a naive UTC datetime, or None if it can't be read"""
+    if isinstance(value, datetime):
+        return to_naive_utc(value)
+    try:
+        return to_naive_utc(datetime.fromisoformat(str(value).strip()))
+    except ValueError:
+        return None
+
+
+async def migrate_event_dates(db):
+    """Convert event dates stored as ISO strings into datetimes"""
+    migrated = 0
+    async for event in db.app_events.find({'date': {'$type': 'string'}}, {'date': 1}):
+        date = parse_event_date(event['date'])
+        if date is None:
+            logger.warning(f"Can't parse date {event['date']!r} of event {event['_id']}")
+            continue
+        await db.app_events.update_one(
+            {'_id': event['_id']}, {'$set': {'date': date, 'updated_at': datetime.utcnow()}}
+        )
+        migrated += 1
+    if migrated:
+        logger.info(f"Migrated {migrated} event dates to datetimes")
+
+
+class UpcomingEvents:
+    def __init__(self, window: int = UPCOMING_WINDOW):
+        self.window = window
+        self._items: List[dict] = []
+        self._next_cursor: Optional[str] = None
+        self._body = dumps({'items': [], 'next_cursor': None})
+
+    def __len__(self):
+        return len(self._items)
+
+    async def load(self, db):
+        """Rebuild the window from the next upcoming events"""
+        docs = await (
+            db.app_events.find({'date': {'$gte': datetime.utcnow()}})
+            .sort([(key, 1) for key in SORT_KEYS['app_events']])
+            .limit(self.window + 1)
+            .to_list(length=self.window + 1)
+        )
+        next_cursor = None
+        if len(docs) > self.window:
+            docs = docs[:self.window]
+            next_cursor = encode_cursor(docs[-1], SORT_KEYS['app_events'])
+        items = [fast_dump(AppEvent, doc) for doc in docs]
+
+        self._items, self._next_cursor = items, next_cursor
+        self._body = dumps({'items': items, 'next_cursor': next_cursor})
+
+    async def run_refresher(self, db, interval: float):
+        """Rebuild every `interval` seconds so past events drop off"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load(db)
+            except Exception as e:
+                logger.error(f"Upcoming events refresh failed: {e}")
+
+    def body(self, limit: int) -> bytes:
+        """Encoded first page of upcoming events"""
+        # Events that started since the last refresh are dropped here
+        now = datetime.utcnow()
+        start = next((i for i, item in enumerate(self._items) if item['date'] >= now), len(self._items))
+        limit = max(limit, 1)
+        if start == 0 and limit >= len(self._items):
+            return self._body
+        page = self._items[start:start + limit]
+        if start + limit >= len(self._items):
+            next_cursor = self._next_cursor
+        else:
+            # Shaped items keep the raw sort-key values, so they can build a cursor
+            next_cursor = encode_cursor(page[-1], SORT_KEYS['app_events'])
+        return dumps({'items': page, 'next_cursor': next_cursor})
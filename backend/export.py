@@ -0,0 +1,46 @@
+"""
+Streaming NDJSON export of whole collections.
+
+Documents are read from a Motor cursor in batches and written out one JSON
+object per line as they arrive, optionally through an incremental gzip
+compressor, so memory use doesn't depend on collection size.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator
+
+from bson import ObjectId
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_line(doc: dict) -> bytes:
+    return json.dumps(doc, ensure_ascii=False, default=_json_default).encode('utf-8') + b'\n'
+
+
+async def stream_ndjson(cursor, batch_size: int, compress: bool = False) -> AsyncIterator[bytes]:
+    """Yield a cursor's documents as NDJSON, one chunk per fetched batch"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    chunk = []
+    async for doc in cursor.batch_size(batch_size):
+        chunk.append(ndjson_line(doc))
+        if len(chunk) >= batch_size:
+            data = b''.join(chunk)
+            chunk = []
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+
+    data = b''.join(chunk)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
@@ -0,0 +1,123 @@
+"""
+Mongo filters built from list endpoint query parameters.
+
+Shared by the paginated list routes and the streaming export so both select
+exactly the same documents for the same parameters.
+"""
+import inspect
+from datetime import datetime
+from typing import Callable, FrozenSet, NamedTuple, Optional
+
+from pydantic import validate_call
+
+from timeline import year_range_filter
+
+
+def prison_filter(type: Optional[str] = None) -> dict:
+    query = {}
+    if type:
+        query['type'] = type
+    return query
+
+
+def victim_filter(prison_id: Optional[str] = None) -> dict:
+    query = {}
+    if prison_id:
+        query['prison_id'] = prison_id
+    return query
+
+
+def testimony_filter(
+    prison_id: Optional[str] = None,
+    victim_id: Optional[str] = None,
+    type: Optional[str] = None
+) -> dict:
+    query = {}
+    if prison_id:
+        query['prison_id'] = prison_id
+    if victim_id:
+        query['victim_id'] = victim_id
+    if type:
+        query['type'] = type
+    return query
+
+
+def document_filter(
+    type: Optional[str] = None,
+    prison_id: Optional[str] = None,
+    victim_id: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None
+) -> dict:
+    query = {}
+    if type:
+        query['document_type'] = type
+    if prison_id:
+        query['prison_id'] = prison_id
+    if victim_id:
+        query['victim_id'] = victim_id
+    if year_from or year_to:
+        query['year'] = {}
+        if year_from:
+            query['year']['$gte'] = year_from
+        if year_to:
+            query['year']['$lte'] = year_to
+    return query
+
+
+def historical_event_filter(
+    category: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None
+) -> dict:
+    query = year_range_filter(year_from, year_to)
+    if category:
+        query['category'] = category
+    return query
+
+
+def timeline_filter(
+    category: Optional[str] = None,
+    prison_id: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None
+) -> dict:
+    query = year_range_filter(year_from, year_to)
+    if category:
+        query['category'] = category
+    if prison_id:
+        query['prison_ids'] = prison_id
+    return query
+
+
+def app_event_filter(upcoming: bool = False) -> dict:
+    query = {}
+    if upcoming:
+        query['date'] = {'$gte': datetime.utcnow()}
+    return query
+
+
+# Filter builder for each collection that has a list endpoint
+COLLECTION_FILTERS = {
+    'prisons': prison_filter,
+    'victims': victim_filter,
+    'testimonies': testimony_filter,
+    'documents': document_filter,
+    'historical_events': historical_event_filter,
+    'app_events': app_event_filter,
+    'timeline': timeline_filter,
+}
+
+
+class QueryFilter(NamedTuple):
+    """A filter builder that validates and coerces raw query-string values"""
+    build: Callable[..., dict]
+    params: FrozenSet[str]
+
+
+# For routes that take the filter parameters of any collection (the export);
+# wrapped once here rather than on every request
+QUERY_FILTERS = {
+    collection: QueryFilter(validate_call(build), frozenset(inspect.signature(build).parameters))
+    for collection, build in COLLECTION_FILTERS.items()
+}
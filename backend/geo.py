@@ -0,0 +1,104 @@
+"""
+Geospatial helpers for prison locations.
+
+Prisons keep their `coordinates` {latitude, longitude} sub-document for the
+app, and a GeoJSON `location` point next to it that backs the 2dsphere index
+used by the "near" and "within" lookups.
+"""
+import math
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# Cached lookups are snapped to this many decimal degrees (about 100 m)
+POSITION_DECIMALS = 3
+
+
+def geo_point(coordinates: dict) -> dict:
+    """GeoJSON point for a {latitude, longitude} sub-document"""
+    return {
+        'type': 'Point',
+        'coordinates': [coordinates['longitude'], coordinates['latitude']],
+    }
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse a `min_lng,min_lat,max_lng,max_lat` bounding box"""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(','))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def snap_position(params: dict) -> dict:
+    """Round a lookup's lat/lng (about 100 m) or widen its bbox to that grid, for cache keys
+
+    Nearby visitors and slightly different map views then share one cached
+    response instead of each GPS fix or pan adding an entry of its own.
+    """
+    params = dict(params)
+    for name in ('lat', 'lng'):
+        if params.get(name) is not None:
+            params[name] = round(params[name], POSITION_DECIMALS)
+    if params.get('bbox') is not None:
+        min_lng, min_lat, max_lng, max_lat = parse_bbox(params['bbox'])
+        scale = 10 ** POSITION_DECIMALS
+        snapped = (
+            max(math.floor(min_lng * scale) / scale, -180), max(math.floor(min_lat * scale) / scale, -90),
+            min(math.ceil(max_lng * scale) / scale, 180), min(math.ceil(max_lat * scale) / scale, 90),
+        )
+        params['bbox'] = ','.join(f"{v:.{POSITION_DECIMALS}f}" for v in snapped)
+    return params
+
+
+def bbox_polygon(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> dict:
+    """Closed GeoJSON polygon for a bounding box"""
+    return {
+        'type': 'Polygon',
+        'coordinates': [[
+            [min_lng, min_lat],
+            [max_lng, min_lat],
+            [max_lng, max_lat],
+            [min_lng, max_lat],
+            [min_lng, min_lat],
+        ]],
+    }
+
+
+def geo_near_pipeline(
+    lng: float,
+    lat: float,
+    limit: int,
+    max_distance: Optional[float] = None,
+    query: Optional[dict] = None,
+    projection: Optional[dict] = None,
+) -> List[dict]:
+    """$geoNear pipeline returning documents sorted by distance in meters"""
+    geo_near = {
+        'near': {'type': 'Point', 'coordinates': [lng, lat]},
+        'distanceField': 'distance',
+        'key': 'location',
+        'spherical': True,
+    }
+    if max_distance is not None:
+        geo_near['maxDistance'] = max_distance
+    if query:
+        geo_near['query'] = query
+    pipeline = [{'$geoNear': geo_near}, {'$limit': limit}]
+    if projection:
+        pipeline.append({'$project': {**projection, 'distance': 1}})
+    return pipeline
+
+
+async def backfill_prison_locations(db):
+    """Add the GeoJSON point to prisons stored before it existed"""
+    await db.prisons.update_many(
+        {'location': {'$exists': False}, 'coordinates': {'$exists': True}},
+        [{'$set': {'location': {
+            'type': 'Point',
+            'coordinates': ['$coordinates.longitude', '$coordinates.latitude'],
+        }}}],
+    )
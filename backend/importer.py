@@ -0,0 +1,349 @@
+"""
+Resumable importer for partner archive exports.
+
+    python importer.py victims export_victime.csv
+    python importer.py documents scans.jsonl --batch-size 2000 --concurrency 8
+
+Rows are streamed from CSV or JSON Lines, validated against the same models
+as the API and upserted as unordered bulk_write batches, a few batches in
+flight at a time, so memory stays flat however large the file is. Ids are
+derived from each row's natural key (see IMPORTS), so importing the same file
+twice updates the records instead of duplicating them.
+
+After every batch that extends the finished prefix of the file, progress is
+saved to `<file>.checkpoint.json`; an interrupted import picks up from there
+when run again. Rejected rows (failed validation or write) are appended to
+`<file>.rejects.jsonl` with their line number and the reason.
+
+CSV headers use dots for nested fields, e.g. `imprisonment_period.start`;
+empty cells are treated as missing.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from bulk import (
+    BULK_CHUNK_SIZE, BULK_CONCURRENCY, validation_message,
+    new_document_doc, new_testimony_doc, new_victim_doc,
+)
+from database import create_client
+from models import DocumentCreate, TestimonyCreate, VictimCreate
+
+ROOT_DIR = Path(__file__).parent
+
+# Seconds between progress lines
+REPORT_INTERVAL = 5.0
+
+
+class ImportSpec(NamedTuple):
+    model: Type[BaseModel]
+    build_doc: Callable[[BaseModel], dict]
+    key: Tuple[str, ...]  # fields that identify a record across imports
+
+
+IMPORTS = {
+    'victims': ImportSpec(VictimCreate, new_victim_doc, ('prison_id', 'name', 'birth_year')),
+    'testimonies': ImportSpec(TestimonyCreate, new_testimony_doc, ('victim_id', 'source', 'year', 'text')),
+    'documents': ImportSpec(DocumentCreate, new_document_doc, ('scan_url',)),
+}
+
+
+class Row(NamedTuple):
+    line: int
+    data: Optional[dict]
+    error: Optional[str] = None
+
+
+class Batch(NamedTuple):
+    end: int  # rows read from the file once this batch is done
+    ops: List[UpdateOne]
+    lines: List[int]  # file line of each op
+    rejects: List[dict]
+
+
+def _unflatten(row: dict) -> dict:
+    """CSV row with dotted headers as nested dicts; empty cells dropped"""
+    item = {}
+    for header, value in row.items():
+        if header is None or value is None or value.strip() == '':
+            continue
+        target = item
+        *parents, name = header.strip().split('.')
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[name] = value.strip()
+    return item
+
+
+def iter_rows(path: Path, fmt: str, skip: int = 0) -> Iterator[Row]:
+    """Rows of the file after the first `skip`, with their line numbers"""
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for index, row in enumerate(reader):
+                if index >= skip:
+                    yield Row(reader.line_num, _unflatten(row))
+        return
+
+    with open(path, encoding='utf-8-sig') as f:
+        index = 0
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            index += 1
+            if index <= skip:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield Row(line_number, None, f"invalid JSON: {e}")
+                continue
+            if not isinstance(data, dict):
+                yield Row(line_number, None, "expected a JSON object")
+                continue
+            yield Row(line_number, data)
+
+
+def record_id(collection: str, doc: dict, key: Tuple[str, ...]):
+    """Stable id from the natural key: a readable slug for victims, an ObjectId otherwise"""
+    values = json.dumps([doc.get(field) for field in key], ensure_ascii=False, default=str)
+    digest = hashlib.blake2b(values.encode(), digest_size=12).digest()
+    if collection == 'victims':
+        # Disambiguates namesakes that the API's plain name slug would merge
+        return f"{doc['_id']}_{digest.hex()[:8]}"
+    return ObjectId(digest)
+
+
+def upsert_op(collection: str, spec: ImportSpec, item: BaseModel) -> UpdateOne:
+    doc = spec.build_doc(item)
+    doc['_id'] = record_id(collection, doc, spec.key)
+    fields = item.model_dump()
+    fields['updated_at'] = doc['updated_at']
+    # created_at and server-maintained fields (e.g. victims' testimonies) survive re-imports
+    on_insert = {k: v for k, v in doc.items() if k not in fields and k != '_id'}
+    return UpdateOne({'_id': doc['_id']}, {'$set': fields, '$setOnInsert': on_insert}, upsert=True)
+
+
+def file_fingerprint(path: Path) -> dict:
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class Checkpoint:
+    """Progress of one import, saved atomically next to the source file"""
+
+    def __init__(self, path: Path, collection: str, fingerprint: dict):
+        self.path = path
+        self.collection = collection
+        self.fingerprint = fingerprint
+        self.rows = 0
+        self.upserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.rejects_size = 0
+
+    def load(self) -> bool:
+        """Restore saved progress; False if there is none to resume"""
+        if not self.path.exists():
+            return False
+        saved = json.loads(self.path.read_text())
+        if saved['collection'] != self.collection or saved['fingerprint'] != self.fingerprint:
+            raise SystemExit(f"❌ {self.path} belongs to another import or the file changed; use --restart")
+        for name in ('rows', 'upserted', 'updated', 'rejected', 'rejects_size'):
+            setattr(self, name, saved[name])
+        return True
+
+    def save(self):
+        state = {
+            'collection': self.collection,
+            'fingerprint': self.fingerprint,
+            'rows': self.rows,
+            'upserted': self.upserted,
+            'updated': self.updated,
+            'rejected': self.rejected,
+            'rejects_size': self.rejects_size,
+            'saved_at': datetime.utcnow().isoformat(),
+        }
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.path)
+
+
+async def _write_batch(collection, batch: Batch, semaphore: asyncio.Semaphore) -> Tuple[int, int, int, List[dict]]:
+    """(batch end, upserted, updated, rejects) for one batch; releases its concurrency slot"""
+    try:
+        if not batch.ops:
+            return batch.end, 0, 0, batch.rejects
+        try:
+            result = await collection.bulk_write(batch.ops, ordered=False)
+            return batch.end, result.upserted_count, result.modified_count, batch.rejects
+        except BulkWriteError as e:
+            failed = [
+                {'line': batch.lines[err['index']], 'error': err['errmsg']}
+                for err in e.details.get('writeErrors', [])
+            ]
+            rejects = sorted(batch.rejects + failed, key=lambda reject: reject['line'])
+            return batch.end, e.details.get('nUpserted', 0), e.details.get('nModified', 0), rejects
+    finally:
+        semaphore.release()
+
+
+async def run_import(
+    db,
+    collection: str,
+    path: Path,
+    fmt: str,
+    batch_size: int = BULK_CHUNK_SIZE,
+    concurrency: int = BULK_CONCURRENCY,
+    restart: bool = False,
+) -> Checkpoint:
+    spec = IMPORTS[collection]
+    checkpoint = Checkpoint(path.with_name(path.name + '.checkpoint.json'), collection, file_fingerprint(path))
+    rejects_path = path.with_name(path.name + '.rejects.jsonl')
+    resumed = False if restart else checkpoint.load()
+    if resumed:
+        print(f"↻ Resuming at row {checkpoint.rows:,}")
+        # Drop rejects written by batches that never reached the checkpoint
+        with open(rejects_path, 'a+b') as f:
+            f.truncate(min(checkpoint.rejects_size, f.seek(0, os.SEEK_END)))
+    else:
+        rejects_path.unlink(missing_ok=True)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = {}  # batch number -> task
+    finished = {}  # batch number -> result, until the batches before it finish
+    submitted = 0
+    next_to_commit = 0
+    started = time.monotonic()
+    start_rows = checkpoint.rows
+    last_report = started
+
+    def report(final: bool = False):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = (checkpoint.rows - start_rows) / elapsed
+        prefix = "✅ Imported" if final else "…"
+        print(
+            f"{prefix} {checkpoint.rows:,} rows ({rate:,.0f} rows/s): "
+            f"{checkpoint.upserted:,} new, {checkpoint.updated:,} updated, {checkpoint.rejected:,} rejected"
+        )
+
+    def commit(rejects_file):
+        """Advance the checkpoint over batches that finish the prefix of the file"""
+        nonlocal next_to_commit, last_report
+        advanced = False
+        while next_to_commit in finished:
+            end, upserted, updated, rejects = finished.pop(next_to_commit)
+            for reject in rejects:
+                rejects_file.write(json.dumps(reject, ensure_ascii=False, default=str) + '\n')
+            checkpoint.rows = end
+            checkpoint.upserted += upserted
+            checkpoint.updated += updated
+            checkpoint.rejected += len(rejects)
+            next_to_commit += 1
+            advanced = True
+        if advanced:
+            rejects_file.flush()
+            checkpoint.rejects_size = rejects_file.tell()
+            checkpoint.save()
+        if time.monotonic() - last_report >= REPORT_INTERVAL:
+            last_report = time.monotonic()
+            report()
+
+    async def collect(wait_all: bool, rejects_file):
+        if not in_flight:
+            return
+        done, _ = await asyncio.wait(
+            in_flight.values(), return_when=asyncio.ALL_COMPLETED if wait_all else asyncio.FIRST_COMPLETED
+        )
+        error = None
+        for number, task in list(in_flight.items()):
+            if task in done:
+                del in_flight[number]
+                if task.exception() is None:
+                    finished[number] = task.result()
+                else:
+                    error = error or task.exception()
+        commit(rejects_file)
+        if error is not None:
+            # e.g. the connection dropped; the checkpoint keeps the last good prefix
+            raise error
+
+    async def submit(batch: Batch, rejects_file):
+        nonlocal submitted
+        await semaphore.acquire()
+        in_flight[submitted] = asyncio.create_task(_write_batch(db[collection], batch, semaphore))
+        submitted += 1
+        # Fold in whatever finished meanwhile without blocking the reader
+        if any(t.done() for t in in_flight.values()):
+            await collect(False, rejects_file)
+
+    with open(rejects_path, 'a', encoding='utf-8') as rejects_file:
+        ops, lines, rejects = [], [], []
+        rows = checkpoint.rows
+        try:
+            for row in iter_rows(path, fmt, skip=checkpoint.rows):
+                rows += 1
+                if row.error is None:
+                    try:
+                        ops.append(upsert_op(collection, spec, spec.model.model_validate(row.data)))
+                        lines.append(row.line)
+                    except ValidationError as e:
+                        rejects.append({'line': row.line, 'error': validation_message(e), 'row': row.data})
+                else:
+                    rejects.append({'line': row.line, 'error': row.error})
+
+                if len(ops) + len(rejects) >= batch_size:
+                    await submit(Batch(rows, ops, lines, rejects), rejects_file)
+                    ops, lines, rejects = [], [], []
+
+            if ops or rejects:
+                await submit(Batch(rows, ops, lines, rejects), rejects_file)
+            await collect(True, rejects_file)
+        finally:
+            for task in in_flight.values():
+                task.cancel()
+
+    report(final=True)
+    if checkpoint.rejected:
+        print(f"⚠️  Rejected rows are in {rejects_path}")
+    checkpoint.path.unlink(missing_ok=True)
+    return checkpoint
+
+
+async def main(args):
+    load_dotenv(ROOT_DIR / '.env')
+    path = Path(args.file)
+    fmt = args.format or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+    client = create_client(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        await run_import(db, args.collection, path, fmt, args.batch_size, args.concurrency, args.restart)
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a partner archive export (CSV or JSON Lines)")
+    parser.add_argument('collection', choices=sorted(IMPORTS))
+    parser.add_argument('file')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="default: from the file extension")
+    parser.add_argument('--batch-size', type=int, default=BULK_CHUNK_SIZE, help="rows per bulk write")
+    parser.add_argument('--concurrency', type=int, default=BULK_CONCURRENCY, help="bulk writes in flight")
+    parser.add_argument('--restart', action='store_true', help="ignore a saved checkpoint and start over")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
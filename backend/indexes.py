@@ -0,0 +1,240 @@
+"""
+Index registry for the Memorial Gherla collections.
+
+Every filter and sort the routes in server.py build should be backed by one of
+the indexes below. They are created when the API starts and after seeding.
+
+Run `python indexes.py --check` to explain() every query shape the routes
+build and fail if any of them still plans a COLLSCAN.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, GEOSPHERE, TEXT, IndexModel
+
+from pagination import SORT_KEYS, cursor_filter
+from sync import SYNC_COLLECTIONS, SYNC_KEYS
+
+ROOT_DIR = Path(__file__).parent
+
+INDEXES = {
+    'prisons': [
+        IndexModel([('type', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('location', GEOSPHERE)]),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'victims': [
+        IndexModel([('prison_id', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel(
+            [('name', TEXT), ('biography', TEXT)],
+            weights={'name': 10, 'biography': 1},
+            default_language='romanian',
+            name='victims_text'
+        ),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'testimonies': [
+        IndexModel([('prison_id', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('victim_id', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('type', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel(
+            [('text', TEXT), ('source', TEXT)],
+            weights={'text': 1, 'source': 3},
+            default_language='romanian',
+            name='testimonies_text'
+        ),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'documents': [
+        IndexModel([('year', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('document_type', ASCENDING), ('year', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('prison_id', ASCENDING), ('year', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('victim_id', ASCENDING), ('year', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel(
+            [('title', TEXT), ('description', TEXT), ('transcription', TEXT)],
+            weights={'title': 10, 'description': 3, 'transcription': 1},
+            default_language='romanian',
+            name='documents_text'
+        ),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'historical_events': [
+        IndexModel([('date_start', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('category', ASCENDING), ('date_start', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'timeline': [
+        IndexModel([('date_start', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('category', ASCENDING), ('date_start', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('prison_ids', ASCENDING), ('date_start', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'app_events': [
+        IndexModel([('date', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+    ],
+    'qr_locations': [
+        IndexModel([('qr_code', ASCENDING)]),
+        IndexModel([('updated_at', ASCENDING)]),
+    ],
+}
+
+# Filters the routes build, with placeholder values. List routes are checked
+# both for the first page and for a page after a cursor.
+QUERY_SHAPES = {
+    'prisons': [
+        {},
+        {'type': 'memorial'},
+    ],
+    'victims': [
+        {},
+        {'prison_id': 'gherla'},
+    ],
+    'testimonies': [
+        {},
+        {'prison_id': 'gherla'},
+        {'victim_id': 'gherla'},
+        {'type': 'written'},
+        {'prison_id': 'gherla', 'victim_id': 'gherla', 'type': 'written'},
+    ],
+    'documents': [
+        {},
+        {'document_type': 'letter'},
+        {'prison_id': 'gherla'},
+        {'victim_id': 'gherla'},
+        {'year': {'$gte': 1945, '$lte': 1989}},
+        {'document_type': 'letter', 'prison_id': 'gherla', 'year': {'$gte': 1945}},
+    ],
+    'historical_events': [
+        {},
+        {'category': 'repression'},
+        {'date_end': {'$gte': 19450101}, 'date_start': {'$lte': 19891231}},
+    ],
+    'timeline': [
+        {},
+        {'category': 'repression'},
+        {'prison_ids': 'gherla'},
+        {'date_end': {'$gte': 19450101}, 'date_start': {'$lte': 19891231}},
+        {'prison_ids': 'gherla', 'date_start': {'$lte': 19891231}},
+    ],
+    'app_events': [
+        {},
+        {'date': {'$gte': datetime(1989, 12, 21)}},
+    ],
+}
+
+# Delta sync walks every synced collection by (updated_at, _id): a full
+# snapshot, or the changes since a client's high-water mark
+SYNC_SHAPES = {
+    collection: [{}, {'updated_at': {'$gte': datetime(2024, 1, 1)}}] for collection in SYNC_COLLECTIONS
+}
+
+# Point lookups that don't go through pagination
+LOOKUP_SHAPES = {
+    # Batch get matches each id as given and as an ObjectId
+    'victims': [
+        {'_id': {'$in': ['ion_popescu', ObjectId()]}},
+    ],
+    'testimonies': [
+        {'_id': {'$in': ['ion_popescu', ObjectId()]}},
+    ],
+    'documents': [
+        {'_id': {'$in': ['ion_popescu', ObjectId()]}},
+    ],
+    'qr_locations': [
+        {'qr_code': 'GHERLA-001'},
+        {'updated_at': {'$gte': datetime(2024, 1, 1)}},
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create every registered index; existing ones are left untouched"""
+    for collection, indexes in INDEXES.items():
+        await db[collection].create_indexes(indexes)
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def _sample_cursor(sort_keys):
+    """Placeholder sort-key values for a page after a cursor"""
+    sample = {
+        '_id': ObjectId(), 'year': 1950, 'date': datetime(1950, 1, 1), 'date_start': 19500101,
+        'updated_at': datetime(2024, 1, 1),
+    }
+    return [sample[key] for key in sort_keys]
+
+
+def _paged_shapes(collection, filters, sort_keys):
+    """Each filter for the first page and for a page after a cursor"""
+    sort = [(key, ASCENDING) for key in sort_keys]
+    after = cursor_filter(sort_keys, _sample_cursor(sort_keys))
+    for query in filters:
+        yield collection, query, sort
+        yield collection, {'$and': [query, after]} if query else after, sort
+
+
+async def check_query_plans(db):
+    """Return (collection, filter) pairs whose winning plan is a COLLSCAN"""
+    shapes = []
+    for collection, filters in QUERY_SHAPES.items():
+        shapes.extend(_paged_shapes(collection, filters, SORT_KEYS[collection]))
+    for collection, filters in SYNC_SHAPES.items():
+        shapes.extend(_paged_shapes(collection, filters, SYNC_KEYS))
+    for collection, filters in LOOKUP_SHAPES.items():
+        for query in filters:
+            shapes.append((collection, query, None))
+
+    failures = []
+    for collection, query, sort in shapes:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        if 'COLLSCAN' in _plan_stages(explain['queryPlanner']['winningPlan']):
+            failures.append((collection, query))
+    return failures
+
+
+async def main(check: bool):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    try:
+        await ensure_indexes(db)
+        print("✅ Indexes created")
+
+        if check:
+            failures = await check_query_plans(db)
+            for collection, query in failures:
+                print(f"❌ COLLSCAN on {collection}: {query}")
+            if failures:
+                return 1
+            print("✅ Every query shape uses an index")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create indexes and verify query plans")
+    parser.add_argument('--check', action='store_true', help="fail if any query shape plans a COLLSCAN")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check)))
@@ -0,0 +1,306 @@
+"""
+Media store for audio tour tracks, testimony recordings and document scans.
+
+Files live either in a local directory (MEDIA_BACKEND=local, under
+MEDIA_ROOT) or in a GridFS bucket (MEDIA_BACKEND=gridfs) and are served by
+`GET /api/media/{name}` with HTTP Range support, so audio players can start
+immediately and seek without downloading whole files.
+
+Local files are sent with the ASGI zero-copy extension when the server
+offers it (sendfile straight from the page cache) and read in chunks
+otherwise. GridFS files are streamed chunk by chunk from the requested
+offset. Every response carries an ETag and Last-Modified so clients can
+revalidate.
+
+    python media.py upload track.mp3 --name gherla/tour-01.mp3
+"""
+import argparse
+import asyncio
+import mimetypes
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, NamedTuple, Optional
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from cache import etag_matches
+
+ROOT_DIR = Path(__file__).parent
+
+CHUNK_SIZE = 256 * 1024
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
+
+
+class MediaFile(NamedTuple):
+    name: str
+    size: int
+    modified: datetime
+    etag: str
+    content_type: str
+    ref: object  # Path for local files, file id for GridFS
+
+
+class ByteRange(NamedTuple):
+    start: int
+    end: int  # inclusive
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+def _content_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def _unsatisfiable(size: int):
+    raise HTTPException(status_code=416, detail="Range not satisfiable", headers={'Content-Range': f'bytes */{size}'})
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[ByteRange]:
+    """The single byte range requested, None for the whole file; 416 if unsatisfiable"""
+    if not header or not header.startswith('bytes='):
+        return None
+    specs = header[len('bytes='):].split(',')
+    if len(specs) != 1:
+        # Multipart ranges aren't worth it for media; send the whole file
+        return None
+    start, _, end = specs[0].strip().partition('-')
+    try:
+        first = int(start) if start else None
+        last = int(end) if end else None
+    except ValueError:
+        return None
+    if first is None:
+        if last is None:
+            return None
+        # Suffix range: the last N bytes; "-0" and empty files can't be satisfied
+        if last == 0 or size == 0:
+            _unsatisfiable(size)
+        return ByteRange(max(size - last, 0), size - 1)
+    if last is not None and last < first:
+        # Syntactically invalid (RFC 9110 §14.1.1): ignore the header
+        return None
+    if first >= size:
+        _unsatisfiable(size)
+    return ByteRange(first, size - 1 if last is None else min(last, size - 1))
+
+
+def _range_applies(request: Request, media: MediaFile) -> bool:
+    """If-Range: only honor Range when the client's copy is still current"""
+    if_range = request.headers.get('if-range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == media.etag
+    try:
+        return parsedate_to_datetime(if_range) >= media.modified.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def _not_modified(request: Request, media: MediaFile) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        return etag_matches(if_none_match, media.etag)
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= media.modified.replace(microsecond=0)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class LocalMediaStore:
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+
+    def _path(self, name: str) -> Optional[Path]:
+        path = (self.root / name).resolve()
+        # Keep requests inside the media root
+        if self.root not in path.parents:
+            return None
+        return path
+
+    async def stat(self, name: str) -> Optional[MediaFile]:
+        path = self._path(name)
+        if path is None:
+            return None
+        try:
+            st = await anyio.to_thread.run_sync(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        return MediaFile(
+            name=name,
+            size=st.st_size,
+            modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+            etag=f'"{st.st_mtime_ns:x}-{st.st_size:x}"',
+            content_type=_content_type(name),
+            ref=path,
+        )
+
+    async def iter_bytes(self, media: MediaFile, start: int, length: int) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(media.ref, 'rb') as f:
+            await f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def put(self, name: str, source: Path, content_type: Optional[str] = None):
+        path = self._path(name)
+        if path is None:
+            raise ValueError(f"Invalid media name: {name}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await anyio.to_thread.run_sync(shutil.copyfile, source, path)
+
+
+class GridFSMediaStore:
+    def __init__(self, db, bucket_name: str = 'media'):
+        self.files = db[f'{bucket_name}.files']
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=CHUNK_SIZE)
+
+    async def stat(self, name: str) -> Optional[MediaFile]:
+        # Latest revision wins, as with open_download_stream_by_name
+        doc = await self.files.find_one({'filename': name}, sort=[('uploadDate', -1)])
+        if doc is None:
+            return None
+        metadata = doc.get('metadata') or {}
+        return MediaFile(
+            name=name,
+            size=doc['length'],
+            modified=doc['uploadDate'].replace(tzinfo=timezone.utc),
+            # GridFS files are immutable; a new revision gets a new id
+            etag=f'"{doc["_id"]}"',
+            content_type=metadata.get('content_type') or _content_type(name),
+            ref=doc['_id'],
+        )
+
+    async def iter_bytes(self, media: MediaFile, start: int, length: int) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream(media.ref)
+        grid_out.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def put(self, name: str, source: Path, content_type: Optional[str] = None):
+        with open(source, 'rb') as f:
+            await self.bucket.upload_from_stream(
+                name, f, metadata={'content_type': content_type or _content_type(name)}
+            )
+
+
+class MediaResponse(Response):
+    """Sends `length` bytes of a media file from `start`"""
+
+    def __init__(self, store, media: MediaFile, start: int, length: int, status_code: int, headers: dict, send_body: bool):
+        super().__init__(status_code=status_code, headers=headers, media_type=media.content_type)
+        self.store = store
+        self.media = media
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        if isinstance(self.media.ref, Path) and 'http.response.zerocopysend' in scope.get('extensions', {}):
+            with open(self.media.ref, 'rb') as f:
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': f,
+                    'offset': self.start,
+                    'count': self.length,
+                })
+            return
+
+        async for chunk in self.store.iter_bytes(self.media, self.start, self.length):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def media_response(store, name: str, request: Request) -> Response:
+    """Full, partial (206) or not-modified (304) response for a stored file"""
+    media = await store.stat(name)
+    if media is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': media.etag,
+        'Last-Modified': format_datetime(media.modified, usegmt=True),
+        'Cache-Control': MEDIA_CACHE_CONTROL,
+    }
+    if _not_modified(request, media):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if _range_applies(request, media):
+        byte_range = parse_range(request.headers.get('range'), media.size)
+
+    send_body = request.method != 'HEAD'
+    if byte_range is None:
+        headers['Content-Length'] = str(media.size)
+        return MediaResponse(store, media, 0, media.size, 200, headers, send_body)
+
+    headers['Content-Length'] = str(byte_range.length)
+    headers['Content-Range'] = f'bytes {byte_range.start}-{byte_range.end}/{media.size}'
+    return MediaResponse(store, media, byte_range.start, byte_range.length, 206, headers, send_body)
+
+
+def create_media_store(db):
+    backend = os.environ.get('MEDIA_BACKEND', 'local')
+    if backend == 'gridfs':
+        return GridFSMediaStore(db, os.environ.get('MEDIA_BUCKET', 'media'))
+    if backend == 'local':
+        return LocalMediaStore(Path(os.environ.get('MEDIA_ROOT', ROOT_DIR / 'media')))
+    raise ValueError(f"Invalid MEDIA_BACKEND: {backend}")
+
+
+async def main(args):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    store = create_media_store(client[os.environ['DB_NAME']])
+    try:
+        for source in args.files:
+            source = Path(source)
+            name = args.name if args.name and len(args.files) == 1 else f"{args.prefix}{source.name}"
+            await store.put(name, source, args.content_type)
+            print(f"✅ Stored {source} as /api/media/{name}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add files to the media store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    upload = subparsers.add_parser('upload')
+    upload.add_argument('files', nargs='+')
+    upload.add_argument('--name', help="stored name for a single file")
+    upload.add_argument('--prefix', default='', help="prefix for stored names, e.g. gherla/")
+    upload.add_argument('--content-type')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
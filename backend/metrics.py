@@ -0,0 +1,308 @@
+"""
+Prometheus-text metrics for the API.
+
+Enough to tell where time goes when latency spikes:
+
+- per-route request counts, latency and response size (ASGI middleware)
+- time spent encoding response bodies
+- every Mongo command timed by collection and operation, plus how long
+  requests waited to check a connection out of the pool (pymongo listeners)
+- event loop lag, sampled by a background task
+
+Everything lives in the module-level `registry` and is rendered by
+`GET /api/metrics`. pymongo listeners fire on motor's worker threads, so
+metric updates take a lock.
+"""
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Dict, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, object] = {}
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = sorted(self._series.items())
+        for values, value in series:
+            lines.extend(self._render_series(values, value))
+        return lines
+
+    def _render_series(self, values, value) -> list:
+        return [f'{self.name}{_labels(self.label_names, values)} {_number(value)}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._series[labels] = value
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts, then sum and count
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def _render_series(self, values, series) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series):
+            cumulative += count
+            le = _labels(self.label_names, values, f'le="{_number(bound)}"')
+            lines.append(f'{self.name}_bucket{le} {cumulative}')
+        inf = _labels(self.label_names, values, 'le="+Inf"')
+        lines.append(f'{self.name}_bucket{inf} {series[-1]}')
+        lines.append(f'{self.name}_sum{_labels(self.label_names, values)} {_number(series[-2])}')
+        lines.append(f'{self.name}_count{_labels(self.label_names, values)} {series[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ('\n'.join(lines) + '\n').encode()
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    'http_requests_total', "HTTP requests by route, method and status", ('route', 'method', 'status')))
+HTTP_LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', "Time from request start to last body byte", ('route', 'method')))
+HTTP_RESPONSE_SIZE = registry.register(Histogram(
+    'http_response_size_bytes', "Response body size", ('route', 'method'), SIZE_BUCKETS))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    'http_requests_in_flight', "Requests currently being served"))
+
+SERIALIZE_LATENCY = registry.register(Histogram(
+    'serialization_duration_seconds', "Time spent encoding response bodies"))
+SINGLEFLIGHT_REQUESTS = registry.register(Counter(
+    'singleflight_requests_total', "Cache misses that ran the handler (leader) or joined one in flight (coalesced)",
+    ('handler', 'role')))
+
+MONGO_COMMANDS = registry.register(Counter(
+    'mongo_commands_total', "Mongo commands by collection, operation and outcome",
+    ('collection', 'operation', 'outcome')))
+MONGO_LATENCY = registry.register(Histogram(
+    'mongo_command_duration_seconds', "Mongo command round trip time", ('collection', 'operation')))
+MONGO_CHECKOUT_WAIT = registry.register(Histogram(
+    'mongo_pool_checkout_wait_seconds', "Time spent waiting for a pooled connection"))
+MONGO_CHECKOUT_FAILURES = registry.register(Counter(
+    'mongo_pool_checkout_failures_total', "Failed connection checkouts by reason", ('reason',)))
+MONGO_CONNECTIONS_IN_USE = registry.register(Gauge(
+    'mongo_pool_connections_in_use', "Connections currently checked out"))
+MONGO_CONNECTIONS_OPEN = registry.register(Gauge(
+    'mongo_pool_connections_open', "Connections currently open"))
+
+EVENT_LOOP_LAG = registry.register(Histogram(
+    'event_loop_lag_seconds', "How late the event loop woke up a sleeping task"))
+
+
+class MetricsMiddleware:
+    """Records request count, latency and response size per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router leaves the matched route in the scope; unmatched paths
+            # share one label so random URLs can't blow up cardinality
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            method = scope['method']
+            HTTP_REQUESTS.inc(route, method, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - start, route, method)
+            HTTP_RESPONSE_SIZE.observe(size, route, method)
+
+
+def _collection(event: monitoring.CommandStartedEvent) -> str:
+    # getMore names its collection separately; others carry it as the command's value
+    value = event.command.get('collection') if event.command_name == 'getMore' else event.command.get(event.command_name)
+    return value if isinstance(value, str) else ''
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every Mongo command by collection and operation"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (_collection(event), event.command_name)
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            labels = self._pending.pop((event.connection_id, event.request_id), ('', event.command_name))
+        MONGO_COMMANDS.inc(*labels, outcome)
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, *labels)
+
+    def succeeded(self, event):
+        self._finish(event, 'success')
+
+    def failed(self, event):
+        self._finish(event, 'failure')
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks pool checkout waits and connection counts"""
+
+    def __init__(self):
+        # A checkout starts and ends on the same worker thread
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            MONGO_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+            self._local.started = None
+        MONGO_CONNECTIONS_IN_USE.inc()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        MONGO_CHECKOUT_FAILURES.inc(str(event.reason))
+
+    def connection_checked_in(self, event):
+        MONGO_CONNECTIONS_IN_USE.dec()
+
+    def connection_created(self, event):
+        MONGO_CONNECTIONS_OPEN.inc()
+
+    def connection_closed(self, event):
+        MONGO_CONNECTIONS_OPEN.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+def mongo_listeners() -> list:
+    return [CommandTimer(), PoolMonitor()]
+
+
+async def sample_loop_lag(interval: float = 0.5):
+    """Measure how far past `interval` each sleep actually wakes up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+def render() -> bytes:
+    return registry.render()
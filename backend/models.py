@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from typing import Dict, Generic, List, Optional, Literal, TypeVar
 from datetime import datetime
 
 # Enums
@@ -9,6 +9,8 @@ DocumentType = Literal['sentence', 'letter', 'securitate_file', 'photograph', 'o
 EventCategory = Literal['political', 'resistance', 'repression', 'commemoration']
 ContentType = Literal['audio_story', 'text', 'ar_experience', 'video']
 
+T = TypeVar('T')
+
 # Sub-models
 class Coordinates(BaseModel):
     latitude: float
@@ -19,6 +21,9 @@ class TimelineEvent(BaseModel):
     title: str
     description: str
     image_url: Optional[str] = None
+    # Parsed from `date` on write: YYYYMMDD bounds of the period
+    date_start: Optional[int] = None
+    date_end: Optional[int] = None
 
 class VisitInfo(BaseModel):
     address: str
@@ -147,6 +152,8 @@ class DocumentCreate(BaseModel):
 class HistoricalEvent(BaseModel):
     id: Optional[str] = Field(None, alias='_id')
     date: str
+    date_start: Optional[int] = None
+    date_end: Optional[int] = None
     title: str
     description: str
     related_prisons: List[str] = []
@@ -169,7 +176,7 @@ class AppEvent(BaseModel):
     id: Optional[str] = Field(None, alias='_id')
     title: str
     description: str
-    date: str
+    date: datetime
     location: str
     prison_id: Optional[str] = None
     type: str
@@ -182,7 +189,7 @@ class AppEvent(BaseModel):
 class AppEventCreate(BaseModel):
     title: str
     description: str
-    date: str
+    date: datetime
     location: str
     prison_id: Optional[str] = None
     type: str
@@ -196,3 +203,149 @@ class QRScanResponse(BaseModel):
     content_type: Optional[ContentType] = None
     content_data: Optional[dict] = None
     location_name: Optional[str] = None
+
+class QRBatchScanRequest(BaseModel):
+    qr_codes: List[str] = Field(max_length=500)
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=200)
+
+class BatchGetResponse(BaseModel, Generic[T]):
+    items: List[T]
+    missing: List[str] = []
+
+class QRBatchScanResponse(BaseModel):
+    results: Dict[str, QRScanResponse]
+
+class TrackMatch(BaseModel):
+    prison_id: str
+    distance: float  # meters
+    track: AudioTrack
+
+class TrackLocateResponse(BaseModel):
+    match: Optional[TrackMatch] = None
+
+# List summaries (heavy fields left in the database)
+class PrisonSummary(BaseModel):
+    id: Optional[str] = Field(None, alias='_id')
+    name: str
+    type: PrisonType
+    coordinates: Coordinates
+    description: str
+    operational_years: List[int]
+    estimated_victims: int
+    images: List[str] = []
+
+    class Config:
+        populate_by_name = True
+
+# Map markers: the prison summary plus its distance from the query point
+class NearbyPrison(PrisonSummary):
+    distance: float  # meters
+
+class VictimSummary(BaseModel):
+    id: Optional[str] = Field(None, alias='_id')
+    prison_id: str
+    name: str
+    birth_year: Optional[int] = None
+    death_year: Optional[int] = None
+    profession: str
+    photo_url: Optional[str] = None
+    imprisonment_period: ImprisonmentPeriod
+    biography_excerpt: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+class TestimonySummary(BaseModel):
+    id: Optional[str] = Field(None, alias='_id')
+    prison_id: Optional[str] = None
+    victim_id: Optional[str] = None
+    audio_url: Optional[str] = None
+    source: str
+    year: int
+    type: TestimonyType
+    text_excerpt: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+class DocumentSummary(BaseModel):
+    id: Optional[str] = Field(None, alias='_id')
+    title: str
+    document_type: DocumentType
+    scan_url: str
+    prison_id: Optional[str] = None
+    victim_id: Optional[str] = None
+    year: int
+    description: Optional[str] = None
+    has_transcription: bool = False
+
+    class Config:
+        populate_by_name = True
+
+# Bulk writes
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkItemResult]
+
+# Search
+SearchCollection = Literal['victims', 'testimonies', 'documents']
+
+class SearchHit(BaseModel):
+    collection: SearchCollection
+    id: str
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+# Pagination
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+TimelineSource = Literal['historical_event', 'prison']
+
+class TimelineEntry(BaseModel):
+    """A global historical event or a prison's own timeline item"""
+    id: str = Field(alias='_id')
+    source: TimelineSource
+    source_id: str
+    date: Optional[str] = None
+    date_start: Optional[int] = None
+    date_end: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[EventCategory] = None
+    prison_ids: List[str] = []
+    images: List[str] = []
+
+    class Config:
+        populate_by_name = True
+
+# Composed payloads
+class PrisonDetail(BaseModel):
+    prison: Prison
+    victims: Page[Victim]
+    testimonies: Page[Testimony]
+    documents: Page[Document]
+    incomplete: List[str] = []
+
+class SyncBundle(BaseModel):
+    snapshot: bool
+    since: Optional[datetime] = None
+    high_water_mark: datetime
+    has_more: bool
+    cursor: Optional[str] = None
+    changes: Dict[str, List[dict]]
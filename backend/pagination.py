@@ -0,0 +1,115 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are walked by the last seen value of an indexed sort key instead of
+skip/offset, so every page costs the same index range scan no matter how deep
+a client has paged. Cursors are opaque to clients: a urlsafe base64 blob of the
+sort-key values of the last returned document.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from bson import ObjectId, json_util
+from bson.errors import BSONError
+from fastapi import HTTPException
+
+# Sort keys per collection. `_id` is always the last key so the order is total.
+SORT_KEYS = {
+    'prisons': ('_id',),
+    'victims': ('_id',),
+    'testimonies': ('_id',),
+    'documents': ('year', '_id'),
+    'historical_events': ('date_start', '_id'),
+    'timeline': ('date_start', '_id'),
+    'app_events': ('date', '_id'),
+}
+
+# Sort-key values a cursor may carry; anything else (e.g. `{"$ne": null}`) is
+# rejected before it can reach a query as an operator
+CURSOR_VALUE_TYPES = (str, int, float, datetime, ObjectId, type(None))
+
+
+def encode_token(value) -> str:
+    """Opaque urlsafe token for any BSON-encodable value"""
+    raw = json_util.dumps(value).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_token(token: str):
+    """Inverse of `encode_token`; raises a 400 for tampered tokens"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError, BSONError, IndexError, TypeError, KeyError):
+        # e.g. bad base64, bad JSON, or extended JSON like {"$oid": "zz"} / {"$date": "x"}
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_cursor(doc: dict, sort_keys: Sequence[str]) -> str:
+    """Build an opaque cursor pointing just after `doc`"""
+    return encode_token([doc.get(key) for key in sort_keys])
+
+
+def check_cursor_values(values, sort_keys: Sequence[str]) -> list:
+    """`values` if it is one scalar per sort key; raises a 400 otherwise"""
+    if (
+        not isinstance(values, list)
+        or len(values) != len(sort_keys)
+        or not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[str]) -> list:
+    """Decode a cursor produced by `encode_cursor` for the same sort keys"""
+    return check_cursor_values(decode_token(cursor), sort_keys)
+
+
+def cursor_filter(sort_keys: Sequence[str], values: Sequence) -> dict:
+    """Filter matching every document strictly after `values` in sort order"""
+    clauses = []
+    for i, key in enumerate(sort_keys):
+        clause = {k: v for k, v in zip(sort_keys[:i], values[:i])}
+        # Null (or missing) sorts before every value, but `$gt: null` matches nothing
+        clause[key] = {'$ne': None} if values[i] is None else {'$gt': values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+
+def apply_cursor(query: dict, sort_keys: Sequence[str], cursor: Optional[str]) -> dict:
+    """Combine a route's filter dict with the keyset condition for `cursor`"""
+    if not cursor:
+        return query
+    after = cursor_filter(sort_keys, decode_cursor(cursor, sort_keys))
+    if not query:
+        return after
+    return {'$and': [query, after]}
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page of `collection` and the cursor of the following page"""
+    if limit < 1:
+        # Mongo treats limit(0) as no limit at all
+        return [], None
+    sort_keys = SORT_KEYS[collection.name]
+    find_query = apply_cursor(query, sort_keys, cursor)
+    docs = await (
+        collection.find(find_query, projection)
+        .sort([(key, 1) for key in sort_keys])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_keys)
+    return docs, next_cursor
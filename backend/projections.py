@@ -0,0 +1,104 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+List routes take a `fields` parameter:
+
+- omitted or `summary`: the collection's summary model; heavy text fields are
+  replaced by a short excerpt or a presence flag computed inside Mongo
+- `all`: the full model
+- `a,b,c`: just those fields of the full model (plus `_id`)
+
+Every variant is pushed down as a find() projection so fields that aren't
+returned never leave the database.
+"""
+from typing import FrozenSet, NamedTuple, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from models import (
+    Prison, PrisonSummary,
+    Victim, VictimSummary,
+    Testimony, TestimonySummary,
+    Document, DocumentSummary,
+    HistoricalEvent, AppEvent, TimelineEntry
+)
+from pagination import SORT_KEYS
+
+EXCERPT_LENGTH = 200
+
+FULL_MODELS = {
+    'prisons': Prison,
+    'victims': Victim,
+    'testimonies': Testimony,
+    'documents': Document,
+    'historical_events': HistoricalEvent,
+    'app_events': AppEvent,
+    'timeline': TimelineEntry,
+}
+
+# Collections without heavy fields summarize to their full model
+SUMMARY_MODELS = {
+    'prisons': PrisonSummary,
+    'victims': VictimSummary,
+    'testimonies': TestimonySummary,
+    'documents': DocumentSummary,
+    'historical_events': HistoricalEvent,
+    'app_events': AppEvent,
+    'timeline': TimelineEntry,
+}
+
+# Summary fields computed from a heavy field: excerpt field -> source field
+EXCERPTS = {
+    'victims': {'biography_excerpt': 'biography'},
+    'testimonies': {'text_excerpt': 'text'},
+}
+
+# Summary flags for whether a heavy field has content: flag field -> source field
+PRESENCE_FLAGS = {
+    'documents': {'has_transcription': 'transcription'},
+}
+
+
+class Projection(NamedTuple):
+    mongo: Optional[dict]
+    model: Type[BaseModel]
+    keys: Optional[FrozenSet[str]] = None  # output keys to keep; None keeps all
+
+
+def _aliases(model: Type[BaseModel]) -> list:
+    return [field.alias or name for name, field in model.model_fields.items()]
+
+
+def _summary_projection(collection: str) -> Projection:
+    model = SUMMARY_MODELS[collection]
+    excerpts = EXCERPTS.get(collection, {})
+    flags = PRESENCE_FLAGS.get(collection, {})
+    mongo = {key: 1 for key in _aliases(model) if key not in excerpts and key not in flags}
+    for excerpt, source in excerpts.items():
+        mongo[excerpt] = {'$substrCP': [{'$ifNull': ['$' + source, '']}, 0, EXCERPT_LENGTH]}
+    for flag, source in flags.items():
+        mongo[flag] = {'$gt': [{'$strLenCP': {'$ifNull': ['$' + source, '']}}, 0]}
+    mongo.update({key: 1 for key in SORT_KEYS[collection]})
+    return Projection(mongo, model)
+
+
+_SUMMARIES = {collection: _summary_projection(collection) for collection in SUMMARY_MODELS}
+
+
+def resolve_fields(collection: str, fields: Optional[str]) -> Projection:
+    """Projection and output model for a list route's `fields` parameter"""
+    if not fields or fields == 'summary':
+        return _SUMMARIES[collection]
+
+    model = FULL_MODELS[collection]
+    if fields == 'all':
+        return Projection(None, model)
+
+    requested = {f.strip() for f in fields.split(',') if f.strip()}
+    unknown = requested - set(_aliases(model))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Sort keys are always read so the page cursor can be built
+    mongo = {key: 1 for key in requested | set(SORT_KEYS[collection])}
+    return Projection(mongo, model, frozenset(requested | {'_id'}))
@@ -0,0 +1,104 @@
+"""
+In-memory QR code lookup table.
+
+The whole `qr_locations` collection is small and read far more than it is
+written, so it is kept in memory as a hash map of prebuilt, pre-encoded
+`QRScanResponse` bodies. It is loaded at startup and a background task pulls
+in documents changed since the last refresh (by `updated_at`), with a
+periodic full reload to drop deleted codes. Scans never touch the database.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from pydantic import ValidationError
+
+from models import QRScanResponse
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+INVALID = QRScanResponse(valid=False)
+
+
+class QRTable:
+    def __init__(self):
+        self._responses: Dict[str, QRScanResponse] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._prisons: Dict[str, set] = defaultdict(set)
+        self._code_prison: Dict[str, Optional[str]] = {}
+        self._high_water_mark: Optional[datetime] = None
+        self.invalid_body = dumps(INVALID.model_dump())
+
+    def __len__(self):
+        return len(self._responses)
+
+    def _put(self, doc: dict):
+        code = doc.get('qr_code')
+        if not code:
+            return
+        try:
+            response = QRScanResponse(
+                valid=True,
+                content_type=doc.get('content_type'),
+                content_data=doc.get('content_data'),
+                location_name=doc.get('location_name')
+            )
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid QR location {code}: {e}")
+            return
+
+        old_prison = self._code_prison.get(code)
+        if old_prison is not None:
+            self._prisons[old_prison].discard(code)
+        prison_id = doc.get('prison_id')
+        if prison_id is not None:
+            self._prisons[prison_id].add(code)
+        self._code_prison[code] = prison_id
+        self._responses[code] = response
+        self._bodies[code] = dumps(response.model_dump())
+
+        updated_at = doc.get('updated_at')
+        if updated_at and (self._high_water_mark is None or updated_at > self._high_water_mark):
+            self._high_water_mark = updated_at
+
+    async def load(self, db):
+        """Replace the table with the current contents of `qr_locations`"""
+        table = QRTable()
+        async for doc in db.qr_locations.find({}):
+            table._put(doc)
+        self.__dict__.update(table.__dict__)
+        logger.info(f"Loaded {len(self)} QR codes")
+
+    async def refresh(self, db):
+        """Pull in QR locations inserted or changed since the last refresh"""
+        if self._high_water_mark is None:
+            return await self.load(db)
+        async for doc in db.qr_locations.find({'updated_at': {'$gte': self._high_water_mark}}):
+            self._put(doc)
+
+    async def run_refresher(self, db, interval: float, full_every: int = 20):
+        """Refresh incrementally every `interval` seconds, fully every `full_every` rounds"""
+        rounds = 0
+        while True:
+            await asyncio.sleep(interval)
+            rounds += 1
+            try:
+                if rounds % full_every == 0:
+                    await self.load(db)
+                else:
+                    await self.refresh(db)
+            except Exception as e:
+                logger.error(f"QR table refresh failed: {e}")
+
+    def body(self, code: str) -> bytes:
+        """Encoded scan response for `code`"""
+        return self._bodies.get(code, self.invalid_body)
+
+    def lookup_many(self, codes: Iterable[str]) -> Dict[str, QRScanResponse]:
+        return {code: self._responses.get(code, INVALID) for code in codes}
+
+    def for_prison(self, prison_id: str) -> Dict[str, QRScanResponse]:
+        return {code: self._responses[code] for code in sorted(self._prisons.get(prison_id, ()))}
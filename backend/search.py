@@ -0,0 +1,100 @@
+"""
+Full-text search over victims, testimonies and documents.
+
+Matching and ranking is done by Mongo text indexes (see indexes.py) built with
+the Romanian analyzer; text index v3 is diacritic-insensitive, so "închisoare"
+and "inchisoare" match the same documents. Snippets are cut around the first
+query term using the same diacritic folding.
+"""
+import asyncio
+import unicodedata
+from typing import List, Optional
+
+# What each searchable collection shows as a hit
+SEARCH_FIELDS = {
+    'victims': {'title': 'name', 'snippet': ['biography']},
+    'testimonies': {'title': 'source', 'snippet': ['text']},
+    'documents': {'title': 'title', 'snippet': ['transcription', 'description']},
+}
+
+SNIPPET_WIDTH = 160
+
+
+def _fold_char(c: str) -> str:
+    base = ''.join(ch for ch in unicodedata.normalize('NFKD', c) if not unicodedata.combining(ch))
+    return (base or c).lower()[:1]
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics, keeping character offsets intact"""
+    return ''.join(_fold_char(c) for c in text)
+
+
+def make_snippet(text: str, terms: List[str], width: int = SNIPPET_WIDTH) -> Optional[str]:
+    """Cut a window of `text` around the first occurrence of any term"""
+    if not text:
+        return None
+    folded = fold(text)
+    positions = [folded.find(term) for term in terms]
+    positions = [p for p in positions if p >= 0]
+    if not positions:
+        if len(text) <= width:
+            return text
+        return text[:width].rsplit(' ', 1)[0] + '…'
+
+    first = min(positions)
+    start = max(0, first - width // 3)
+    end = min(len(text), start + width)
+    if start > 0:
+        space = text.find(' ', start, first)
+        if space >= 0:
+            start = space + 1
+    snippet = text[start:end]
+    if end < len(text):
+        snippet = snippet.rsplit(' ', 1)[0]
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+def query_terms(q: str) -> List[str]:
+    """Folded terms of a search query, ignoring phrase quotes and negations"""
+    return [t for t in fold(q.replace('"', ' ')).split() if not t.startswith('-')]
+
+
+async def _search_collection(db, collection: str, q: str, terms: List[str], limit: int) -> List[dict]:
+    fields = SEARCH_FIELDS[collection]
+    projection = {'score': {'$meta': 'textScore'}, fields['title']: 1}
+    projection.update({field: 1 for field in fields['snippet']})
+
+    docs = await (
+        db[collection]
+        .find({'$text': {'$search': q}}, projection)
+        .sort([('score', {'$meta': 'textScore'})])
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    hits = []
+    for doc in docs:
+        snippet = None
+        for field in fields['snippet']:
+            snippet = make_snippet(doc.get(field), terms)
+            if snippet and any(term in fold(snippet) for term in terms):
+                break
+        hits.append({
+            'collection': collection,
+            'id': str(doc['_id']),
+            'title': doc.get(fields['title']),
+            'snippet': snippet,
+            'score': doc['score'],
+        })
+    return hits
+
+
+async def search_text(db, q: str, collections: List[str], limit: int) -> List[dict]:
+    """Top `limit` hits across `collections`, best score first"""
+    terms = query_terms(q)
+    results = await asyncio.gather(
+        *(_search_collection(db, collection, q, terms, limit) for collection in collections)
+    )
+    hits = [hit for hits in results for hit in hits]
+    hits.sort(key=lambda hit: hit['score'], reverse=True)
+    return hits[:limit]
@@ -1,12 +1,30 @@
 """
 Seed script to populate the database with mock data for Memorial Gherla app
+
+    python seed_data.py                       # the hand-written sample data
+    python seed_data.py --generate --victims 1000000 --seed 7
+
+`--generate` builds a synthetic, referentially consistent dataset of any size
+for load testing: prisons at real detention sites, victims with Romanian
+names and biographies, their testimonies and documents, and QR locations.
+The same seed always produces the same data.
 """
+import argparse
 import asyncio
+import random
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from indexes import ensure_indexes
+from geo import geo_point
+from sync import backfill_updated_at
+from timeline import rebuild_timeline, with_date_range
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -128,6 +146,10 @@ async def seed_database():
         }
     ]
     
+    for prison in prisons:
+        prison["location"] = geo_point(prison["coordinates"])
+        for entry in prison["history_timeline"]:
+            with_date_range(entry)
     await db.prisons.insert_many(prisons)
     print(f"✅ Seeded {len(prisons)} prisons")
     
@@ -315,6 +337,8 @@ async def seed_database():
         }
     ]
     
+    for event in historical_events:
+        with_date_range(event)
     await db.historical_events.insert_many(historical_events)
     print(f"✅ Seeded {len(historical_events)} historical events")
     
@@ -323,7 +347,7 @@ async def seed_database():
         {
             "title": "Zi de comemorare - Memorialul Sighet",
             "description": "Ceremonie de comemorare a victimelor comunismului",
-            "date": "2025-12-21T10:00:00",
+            "date": datetime(2025, 12, 21, 10, 0),
             "location": "Memorialul Sighet",
             "prison_id": "sighet",
             "type": "commemoration",
@@ -332,7 +356,7 @@ async def seed_database():
         {
             "title": "Conferință: Rezistența anticomunistă",
             "description": "Conferință despre mișcările de rezistență împotriva regimului comunist",
-            "date": "2025-10-15T14:00:00",
+            "date": datetime(2025, 10, 15, 14, 0),
             "location": "București",
             "type": "conference",
             "created_at": datetime.utcnow()
@@ -342,9 +366,394 @@ async def seed_database():
     await db.app_events.insert_many(app_events)
     print(f"✅ Seeded {len(app_events)} app events")
     
+    await backfill_updated_at(db)
+    await ensure_indexes(db)
+    print("✅ Created indexes")
+    await rebuild_timeline(db)
+    
     print("✅ Database seeding completed successfully!")
     
     client.close()
 
+# Synthetic data generation
+
+# Historical detention sites: name, type, latitude, longitude, years in use
+SITES = [
+    ("Gherla", "prison", 47.0242, 23.9076, (1945, 1964)),
+    ("Sighet", "prison", 47.9281, 23.8886, (1948, 1977)),
+    ("Pitești", "prison", 44.8565, 24.8692, (1949, 1952)),
+    ("Aiud", "prison", 46.3089, 23.7189, (1945, 1989)),
+    ("Jilava", "prison", 44.3167, 26.1000, (1945, 1989)),
+    ("Râmnicu Sărat", "prison", 45.3808, 27.0533, (1949, 1963)),
+    ("Făgăraș", "prison", 45.8416, 24.9731, (1950, 1960)),
+    ("Botoșani", "prison", 47.7486, 26.6694, (1948, 1960)),
+    ("Craiova", "prison", 44.3302, 23.7949, (1948, 1964)),
+    ("Văcărești", "prison", 44.3990, 26.1300, (1945, 1977)),
+    ("Mislea", "prison", 45.0947, 25.8225, (1948, 1964)),
+    ("Miercurea Ciuc", "prison", 46.3595, 25.8017, (1950, 1964)),
+    ("Târgu Ocna", "prison", 46.2795, 26.6130, (1950, 1960)),
+    ("Suceava", "prison", 47.6514, 26.2556, (1948, 1960)),
+    ("Galați", "prison", 45.4353, 28.0080, (1948, 1964)),
+    ("Caransebeș", "prison", 45.4214, 22.2219, (1948, 1964)),
+    ("Oradea", "prison", 47.0465, 21.9189, (1948, 1964)),
+    ("Timișoara", "prison", 45.7489, 21.2087, (1948, 1964)),
+    ("Poarta Albă", "camp", 44.2167, 28.4000, (1949, 1953)),
+    ("Periprava", "camp", 45.4000, 29.5500, (1957, 1964)),
+    ("Salcia", "camp", 44.1333, 27.9333, (1952, 1964)),
+    ("Cernavodă", "camp", 44.3381, 28.0333, (1949, 1953)),
+    ("Capul Midia", "camp", 44.3333, 28.6167, (1950, 1953)),
+    ("Peninsula", "camp", 44.2500, 28.5500, (1950, 1953)),
+]
+
+FIRST_NAMES = [
+    "Ion", "Gheorghe", "Vasile", "Constantin", "Nicolae", "Petre", "Mihai", "Dumitru", "Alexandru",
+    "Ioan", "Teodor", "Valeriu", "Aurel", "Traian", "Emil", "Iuliu", "Corneliu", "Radu", "Virgil",
+    "Octavian", "Florea", "Ilie", "Grigore", "Victor", "Nichifor", "Maria", "Elena", "Ana", "Ioana",
+    "Aurelia", "Lucreția", "Elisabeta", "Aspazia", "Florica", "Zoe", "Victoria", "Silvia", "Eugenia",
+]
+LAST_NAMES = [
+    "Popescu", "Ionescu", "Popa", "Pop", "Radu", "Dumitrescu", "Stan", "Stoica", "Gheorghe", "Rusu",
+    "Munteanu", "Matei", "Constantinescu", "Marin", "Moldovan", "Mureșan", "Lazăr", "Ciobanu", "Florea",
+    "Ilie", "Mocanu", "Oprea", "Dinu", "Voicu", "Crăciun", "Manole", "Enache", "Bălan", "Tudor",
+    "Sârbu", "Cojocaru", "Niculescu", "Vlad", "Coman", "Preda", "Bucur", "Anghel", "Neagu", "Barbu",
+]
+PROFESSIONS = [
+    "Student", "Țăran", "Preot ortodox", "Preot greco-catolic", "Avocat", "Medic", "Profesor",
+    "Inginer", "Ofițer", "Învățător", "Scriitor", "Muncitor", "Om politic", "Funcționar", "Meșteșugar",
+]
+ACCUSATIONS = [
+    "uneltire contra ordinii sociale", "apartenență la o organizație subversivă", "trădare de patrie",
+    "sprijinirea partizanilor din munți", "omisiune de denunț", "agitație publică",
+    "răspândirea de manifeste", "legături cu emigrația",
+]
+BIOGRAPHY_SENTENCES = [
+    "S-a născut în anul {birth_year} într-o familie de {origin}.",
+    "A fost arestat în {arrest_year} și condamnat pentru {accusation}.",
+    "A trecut prin anchetele Securității, unde a fost supus bătăilor și privării de somn.",
+    "A executat o parte din pedeapsă la {prison}, în condiții de izolare severă.",
+    "Colegii de celulă își amintesc de el ca de un om blând, care împărțea puținul pe care îl avea.",
+    "A fost transferat de mai multe ori între închisori și lagăre de muncă.",
+    "Familia a fost deportată, iar bunurile i-au fost confiscate.",
+    "După eliberare a rămas sub supravegherea Securității până în 1989.",
+    "A lucrat la Canalul Dunăre-Marea Neagră, unde mulți deținuți au murit de epuizare.",
+    "Mărturia sa a fost înregistrată după 1990 de Fundația Academia Civică.",
+]
+TESTIMONY_SENTENCES = [
+    "Ne scoteau la anchetă noaptea, iar ziua nu aveam voie să dormim.",
+    "În celulă eram peste patruzeci de oameni, într-un spațiu gândit pentru opt.",
+    "Mâncarea era o zeamă de varză în care rareori găseai ceva.",
+    "Am învățat poezii pe de rost și le spuneam prin bătăi în perete, în alfabetul Morse.",
+    "La {prison} gardienii ne numărau de trei ori pe zi și ne pedepseau pentru orice.",
+    "Iarna geamurile erau sparte și dormeam îmbrăcați, lipiți unii de alții.",
+    "Un preot din celula vecină ne ținea slujba în șoaptă, în fiecare duminică.",
+    "Când am fost eliberat, în {release_year}, nu mi-am mai recunoscut satul.",
+    "Nu am aflat niciodată cine m-a denunțat.",
+    "Am scris aceste rânduri ca să nu se uite ce s-a întâmplat.",
+]
+DOCUMENT_TITLES = {
+    "sentence": "Sentința penală nr. {number}/{year} privind pe {name}",
+    "letter": "Scrisoare a lui {name} către familie",
+    "securitate_file": "Dosar de urmărire informativă {name}",
+    "photograph": "Fotografie de penitenciar - {name}",
+    "other": "Proces-verbal de percheziție - {name}",
+}
+ORIGINS = ["țărani", "preoți", "învățători", "meseriași", "funcționari", "negustori"]
+QR_CONTENT_TYPES = ["audio_story", "text", "ar_experience", "video"]
+QR_LOCATION_NAMES = ["Poarta principală", "Celula", "Curtea interioară", "Capela", "Atelierul", "Izolatorul", "Sala de anchetă"]
+
+BASE_DATE = datetime(2020, 1, 1)
+
+
+def _sentences(rng: random.Random, pool: list, count: int, **context) -> str:
+    return " ".join(sentence.format(**context) for sentence in rng.sample(pool, min(count, len(pool))))
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return BASE_DATE + timedelta(seconds=rng.randrange(5 * 365 * 24 * 3600))
+
+
+def _object_id(rng: random.Random) -> ObjectId:
+    """An ObjectId drawn from `rng`, so the same seed gives the same ids"""
+    return ObjectId(rng.getrandbits(96).to_bytes(12, 'big'))
+
+
+def _split(rng: random.Random, mean: float) -> int:
+    """A whole count that averages `mean`"""
+    whole = int(mean)
+    return whole + (rng.random() < mean - whole)
+
+
+def generate_prisons(rng: random.Random, count: int) -> list:
+    prisons = []
+    for i in range(count):
+        name, kind, lat, lng, years = SITES[i % len(SITES)]
+        # Sites beyond the list repeat with a suffix and a small offset
+        round_ = i // len(SITES)
+        suffix = f" {round_ + 1}" if round_ else ""
+        lat, lng = lat + rng.uniform(-0.05, 0.05) * bool(round_), lng + rng.uniform(-0.05, 0.05) * bool(round_)
+        created_at = _timestamp(rng)
+        coordinates = {"latitude": round(lat, 6), "longitude": round(lng, 6)}
+        prisons.append({
+            "_id": f"prison_{i:04d}",
+            "name": ("Lagărul " if kind == "camp" else "Penitenciarul ") + name + suffix,
+            "type": kind,
+            "coordinates": coordinates,
+            "location": geo_point(coordinates),
+            "description": f"Loc de detenție politică în perioada {years[0]}-{years[1]}. "
+                           + _sentences(rng, BIOGRAPHY_SENTENCES[5:9], 2, prison=name),
+            "history_timeline": [],
+            "operational_years": list(years),
+            "estimated_victims": rng.randint(200, 12000),
+            "images": [],
+            "qr_codes": [],
+            "audio_tour_tracks": generate_tour_tracks(rng, f"prison_{i:04d}", coordinates),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return prisons
+
+
+def generate_tour_tracks(rng: random.Random, prison_id: str, site: dict, count: int = 12) -> list:
+    """Audio tour stops scattered within about 150 m of the site"""
+    return [{
+        "id": f"{prison_id}_track_{i + 1:02d}",
+        "title": f"{rng.choice(QR_LOCATION_NAMES)} {i + 1}",
+        "duration": rng.randint(60, 600),
+        "audio_url": f"/api/media/{prison_id}/tour-{i + 1:02d}.mp3",
+        "location": {
+            "latitude": round(site["latitude"] + rng.uniform(-0.0014, 0.0014), 6),
+            "longitude": round(site["longitude"] + rng.uniform(-0.002, 0.002), 6),
+        },
+    } for i in range(count)]
+
+
+def generate_victim(rng: random.Random, index: int, prisons: list, testimonies_per_victim: float,
+                    documents_per_victim: float):
+    """A victim and the testimonies and documents that refer to it"""
+    prison = rng.choice(prisons)
+    start, end = prison["operational_years"]
+    arrest_year = rng.randint(start, max(start, end - 1))
+    release_year = min(end, arrest_year + rng.randint(1, 16))
+    birth_year = arrest_year - rng.randint(18, 60)
+    died_inside = rng.random() < 0.2
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    site = prison["name"].split(" ", 1)[1]
+    created_at = _timestamp(rng)
+    victim_id = f"victim_{index:08d}"
+
+    victim = {
+        "_id": victim_id,
+        "prison_id": prison["_id"],
+        "name": name,
+        "birth_year": birth_year,
+        "death_year": release_year if died_inside else min(2020, release_year + rng.randint(1, 50)),
+        "profession": rng.choice(PROFESSIONS),
+        "biography": _sentences(
+            rng, BIOGRAPHY_SENTENCES, rng.randint(3, 6),
+            birth_year=birth_year, origin=rng.choice(ORIGINS), arrest_year=arrest_year,
+            accusation=rng.choice(ACCUSATIONS), prison=site,
+        ),
+        "testimonies": [],
+        "imprisonment_period": {"start": str(arrest_year), "end": str(release_year)},
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+    testimonies = []
+    for _ in range(_split(rng, testimonies_per_victim)):
+        kind = rng.choices(["written", "audio", "video"], weights=[6, 3, 1])[0]
+        testimonies.append({
+            "_id": _object_id(rng),
+            "prison_id": prison["_id"],
+            "victim_id": victim_id,
+            "text": _sentences(rng, TESTIMONY_SENTENCES, rng.randint(4, 10), prison=site, release_year=release_year),
+            "audio_url": f"https://media.memorial-gherla.ro/audio/{victim_id}-{len(testimonies)}.mp3" if kind != "written" else None,
+            "source": rng.choice(["Fundația Academia Civică", "Arhiva de istorie orală", "Memorii publicate", "Interviu"]),
+            "year": rng.randint(1990, 2020),
+            "type": kind,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    documents = []
+    for _ in range(_split(rng, documents_per_victim)):
+        document_type = rng.choice(list(DOCUMENT_TITLES))
+        year = rng.randint(arrest_year, release_year)
+        documents.append({
+            "_id": _object_id(rng),
+            "title": DOCUMENT_TITLES[document_type].format(number=rng.randint(1, 999), year=year, name=name),
+            "document_type": document_type,
+            "scan_url": f"https://media.memorial-gherla.ro/scans/{victim_id}-{len(documents)}.pdf",
+            "transcription": _sentences(
+                rng, BIOGRAPHY_SENTENCES, rng.randint(5, 10),
+                birth_year=birth_year, origin=rng.choice(ORIGINS), arrest_year=arrest_year,
+                accusation=rng.choice(ACCUSATIONS), prison=site,
+            ) if document_type != "photograph" else None,
+            "prison_id": prison["_id"],
+            "victim_id": victim_id,
+            "year": year,
+            "description": f"Document din arhiva CNSAS privind pe {name}.",
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    victim["testimonies"] = [str(testimony["_id"]) for testimony in testimonies]
+    return victim, testimonies, documents
+
+
+def generate_qr_locations(rng: random.Random, prisons: list, per_prison: int) -> list:
+    """QR locations for each prison; also lists their codes in the prison's `qr_codes`"""
+    qr_locations = []
+    for prison in prisons:
+        prison["qr_codes"] = [f"QR-{prison['_id']}-{i:03d}" for i in range(per_prison)]
+        for i in range(per_prison):
+            created_at = _timestamp(rng)
+            location_name = f"{rng.choice(QR_LOCATION_NAMES)} {i + 1}"
+            content_type = rng.choice(QR_CONTENT_TYPES)
+            qr_locations.append({
+                "_id": _object_id(rng),
+                "qr_code": prison["qr_codes"][i],
+                "prison_id": prison["_id"],
+                "location_name": location_name,
+                "content_type": content_type,
+                "content_data": {
+                    "title": location_name,
+                    "text": _sentences(rng, TESTIMONY_SENTENCES, 2, prison=prison["name"], release_year=1964),
+                    "media_url": f"https://media.memorial-gherla.ro/qr/{prison['_id']}-{i:03d}",
+                },
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+    return qr_locations
+
+
+class ChunkedInserter:
+    """Buffers documents per collection and writes full chunks concurrently"""
+
+    def __init__(self, db, chunk_size: int, concurrency: int):
+        self.db = db
+        self.chunk_size = chunk_size
+        self._slots = asyncio.Semaphore(concurrency)
+        self._buffers = {}
+        self._tasks = set()
+        self.inserted = {}
+
+    async def _insert(self, collection: str, docs: list):
+        try:
+            await self.db[collection].insert_many(docs, ordered=False)
+            self.inserted[collection] = self.inserted.get(collection, 0) + len(docs)
+        finally:
+            self._slots.release()
+
+    async def _flush(self, collection: str):
+        docs = self._buffers.pop(collection, None)
+        if not docs:
+            return
+        await self._slots.acquire()
+        task = asyncio.create_task(self._insert(collection, docs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def add(self, collection: str, docs: list):
+        buffer = self._buffers.setdefault(collection, [])
+        buffer.extend(docs)
+        if len(buffer) >= self.chunk_size:
+            await self._flush(collection)
+
+    async def close(self):
+        for collection in list(self._buffers):
+            await self._flush(collection)
+        # Surface the first failed insert, if any
+        await asyncio.gather(*list(self._tasks))
+
+
+async def generate_dataset(
+    db,
+    prisons: int = 24,
+    victims: int = 100000,
+    testimonies_per_victim: float = 2.0,
+    documents_per_victim: float = 1.5,
+    qr_per_prison: int = 20,
+    seed: int = 1,
+    chunk_size: int = 1000,
+    concurrency: int = 8,
+    report_every: float = 5.0,
+) -> dict:
+    """Replace the content collections with a synthetic dataset; returns the row counts"""
+    rng = random.Random(seed)
+    for collection in ["prisons", "victims", "testimonies", "documents", "qr_locations"]:
+        await db[collection].delete_many({})
+
+    started = time.perf_counter()
+    inserter = ChunkedInserter(db, chunk_size, concurrency)
+
+    prison_docs = generate_prisons(rng, prisons)
+    qr_locations = generate_qr_locations(rng, prison_docs, qr_per_prison)
+    await inserter.add("prisons", prison_docs)
+    await inserter.add("qr_locations", qr_locations)
+
+    last_report = started
+    for index in range(victims):
+        victim, testimonies, documents = generate_victim(
+            rng, index, prison_docs, testimonies_per_victim, documents_per_victim
+        )
+        await inserter.add("victims", [victim])
+        await inserter.add("testimonies", testimonies)
+        await inserter.add("documents", documents)
+
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            total = sum(inserter.inserted.values())
+            print(f"   {index + 1:,}/{victims:,} victims generated, {total:,} rows written "
+                  f"({total / (now - started):,.0f} rows/s)")
+
+    await inserter.close()
+    elapsed = time.perf_counter() - started
+    total = sum(inserter.inserted.values())
+    for collection, count in inserter.inserted.items():
+        print(f"✅ Generated {count:,} {collection}")
+    print(f"✅ Wrote {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    return dict(inserter.inserted)
+
+
+async def generate_database(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    print(f"🌱 Generating synthetic dataset (seed {args.seed})...")
+    await generate_dataset(
+        db,
+        prisons=args.prisons,
+        victims=args.victims,
+        testimonies_per_victim=args.testimonies_per_victim,
+        documents_per_victim=args.documents_per_victim,
+        qr_per_prison=args.qr_per_prison,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        concurrency=args.concurrency,
+    )
+    await backfill_updated_at(db)
+    await ensure_indexes(db)
+    print("✅ Created indexes")
+    await rebuild_timeline(db)
+
+    client.close()
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    parser = argparse.ArgumentParser(description="Seed the database with sample or synthetic data")
+    parser.add_argument('--generate', action='store_true', help="generate a synthetic dataset instead of the sample data")
+    parser.add_argument('--prisons', type=int, default=24)
+    parser.add_argument('--victims', type=int, default=100000)
+    parser.add_argument('--testimonies-per-victim', type=float, default=2.0)
+    parser.add_argument('--documents-per-victim', type=float, default=1.5)
+    parser.add_argument('--qr-per-prison', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.generate:
+        asyncio.run(generate_database(args))
+    else:
+        asyncio.run(seed_database())
@@ -0,0 +1,93 @@
+"""
+Fast JSON path for documents read from our own database.
+
+Documents in Mongo were validated when they were written, so read routes
+don't need to run them through Pydantic again. `fast_dump` shapes a raw
+document like its response model would (aliases, defaults, nested models,
+dropping unknown fields) in one pass without validating, and orjson encodes
+the result, converting ObjectIds and datetimes on the way.
+"""
+import functools
+import typing
+from typing import FrozenSet, Iterable, Optional, Type
+
+import orjson
+from bson import ObjectId
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+from metrics import SERIALIZE_LATENCY
+
+
+class JSONBody(bytes):
+    """Pre-encoded JSON returned by a handler"""
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode(obj) -> JSONBody:
+    return JSONBody(orjson.dumps(obj, default=_default))
+
+
+def dumps(obj) -> JSONBody:
+    with SERIALIZE_LATENCY.time():
+        return _encode(obj)
+
+
+def _shaper(annotation):
+    """How to shape a stored value for `annotation`, or None to pass it through"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return functools.partial(fast_dump, annotation)
+    origin = typing.get_origin(annotation)
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if origin is typing.Union and len(args) == 1:
+        inner = _shaper(args[0])
+        return (lambda value: None if value is None else inner(value)) if inner else None
+    if origin in (list, typing.List) and args:
+        inner = _shaper(args[0])
+        return (lambda value: [inner(v) for v in value]) if inner else None
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> tuple:
+    plan = []
+    for name, field in model.model_fields.items():
+        default = None if field.default is PydanticUndefined else field.default
+        plan.append((field.alias or name, default, field.default_factory, _shaper(field.annotation)))
+    return tuple(plan)
+
+
+def fast_dump(model: Type[BaseModel], doc: dict, keys: Optional[FrozenSet[str]] = None) -> dict:
+    """Shape a trusted stored document like `model(**doc)` would, unvalidated"""
+    out = {}
+    for key, default, factory, shape in _plan(model):
+        if keys is not None and key not in keys:
+            continue
+        if key in doc:
+            value = doc[key]
+            if shape is not None and value is not None:
+                value = shape(value)
+        else:
+            value = factory() if factory else default
+        out[key] = value
+    return out
+
+
+def encode_items(model: Type[BaseModel], docs: Iterable[dict]) -> JSONBody:
+    with SERIALIZE_LATENCY.time():
+        return _encode([fast_dump(model, doc) for doc in docs])
+
+
+def encode_page(
+    model: Type[BaseModel],
+    docs: Iterable[dict],
+    next_cursor: Optional[str],
+    keys: Optional[FrozenSet[str]] = None
+) -> JSONBody:
+    with SERIALIZE_LATENCY.time():
+        return _encode({'items': [fast_dump(model, doc, keys) for doc in docs], 'next_cursor': next_cursor})
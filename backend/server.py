@@ -1,33 +1,149 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, Body, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
 import os
+import asyncio
+import httpx
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 from models import (
-    Prison, PrisonCreate,
-    Victim, VictimCreate,
-    Testimony, TestimonyCreate,
-    Document, DocumentCreate,
-    HistoricalEvent, HistoricalEventCreate,
+    Prison, PrisonCreate, NearbyPrison, PrisonSummary,
+    Victim, VictimCreate, VictimSummary,
+    Testimony, TestimonyCreate, TestimonySummary,
+    Document, DocumentCreate, DocumentSummary,
+    HistoricalEvent, HistoricalEventCreate, TimelineEntry,
     AppEvent, AppEventCreate,
-    QRScanRequest, QRScanResponse
+    QRScanRequest, QRScanResponse, QRBatchScanRequest, QRBatchScanResponse,
+    SearchResponse, Page, PrisonDetail, SyncBundle, TrackLocateResponse,
+    BulkResult, BatchGetRequest, BatchGetResponse
 )
+from pagination import fetch_page
+from filters import (
+    prison_filter, victim_filter, testimony_filter, document_filter,
+    historical_event_filter, timeline_filter, app_event_filter, QUERY_FILTERS
+)
+from export import stream_ndjson
+from bulk import bulk_insert, new_victim_doc, new_testimony_doc, new_document_doc, BULK_MAX_ITEMS
+from batch import fetch_by_ids, parse_ids
+from serialization import dumps, fast_dump, encode_items, encode_page
+from projections import resolve_fields
+from qr import QRTable
+from events import UpcomingEvents, migrate_event_dates
+from tours import TrackIndex
+from media import create_media_store, media_response
+from indexes import ensure_indexes
+from cache import ResponseCache
+from compression import CompressionMiddleware
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render as render_metrics, sample_loop_lag
+from database import client_options, create_client, ping, run_migrations, warm_up
+from geo import geo_point, parse_bbox, bbox_polygon, geo_near_pipeline, backfill_prison_locations, snap_position
+from search import SEARCH_FIELDS, search_text
+from sync import SYNC_COLLECTIONS, build_bundle, backfill_updated_at, to_naive_utc
+from timeline import backfill_timeline_dates, rebuild_timeline, sync_event, sync_prison, with_date_range
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened in the app lifespan
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = None
+db = None
+media_store = None
+
+# Response cache for read endpoints
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 1024)),
+    ttl=float(os.environ.get('CACHE_TTL_SECONDS', 300)),
+    max_age=int(os.environ.get('CACHE_CONTROL_MAX_AGE', 60))
+)
+
+# In-memory QR code table, refreshed in the background
+qr_table = QRTable()
+QR_REFRESH_SECONDS = float(os.environ.get('QR_REFRESH_SECONDS', 30))
+
+# Precomputed first page of upcoming events, refreshed in the background
+upcoming_events = UpcomingEvents()
+UPCOMING_REFRESH_SECONDS = float(os.environ.get('UPCOMING_REFRESH_SECONDS', 60))
+
+# Grid index over located audio tour tracks, refreshed in the background
+track_index = TrackIndex()
+TRACKS_REFRESH_SECONDS = float(os.environ.get('TRACKS_REFRESH_SECONDS', 60))
+
+# Server-side time budget for composed payloads
+PRISON_DETAIL_BUDGET = float(os.environ.get('PRISON_DETAIL_BUDGET_MS', 800)) / 1000
+
+# Read routes requested in-process at startup so their first real request is a cache hit
+WARM_PATHS = [
+    path for path in os.environ.get(
+        'WARM_PATHS', '/api/prisons,/api/historical-timeline,/api/events?upcoming=true'
+    ).split(',') if path
+]
+
+HEALTH_PING_TIMEOUT = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', 2))
+
+# One-off data migrations; each runs on the first start against a database
+STARTUP_MIGRATIONS = [
+    ('prison_locations', backfill_prison_locations),
+    ('updated_at', lambda db: backfill_updated_at(db, SYNC_COLLECTIONS + ['qr_locations'])),
+    ('timeline_dates', backfill_timeline_dates),
+    ('event_dates', migrate_event_dates),
+    ('timeline', rebuild_timeline),
+]
+
+# The write routes keep the timeline current; set this after editing data outside the API
+REBUILD_TIMELINE_ON_STARTUP = os.environ.get('REBUILD_TIMELINE_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+async def prime_caches(app: FastAPI):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as warmup:
+        for path in WARM_PATHS:
+            try:
+                response = await warmup.get(path)
+                if response.status_code != 200:
+                    logger.warning(f"Warm-up request {path} returned {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Warm-up request {path} failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db, media_store
+    app.state.ready = False
+    client = create_client(mongo_url)
+    db = client[os.environ['DB_NAME']]
+    media_store = create_media_store(db)
+    background = []
+
+    try:
+        await warm_up(db, client_options().get('minPoolSize', 0))
+        await run_migrations(db, STARTUP_MIGRATIONS)
+        await ensure_indexes(db)
+        if REBUILD_TIMELINE_ON_STARTUP:
+            await rebuild_timeline(db)
+        await qr_table.load(db)
+        background.append(asyncio.create_task(qr_table.run_refresher(db, QR_REFRESH_SECONDS)))
+        await upcoming_events.load(db)
+        background.append(asyncio.create_task(upcoming_events.run_refresher(db, UPCOMING_REFRESH_SECONDS)))
+        await track_index.load(db)
+        background.append(asyncio.create_task(track_index.run_refresher(db, TRACKS_REFRESH_SECONDS)))
+        background.append(asyncio.create_task(sample_loop_lag()))
+        await prime_caches(app)
+        app.state.ready = True
+        logger.info("Ready to serve")
+        yield
+    finally:
+        app.state.ready = False
+        for task in background:
+            task.cancel()
+        client.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Memorial Gherla API")
+app = FastAPI(title="Memorial Gherla API", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -39,33 +155,111 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Helper function to convert MongoDB _id
-def serialize_doc(doc):
-    if doc and '_id' in doc:
-        doc['_id'] = str(doc['_id'])
-    return doc
+# Shared by the batch routes
+async def get_by_ids(collection: str, ids: List[str], fields: Optional[str]):
+    """Encoded batch-get response; detail lookups default to the full model"""
+    projection = resolve_fields(collection, fields or 'all')
+    docs, missing = await fetch_by_ids(db[collection], parse_ids(ids), projection.mongo)
+    return dumps({
+        'items': [fast_dump(projection.model, doc, projection.keys) for doc in docs],
+        'missing': missing,
+    })
 
 # ==================== PRISONS ====================
-@api_router.get("/prisons", response_model=List[Prison])
+@api_router.get("/prisons", response_model=Page[Union[PrisonSummary, Prison]])
+@response_cache.cached('prisons')
 async def get_prisons(
     type: Optional[str] = None,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
     """Get all prisons with optional filtering"""
-    query = {}
-    if type:
-        query['type'] = type
-    
-    prisons = await db.prisons.find(query).limit(limit).to_list(length=limit)
-    return [Prison(**serialize_doc(p)) for p in prisons]
+    query = prison_filter(type)
+    projection = resolve_fields('prisons', fields)
+    prisons, next_cursor = await fetch_page(db.prisons, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, prisons, next_cursor, projection.keys)
+
+@api_router.get("/prisons/near", response_model=List[NearbyPrison])
+@response_cache.cached('prisons', normalize=snap_position)
+async def get_prisons_near(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius: float = Query(default=50000, gt=0, le=2000000),
+    limit: int = Query(default=100, ge=1, le=100)
+):
+    """Get prisons within `radius` meters of a point, nearest first"""
+    pipeline = geo_near_pipeline(lng, lat, limit, max_distance=radius, projection=resolve_fields('prisons', None).mongo)
+    prisons = await db.prisons.aggregate(pipeline).to_list(length=limit)
+    return encode_items(NearbyPrison, prisons)
+
+@api_router.get("/prisons/within", response_model=List[NearbyPrison])
+@response_cache.cached('prisons', normalize=snap_position)
+async def get_prisons_within(
+    bbox: str = Query(description="min_lng,min_lat,max_lng,max_lat"),
+    limit: int = Query(default=100, ge=1, le=100)
+):
+    """Get prisons inside a bounding box, nearest to its center first"""
+    min_lng, min_lat, max_lng, max_lat = parse_bbox(bbox)
+    query = {'location': {'$geoWithin': {'$geometry': bbox_polygon(min_lng, min_lat, max_lng, max_lat)}}}
+    center_lng, center_lat = (min_lng + max_lng) / 2, (min_lat + max_lat) / 2
+    pipeline = geo_near_pipeline(center_lng, center_lat, limit, query=query, projection=resolve_fields('prisons', None).mongo)
+    prisons = await db.prisons.aggregate(pipeline).to_list(length=limit)
+    return encode_items(NearbyPrison, prisons)
 
 @api_router.get("/prisons/{prison_id}", response_model=Prison)
+@response_cache.cached('prisons')
 async def get_prison(prison_id: str):
     """Get a specific prison by ID"""
     prison = await db.prisons.find_one({"_id": prison_id})
     if not prison:
         raise HTTPException(status_code=404, detail="Prison not found")
-    return Prison(**serialize_doc(prison))
+    return dumps(fast_dump(Prison, prison))
+
+@api_router.get("/prisons/{prison_id}/full", response_model=PrisonDetail)
+@response_cache.cached('prisons', 'victims', 'testimonies', 'documents')
+async def get_prison_full(
+    prison_id: str,
+    victims_limit: int = Query(default=20, ge=1, le=100),
+    testimonies_limit: int = Query(default=20, ge=1, le=100),
+    documents_limit: int = Query(default=20, ge=1, le=100)
+):
+    """Get a prison with its victims, testimonies and documents in one call"""
+    deadline = asyncio.get_running_loop().time() + PRISON_DETAIL_BUDGET
+    query = {'prison_id': prison_id}
+    sections = {
+        'victims': asyncio.create_task(fetch_page(db.victims, query, victims_limit)),
+        'testimonies': asyncio.create_task(fetch_page(db.testimonies, query, testimonies_limit)),
+        'documents': asyncio.create_task(fetch_page(db.documents, query, documents_limit)),
+    }
+    pending = set(sections.values())
+    try:
+        prison = await db.prisons.find_one({"_id": prison_id})
+        if not prison:
+            raise HTTPException(status_code=404, detail="Prison not found")
+        timeout = max(0, deadline - asyncio.get_running_loop().time())
+        _, pending = await asyncio.wait(pending, timeout=timeout)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    models = {'victims': Victim, 'testimonies': Testimony, 'documents': Document}
+    detail = {'prison': fast_dump(Prison, prison)}
+    incomplete = []
+    for name, task in sections.items():
+        if task in pending:
+            incomplete.append(name)
+            detail[name] = {'items': [], 'next_cursor': None}
+            continue
+        docs, next_cursor = task.result()
+        detail[name] = {'items': [fast_dump(models[name], d) for d in docs], 'next_cursor': next_cursor}
+    detail['incomplete'] = incomplete
+
+    if incomplete:
+        # Don't cache a payload that ran out of time budget
+        logger.warning(f"Prison detail for {prison_id} exceeded budget: {', '.join(incomplete)}")
+        return Response(content=dumps(detail), media_type='application/json')
+    return dumps(detail)
 
 @api_router.post("/prisons", response_model=Prison)
 async def create_prison(prison: PrisonCreate):
@@ -77,178 +271,339 @@ async def create_prison(prison: PrisonCreate):
     prison_dict['images'] = []
     prison_dict['qr_codes'] = []
     prison_dict['audio_tour_tracks'] = []
+    prison_dict['location'] = geo_point(prison_dict['coordinates'])
+    for entry in prison_dict['history_timeline']:
+        with_date_range(entry)
     
     result = await db.prisons.insert_one(prison_dict)
+    await sync_prison(db, prison_dict)
+    track_index.put_prison(prison_dict)
+    response_cache.invalidate('prisons')
     prison_dict['_id'] = str(result.inserted_id)
     return Prison(**prison_dict)
 
 # ==================== VICTIMS ====================
-@api_router.get("/victims", response_model=List[Victim])
+@api_router.get("/victims", response_model=Page[Union[VictimSummary, Victim]])
+@response_cache.cached('victims')
 async def get_victims(
     prison_id: Optional[str] = None,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
     """Get all victims with optional filtering by prison"""
-    query = {}
-    if prison_id:
-        query['prison_id'] = prison_id
-    
-    victims = await db.victims.find(query).limit(limit).to_list(length=limit)
-    return [Victim(**serialize_doc(v)) for v in victims]
+    query = victim_filter(prison_id)
+    projection = resolve_fields('victims', fields)
+    victims, next_cursor = await fetch_page(db.victims, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, victims, next_cursor, projection.keys)
+
+@api_router.get("/victims/batch", response_model=BatchGetResponse[Victim])
+@response_cache.cached('victims')
+async def get_victims_batch(ids: str, fields: Optional[str] = None):
+    """Several victims by id (`ids=a,b,c`), in request order"""
+    return await get_by_ids('victims', ids.split(','), fields)
+
+@api_router.post("/victims/batch", response_model=BatchGetResponse[Victim])
+async def post_victims_batch(request: BatchGetRequest, fields: Optional[str] = None):
+    """Several victims by id, for id lists too long for a URL"""
+    return Response(content=await get_by_ids('victims', request.ids, fields), media_type='application/json')
 
 @api_router.get("/victims/{victim_id}", response_model=Victim)
+@response_cache.cached('victims')
 async def get_victim(victim_id: str):
     """Get a specific victim by ID"""
     victim = await db.victims.find_one({"_id": victim_id})
     if not victim:
         raise HTTPException(status_code=404, detail="Victim not found")
-    return Victim(**serialize_doc(victim))
+    return dumps(fast_dump(Victim, victim))
 
 @api_router.post("/victims", response_model=Victim)
 async def create_victim(victim: VictimCreate):
     """Create a new victim"""
-    victim_dict = victim.model_dump()
-    victim_dict['_id'] = victim_dict['name'].lower().replace(' ', '_')
-    victim_dict['created_at'] = datetime.utcnow()
-    victim_dict['updated_at'] = datetime.utcnow()
-    victim_dict['testimonies'] = []
+    victim_dict = new_victim_doc(victim)
     
     result = await db.victims.insert_one(victim_dict)
+    response_cache.invalidate('victims')
     victim_dict['_id'] = str(result.inserted_id)
     return Victim(**victim_dict)
 
+@api_router.post("/victims/bulk", response_model=BulkResult)
+async def create_victims_bulk(items: List[dict] = Body(max_length=BULK_MAX_ITEMS)):
+    """Create many victims at once, reporting success or failure per item"""
+    result = await bulk_insert(db.victims, items, VictimCreate, new_victim_doc)
+    response_cache.invalidate('victims')
+    return BulkResult(**result)
+
 # ==================== TESTIMONIES ====================
-@api_router.get("/testimonies", response_model=List[Testimony])
+@api_router.get("/testimonies", response_model=Page[Union[TestimonySummary, Testimony]])
+@response_cache.cached('testimonies')
 async def get_testimonies(
     prison_id: Optional[str] = None,
     victim_id: Optional[str] = None,
     type: Optional[str] = None,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
     """Get all testimonies with optional filtering"""
-    query = {}
-    if prison_id:
-        query['prison_id'] = prison_id
-    if victim_id:
-        query['victim_id'] = victim_id
-    if type:
-        query['type'] = type
-    
-    testimonies = await db.testimonies.find(query).limit(limit).to_list(length=limit)
-    return [Testimony(**serialize_doc(t)) for t in testimonies]
+    query = testimony_filter(prison_id, victim_id, type)
+    projection = resolve_fields('testimonies', fields)
+    testimonies, next_cursor = await fetch_page(db.testimonies, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, testimonies, next_cursor, projection.keys)
+
+@api_router.get("/testimonies/batch", response_model=BatchGetResponse[Testimony])
+@response_cache.cached('testimonies')
+async def get_testimonies_batch(ids: str, fields: Optional[str] = None):
+    """Several testimonies by id (`ids=a,b,c`), in request order"""
+    return await get_by_ids('testimonies', ids.split(','), fields)
+
+@api_router.post("/testimonies/batch", response_model=BatchGetResponse[Testimony])
+async def post_testimonies_batch(request: BatchGetRequest, fields: Optional[str] = None):
+    """Several testimonies by id, for id lists too long for a URL"""
+    return Response(content=await get_by_ids('testimonies', request.ids, fields), media_type='application/json')
 
 @api_router.post("/testimonies", response_model=Testimony)
 async def create_testimony(testimony: TestimonyCreate):
     """Create a new testimony"""
-    testimony_dict = testimony.model_dump()
-    testimony_dict['created_at'] = datetime.utcnow()
+    testimony_dict = new_testimony_doc(testimony)
     
     result = await db.testimonies.insert_one(testimony_dict)
+    response_cache.invalidate('testimonies')
     testimony_dict['_id'] = str(result.inserted_id)
     return Testimony(**testimony_dict)
 
+@api_router.post("/testimonies/bulk", response_model=BulkResult)
+async def create_testimonies_bulk(items: List[dict] = Body(max_length=BULK_MAX_ITEMS)):
+    """Create many testimonies at once, reporting success or failure per item"""
+    result = await bulk_insert(db.testimonies, items, TestimonyCreate, new_testimony_doc)
+    response_cache.invalidate('testimonies')
+    return BulkResult(**result)
+
 # ==================== DOCUMENTS ====================
-@api_router.get("/documents", response_model=List[Document])
+@api_router.get("/documents", response_model=Page[Union[DocumentSummary, Document]])
+@response_cache.cached('documents')
 async def get_documents(
     type: Optional[str] = None,
     prison_id: Optional[str] = None,
     victim_id: Optional[str] = None,
     year_from: Optional[int] = None,
     year_to: Optional[int] = None,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
     """Get all documents with optional filtering"""
-    query = {}
-    if type:
-        query['document_type'] = type
-    if prison_id:
-        query['prison_id'] = prison_id
-    if victim_id:
-        query['victim_id'] = victim_id
-    if year_from or year_to:
-        query['year'] = {}
-        if year_from:
-            query['year']['$gte'] = year_from
-        if year_to:
-            query['year']['$lte'] = year_to
-    
-    documents = await db.documents.find(query).limit(limit).to_list(length=limit)
-    return [Document(**serialize_doc(d)) for d in documents]
+    query = document_filter(type, prison_id, victim_id, year_from, year_to)
+    projection = resolve_fields('documents', fields)
+    documents, next_cursor = await fetch_page(db.documents, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, documents, next_cursor, projection.keys)
+
+@api_router.get("/documents/batch", response_model=BatchGetResponse[Document])
+@response_cache.cached('documents')
+async def get_documents_batch(ids: str, fields: Optional[str] = None):
+    """Several documents by id (`ids=a,b,c`), in request order"""
+    return await get_by_ids('documents', ids.split(','), fields)
+
+@api_router.post("/documents/batch", response_model=BatchGetResponse[Document])
+async def post_documents_batch(request: BatchGetRequest, fields: Optional[str] = None):
+    """Several documents by id, for id lists too long for a URL"""
+    return Response(content=await get_by_ids('documents', request.ids, fields), media_type='application/json')
 
 @api_router.post("/documents", response_model=Document)
 async def create_document(document: DocumentCreate):
     """Create a new document"""
-    document_dict = document.model_dump()
-    document_dict['created_at'] = datetime.utcnow()
+    document_dict = new_document_doc(document)
     
     result = await db.documents.insert_one(document_dict)
+    response_cache.invalidate('documents')
     document_dict['_id'] = str(result.inserted_id)
     return Document(**document_dict)
 
+@api_router.post("/documents/bulk", response_model=BulkResult)
+async def create_documents_bulk(items: List[dict] = Body(max_length=BULK_MAX_ITEMS)):
+    """Create many documents at once, reporting success or failure per item"""
+    result = await bulk_insert(db.documents, items, DocumentCreate, new_document_doc)
+    response_cache.invalidate('documents')
+    return BulkResult(**result)
+
 # ==================== HISTORICAL EVENTS ====================
-@api_router.get("/historical-timeline", response_model=List[HistoricalEvent])
+@api_router.get("/historical-timeline", response_model=Page[HistoricalEvent])
+@response_cache.cached('historical_events')
 async def get_historical_timeline(
     category: Optional[str] = None,
-    limit: int = Query(default=100, le=100)
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
-    """Get historical timeline events"""
-    query = {}
-    if category:
-        query['category'] = category
-    
-    events = await db.historical_events.find(query).sort("date", 1).limit(limit).to_list(length=limit)
-    return [HistoricalEvent(**serialize_doc(e)) for e in events]
+    """Get historical timeline events in chronological order"""
+    query = historical_event_filter(category, year_from, year_to)
+    projection = resolve_fields('historical_events', fields)
+    events, next_cursor = await fetch_page(db.historical_events, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, events, next_cursor, projection.keys)
 
 @api_router.post("/historical-timeline", response_model=HistoricalEvent)
 async def create_historical_event(event: HistoricalEventCreate):
     """Create a new historical event"""
-    event_dict = event.model_dump()
+    event_dict = with_date_range(event.model_dump())
     event_dict['created_at'] = datetime.utcnow()
+    event_dict['updated_at'] = datetime.utcnow()
     
     result = await db.historical_events.insert_one(event_dict)
+    await sync_event(db, event_dict)
+    response_cache.invalidate('historical_events')
     event_dict['_id'] = str(result.inserted_id)
     return HistoricalEvent(**event_dict)
 
+@api_router.get("/timeline", response_model=Page[TimelineEntry])
+@response_cache.cached('historical_events', 'prisons')
+async def get_timeline(
+    category: Optional[str] = None,
+    prison_id: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Global historical events merged with every prison's own timeline, in chronological order"""
+    query = timeline_filter(category, prison_id, year_from, year_to)
+    entries, next_cursor = await fetch_page(db.timeline, query, limit, cursor)
+    return encode_page(TimelineEntry, entries, next_cursor)
+
 # ==================== APP EVENTS ====================
-@api_router.get("/events", response_model=List[AppEvent])
+@api_router.get("/events", response_model=Page[AppEvent])
 async def get_events(
+    request: Request,
     upcoming: bool = False,
-    limit: int = Query(default=100, le=100)
+    limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="summary (default), all, or a comma-separated field list")
 ):
     """Get app events (commemorations, conferences, etc.)"""
-    query = {}
-    if upcoming:
-        query['date'] = {'$gte': datetime.utcnow().isoformat()}
-    
-    events = await db.app_events.find(query).sort("date", 1).limit(limit).to_list(length=limit)
-    return [AppEvent(**serialize_doc(e)) for e in events]
+    if upcoming and cursor is None and fields is None:
+        # Home screen list: served from the precomputed window, ahead of the response cache
+        return Response(content=upcoming_events.body(limit), media_type='application/json')
+    return await list_events(http_request=request, upcoming=upcoming, limit=limit, cursor=cursor, fields=fields)
+
+@response_cache.cached('app_events')
+async def list_events(upcoming: bool, limit: int, cursor: Optional[str], fields: Optional[str]):
+    query = app_event_filter(upcoming)
+    projection = resolve_fields('app_events', fields)
+    events, next_cursor = await fetch_page(db.app_events, query, limit, cursor, projection.mongo)
+    return encode_page(projection.model, events, next_cursor, projection.keys)
 
 @api_router.post("/events", response_model=AppEvent)
 async def create_event(event: AppEventCreate):
     """Create a new app event"""
     event_dict = event.model_dump()
     event_dict['created_at'] = datetime.utcnow()
+    event_dict['updated_at'] = datetime.utcnow()
+    
+    event_dict['date'] = to_naive_utc(event_dict['date'])
     
     result = await db.app_events.insert_one(event_dict)
+    await upcoming_events.load(db)
+    response_cache.invalidate('app_events')
     event_dict['_id'] = str(result.inserted_id)
     return AppEvent(**event_dict)
 
+# ==================== SEARCH ====================
+@api_router.get("/search", response_model=SearchResponse)
+@response_cache.cached('victims', 'testimonies', 'documents')
+async def search(
+    q: str = Query(min_length=2, max_length=200),
+    collections: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100)
+):
+    """Ranked full-text search across victims, testimonies and documents"""
+    targets = list(SEARCH_FIELDS)
+    if collections:
+        targets = [c.strip() for c in collections.split(',') if c.strip()]
+        unknown = [c for c in targets if c not in SEARCH_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+
+    hits = await search_text(db, q, targets, limit)
+    return SearchResponse(query=q, hits=hits)
+
+# ==================== SYNC ====================
+@api_router.get("/sync", response_model=SyncBundle)
+async def sync(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=1000, ge=1, le=5000)
+):
+    """Records written since `since`, or a full snapshot on first launch"""
+    bundle = await build_bundle(db, to_naive_utc(since) if since else None, cursor, limit)
+    # Compressed by CompressionMiddleware when the client accepts it
+    return Response(content=dumps(bundle), media_type='application/json', headers={'Cache-Control': 'no-store'})
+
+# ==================== EXPORT ====================
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    request: Request,
+    compress: bool = Query(default=False, alias='gzip'),
+    batch_size: int = Query(default=1000, ge=100, le=10000)
+):
+    """Stream a whole collection as NDJSON, filtered like its list endpoint"""
+    query_filter = QUERY_FILTERS.get(collection)
+    if query_filter is None:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+
+    params = {k: v for k, v in request.query_params.items() if k in query_filter.params}
+    try:
+        query = query_filter.build(**params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    cursor = db[collection].find(query)
+    filename = f"{collection}.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_ndjson(cursor, batch_size, compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+# ==================== MEDIA ====================
+@api_router.api_route("/media/{name:path}", methods=["GET", "HEAD"])
+async def get_media(name: str, request: Request):
+    """Stream an audio track, recording or scan; supports Range requests for seeking"""
+    return await media_response(media_store, name, request)
+
+# ==================== AUDIO TOURS ====================
+@api_router.get("/tours/locate", response_model=TrackLocateResponse)
+async def locate_track(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius: float = Query(default=30, gt=0, le=500),
+    heading: Optional[float] = Query(default=None, ge=0, lt=360, description="compass heading in degrees"),
+    played: Optional[str] = Query(default=None, description="comma-separated ids of tracks already played"),
+    prison_id: Optional[str] = None
+):
+    """The audio tour track to play at a visitor's position, if one is within `radius` meters"""
+    # Served from the in-memory grid; polled continuously by every visitor on a tour
+    played_ids = [t for t in played.split(',') if t] if played else ()
+    match = track_index.locate(lat, lng, radius, heading, played_ids, prison_id)
+    return Response(content=track_index.body(match), media_type='application/json')
+
 # ==================== QR CODE SCANNING ====================
 @api_router.post("/qr/scan", response_model=QRScanResponse)
 async def scan_qr_code(request: QRScanRequest):
     """Validate QR code and return content"""
-    # Look up QR code in database
-    qr_location = await db.qr_locations.find_one({"qr_code": request.qr_code})
-    
-    if not qr_location:
-        return QRScanResponse(valid=False)
-    
-    return QRScanResponse(
-        valid=True,
-        content_type=qr_location.get('content_type'),
-        content_data=qr_location.get('content_data'),
-        location_name=qr_location.get('location_name')
-    )
+    # Served from the in-memory table, no database round trip
+    return Response(content=qr_table.body(request.qr_code), media_type='application/json')
+
+@api_router.post("/qr/scan/batch", response_model=QRBatchScanResponse)
+async def scan_qr_codes(request: QRBatchScanRequest):
+    """Validate several QR codes at once"""
+    return QRBatchScanResponse(results=qr_table.lookup_many(request.qr_codes))
+
+@api_router.get("/qr/prisons/{prison_id}", response_model=QRBatchScanResponse)
+async def get_prison_qr_codes(prison_id: str):
+    """Every QR code in a prison, for prefetching before a visit"""
+    return QRBatchScanResponse(results=qr_table.for_prison(prison_id))
 
 # ==================== HEALTH CHECK ====================
 @api_router.get("/")
@@ -269,6 +624,29 @@ async def health_check():
         logger.error(f"Health check failed: {e}")
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
+@api_router.get("/health/live")
+async def liveness_check():
+    """The process is up and its event loop is answering"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Startup has finished (pool open, caches primed) and the database answers"""
+    if not getattr(app.state, 'ready', False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if not await ping(db, HEALTH_PING_TIMEOUT):
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": "disconnected"})
+    return {"status": "ready", "database": "connected"}
+
+@api_router.get("/cache/stats")
+async def cache_stats():
+    return response_cache.stats()
+
+@api_router.get("/metrics")
+async def metrics():
+    """Request, Mongo and event loop metrics in Prometheus text format"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -280,6 +658,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+app.add_middleware(CompressionMiddleware)
+
+app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,59 @@
+"""
+Request coalescing for identical concurrent reads.
+
+When hundreds of identical requests arrive together (a school group opening
+the same prison page, a push notification about a commemoration) only the
+first one runs the handler; the rest wait for its result instead of each
+sending the same query to Mongo. The shared call runs as its own task, so a
+client disconnecting doesn't cancel it for everyone else waiting on it.
+
+Calls are tagged with the collections they read. A write forgets the calls
+in flight for its collection, so requests that arrive after the write start
+a fresh call instead of joining one that may have read the old data.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from metrics import SINGLEFLIGHT_REQUESTS
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[asyncio.Task, Tuple[str, ...]]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable], tags: Tuple[str, ...] = (), label: str = ''):
+        """Run `fn()`, or wait for the identical call already in flight"""
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            SINGLEFLIGHT_REQUESTS.inc(label, 'coalesced')
+            return await asyncio.shield(call[0])
+
+        self.leaders += 1
+        SINGLEFLIGHT_REQUESTS.inc(label, 'leader')
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = (task, tags)
+        task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def forget(self, tag: str):
+        """Stop new requests from joining calls in flight that read `tag`"""
+        stale = [key for key, (_, tags) in self._calls.items() if tag in tags]
+        for key in stale:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
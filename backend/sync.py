@@ -0,0 +1,121 @@
+"""
+Delta sync for offline-capable clients.
+
+Every synced collection keeps an indexed `updated_at`. A client sends the high
+water mark from its previous sync and gets back everything written since,
+across all collections, in one compact bundle. Without `since` the bundle is a
+full snapshot used on first launch.
+
+Large change sets are split into batches: while `has_more` is set the client
+calls again with the returned `cursor`, which walks each collection by
+(`updated_at`, `_id`) so rows sharing a millisecond are never skipped or
+repeated. The final batch carries the high water mark for the next sync.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+
+from pagination import check_cursor_values, cursor_filter, decode_token, encode_token
+
+SYNC_COLLECTIONS = ['prisons', 'victims', 'testimonies', 'documents', 'historical_events', 'app_events']
+
+SYNC_KEYS = ('updated_at', '_id')
+
+# Writes stamped just before a sync may commit just after it; the returned
+# high water mark trails the sync start by this much so they aren't missed.
+# Clients upsert by `_id`, so the overlap is harmless.
+SAFETY_WINDOW = timedelta(seconds=5)
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; normalize client-supplied ones"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def backfill_updated_at(db, collections=SYNC_COLLECTIONS):
+    """Give documents stored before `updated_at` existed their `created_at`"""
+    for collection in collections:
+        await db[collection].update_many(
+            {'updated_at': {'$exists': False}},
+            [{'$set': {'updated_at': {'$ifNull': ['$created_at', datetime(1970, 1, 1)]}}}],
+        )
+
+
+def _decode_state(cursor: str) -> dict:
+    state = decode_token(cursor)
+    if (
+        not isinstance(state, dict)
+        or not {'since', 'high_water_mark', 'after'} <= state.keys()
+        or not isinstance(state['since'], (datetime, type(None)))
+        or not isinstance(state['high_water_mark'], datetime)
+        or not isinstance(state['after'], dict)
+        or not state['after'].keys() <= set(SYNC_COLLECTIONS)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Each collection is either finished (True) or the sort-key values to resume after
+    for value in state['after'].values():
+        if value is not True:
+            check_cursor_values(value, SYNC_KEYS)
+    return state
+
+
+async def _changes(collection, since: Optional[datetime], after: Optional[list], limit: int):
+    clauses = []
+    if since:
+        clauses.append({'updated_at': {'$gte': since}})
+    if after:
+        clauses.append(cursor_filter(SYNC_KEYS, after))
+    query = {'$and': clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+    return await (
+        collection.find(query)
+        .sort([(key, 1) for key in SYNC_KEYS])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+
+
+async def build_bundle(db, since: Optional[datetime], cursor: Optional[str], limit: int) -> dict:
+    """One batch of changes since `since` (or of a snapshot)"""
+    if cursor:
+        state = _decode_state(cursor)
+    else:
+        high_water_mark = datetime.utcnow() - SAFETY_WINDOW
+        if since and high_water_mark < since:
+            high_water_mark = since
+        state = {'since': since, 'high_water_mark': high_water_mark, 'after': {}}
+
+    # Collections finished in an earlier batch are marked True
+    pending = [name for name in SYNC_COLLECTIONS if state['after'].get(name) is not True]
+    results = await asyncio.gather(
+        *(_changes(db[name], state['since'], state['after'].get(name), limit) for name in pending)
+    )
+
+    changes = {name: [] for name in SYNC_COLLECTIONS}
+    after = {name: True for name in SYNC_COLLECTIONS}
+    for name, docs in zip(pending, results):
+        if len(docs) > limit:
+            docs = docs[:limit]
+            after[name] = [docs[-1].get(key) for key in SYNC_KEYS]
+        changes[name] = docs
+
+    has_more = any(value is not True for value in after.values())
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_token({
+            'since': state['since'],
+            'high_water_mark': state['high_water_mark'],
+            'after': after,
+        })
+
+    return {
+        'snapshot': state['since'] is None,
+        'since': state['since'],
+        'high_water_mark': state['high_water_mark'],
+        'has_more': has_more,
+        'cursor': next_cursor,
+        'changes': changes,
+    }
@@ -0,0 +1,28 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database per test"""
+    return AsyncMongoMockClient()['memorial_test']
+
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """The app, started against an in-memory database"""
+    import server
+    from fastapi.testclient import TestClient
+
+    client = AsyncMongoMockClient()
+    client.close = lambda: None
+    monkeypatch.setattr(server, 'create_client', lambda url: client)
+    server.response_cache.clear()
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,43 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import server
+from batch import BATCH_MAX_IDS, fetch_by_ids, parse_ids
+
+
+def test_parse_ids_drops_blanks_and_duplicates():
+    assert parse_ids(['b', ' a ', '', 'b']) == ['b', 'a']
+
+
+@pytest.mark.parametrize('ids', [[], [' ', ''], [str(i) for i in range(BATCH_MAX_IDS + 1)]])
+def test_parse_ids_rejects_empty_or_oversized(ids):
+    with pytest.raises(HTTPException) as e:
+        parse_ids(ids)
+    assert e.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_fetch_by_ids_keeps_request_order_and_lists_missing(db):
+    oid = ObjectId()
+    await db.victims.insert_many([{'_id': 'ion_popescu'}, {'_id': oid}, {'_id': 'maria_ionescu'}])
+    absent = str(ObjectId())
+    found, missing = await fetch_by_ids(db.victims, [str(oid), 'nobody', 'ion_popescu', absent])
+    assert [doc['_id'] for doc in found] == [oid, 'ion_popescu']
+    assert missing == ['nobody', absent]
+
+
+def test_batch_route_lists_missing_ids(api):
+    api.portal.call(server.db.victims.insert_one, {
+        '_id': 'ion_popescu', 'prison_id': 'gherla', 'name': 'Ion Popescu', 'profession': 'p', 'biography': 'b',
+        'imprisonment_period': {'start': '1950'},
+    })
+    response = api.get('/api/victims/batch?ids=nobody,ion_popescu')
+    assert response.status_code == 200
+    body = response.json()
+    assert [victim['_id'] for victim in body['items']] == ['ion_popescu']
+    assert body['missing'] == ['nobody']
+
+
+def test_batch_route_rejects_an_empty_id_list(api):
+    assert api.get('/api/victims/batch?ids=,').status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+from pydantic import ValidationError
+
+import models
+from bulk import bulk_insert, new_testimony_doc, validation_message
+
+
+def _testimony(**fields):
+    return {'victim_id': 'ion_popescu', 'text': 'text', 'source': 'interview', 'year': 1991, 'type': 'written', **fields}
+
+
+@pytest.mark.anyio
+async def test_results_are_reported_per_item_in_order(db):
+    items = [_testimony(), _testimony(year='nineties'), _testimony()]
+    result = await bulk_insert(db.testimonies, items, models.TestimonyCreate, new_testimony_doc, chunk_size=2)
+    assert result['inserted'] == 2 and result['failed'] == 1
+    assert [r['ok'] for r in result['results']] == [True, False, True]
+    assert [r['index'] for r in result['results']] == [0, 1, 2]
+    assert result['results'][1]['error'].startswith('year: ')
+    assert await db.testimonies.count_documents({}) == 2
+
+
+@pytest.mark.anyio
+async def test_duplicate_keys_fail_only_their_items(db):
+    await db.testimonies.insert_one({'_id': 'taken'})
+
+    def build(testimony):
+        return {**new_testimony_doc(testimony), '_id': testimony.source}
+
+    items = [_testimony(source='fresh'), _testimony(source='taken'), _testimony(source='other')]
+    result = await bulk_insert(db.testimonies, items, models.TestimonyCreate, build, chunk_size=2)
+    assert [r['ok'] for r in result['results']] == [True, False, True]
+    assert 'E11000' in result['results'][1]['error']
+    assert result['results'][2]['id'] == 'other'
+
+
+def test_validation_message_names_the_field():
+    with pytest.raises(ValidationError) as e:
+        models.TestimonyCreate.model_validate(_testimony(year='nineties'))
+    assert validation_message(e.value) == 'year: Input should be a valid integer, unable to parse string as an integer'
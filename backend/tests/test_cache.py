@@ -0,0 +1,140 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from cache import ResponseCache, etag_matches, make_etag, make_key
+from compression import variant_etag
+from geo import snap_position
+
+
+def test_make_key_ignores_unset_params_and_order():
+    assert make_key('list', {'b': 2, 'a': 1, 'c': None}) == make_key('list', {'a': 1, 'b': 2})
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    import cache as cache_module
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.set(('k',), b'{}', ('items',))
+    assert cache.get(('k',)) is not None
+    now[0] += 11
+    assert cache.get(('k',)) is None
+    assert cache.evictions == 1
+
+
+@pytest.fixture
+def cached_app():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    calls = []
+    app = FastAPI()
+
+    @app.get('/items')
+    @cache.cached('items')
+    async def list_items(q: str = 'x', size: int = 10):
+        calls.append(q)
+        return {'q': q, 'items': ['item'] * size}
+
+    with TestClient(app) as client:
+        yield client, cache, calls
+
+
+def test_repeat_request_is_served_from_cache(cached_app):
+    client, cache, calls = cached_app
+    first = client.get('/items?q=a')
+    second = client.get('/items?q=a')
+    assert first.json() == second.json() == {'q': 'a', 'items': ['item'] * 10}
+    assert calls == ['a']
+    assert cache.stats()['hits'] == 1
+
+
+def test_invalidate_drops_entries_for_the_collection(cached_app):
+    client, cache, calls = cached_app
+    client.get('/items')
+    cache.invalidate('items')
+    client.get('/items')
+    assert len(calls) == 2
+    assert cache.invalidations == 1
+
+
+def test_lru_eviction(cached_app):
+    client, cache, calls = cached_app
+    for q in ('a', 'b', 'c', 'a'):
+        client.get(f'/items?q={q}')
+    assert calls == ['a', 'b', 'c', 'a']
+    assert cache.stats()['entries'] == 2
+
+
+def test_write_invalidates_cached_list(api):
+    assert api.get('/api/prisons').json()['items'] == []
+    prison = {
+        'name': 'Gherla', 'type': 'prison', 'coordinates': {'latitude': 47.03, 'longitude': 23.91},
+        'description': 'd', 'operational_years': [1945], 'estimated_victims': 1,
+    }
+    assert api.post('/api/prisons', json=prison).status_code == 200
+    assert [p['name'] for p in api.get('/api/prisons').json()['items']] == ['Gherla']
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('*', True),
+    ('"xyz"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_if_none_match_gets_304(cached_app):
+    client, cache, _ = cached_app
+    first = client.get('/items')
+    assert first.headers['cache-control'] == cache.cache_control
+    response = client.get('/items', headers={'If-None-Match': first.headers['etag']})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == first.headers['etag']
+    assert cache.not_modified == 1
+
+
+def test_etag_changes_with_the_body(cached_app):
+    client, _, _ = cached_app
+    assert client.get('/items?q=a').headers['etag'] != client.get('/items?q=b').headers['etag']
+    assert client.get('/items?q=a').headers['etag'] == make_etag(client.get('/items?q=a').content)
+
+
+def test_normalize_shares_one_entry():
+    cache = ResponseCache()
+    calls = []
+    app = FastAPI()
+
+    @app.get('/near')
+    @cache.cached('prisons', normalize=snap_position)
+    async def near(lat: float, lng: float):
+        calls.append((lat, lng))
+        return {'lat': lat, 'lng': lng}
+
+    with TestClient(app) as client:
+        assert client.get('/near?lat=47.02349&lng=23.90051').json() == {'lat': 47.023, 'lng': 23.901}
+        client.get('/near?lat=47.02311&lng=23.90071')
+    assert calls == [(47.023, 23.901)]
+
+
+def test_compressed_variant_has_its_own_etag(cached_app):
+    client, _, _ = cached_app
+    plain = client.get('/items?size=200', headers={'Accept-Encoding': 'identity'})
+    zipped = client.get('/items?size=200', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in plain.headers
+    assert zipped.headers['content-encoding'] == 'gzip'
+    assert zipped.headers['etag'] == variant_etag(plain.headers['etag'], 'gzip')
+    assert zipped.json() == plain.json()
+    # The identity ETag doesn't validate the gzip variant
+    response = client.get('/items?size=200', headers={'Accept-Encoding': 'gzip', 'If-None-Match': plain.headers['etag']})
+    assert response.status_code == 200
+
+
+def test_small_cached_bodies_are_not_compressed(cached_app):
+    client, _, _ = cached_app
+    response = client.get('/items?size=1', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
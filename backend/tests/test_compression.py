@@ -0,0 +1,109 @@
+import gzip
+import threading
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import compression
+from cache import make_etag
+from compression import ENCODINGS, CompressionMiddleware, compress, negotiate, variant_etag
+
+BODY = b'{"text": "' + 'închisoarea Gherla '.encode() * 200 + b'"}'
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('deflate, gzip;q=0.5', 'gzip'),
+    ('*', ENCODINGS[0]),
+    ('*;q=0.1, gzip;q=0', 'br' if 'br' in ENCODINGS else None),
+    ('gzip;q=bogus', None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_compress_round_trip(encoding):
+    compressed = compress(BODY, encoding)
+    assert len(compressed) < len(BODY)
+    if encoding == 'gzip':
+        assert gzip.decompress(compressed) == BODY
+    else:
+        assert compression.brotli.decompress(compressed) == BODY
+
+
+def test_variant_etag_differs_per_encoding():
+    etag = make_etag(b'{}')
+    assert variant_etag(etag, None) == etag
+    assert variant_etag(etag, 'gzip') == etag[:-1] + '-gzip"'
+    assert variant_etag(etag, 'gzip') != variant_etag(etag, 'br')
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, thread_min_size=len(BODY))
+
+    @app.get('/json')
+    async def json_body(size: int = len(BODY)):
+        return Response(BODY[:size], media_type='application/json', headers={'ETag': '"x"'})
+
+    @app.get('/audio')
+    async def audio():
+        return Response(BODY, media_type='audio/mpeg')
+
+    @app.get('/encoded')
+    async def encoded():
+        return Response(gzip.compress(BODY), media_type='application/json', headers={'Content-Encoding': 'gzip'})
+
+    @app.get('/stream')
+    async def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type='application/x-ndjson')
+
+    return TestClient(app)
+
+
+def test_large_json_is_compressed(client):
+    response = client.get('/json', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    # The identity ETag doesn't describe the compressed bytes
+    assert 'etag' not in response.headers
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize('path, headers', [
+    ('/json', {'Accept-Encoding': 'identity'}),
+    ('/json?size=100', {'Accept-Encoding': 'gzip'}),
+    ('/audio', {'Accept-Encoding': 'gzip'}),
+    ('/stream', {'Accept-Encoding': 'gzip'}),
+])
+def test_passed_through_uncompressed(client, path, headers):
+    response = client.get(path, headers=headers)
+    assert 'content-encoding' not in response.headers
+
+
+def test_already_encoded_body_is_left_alone(client):
+    response = client.get('/encoded', headers={'Accept-Encoding': 'gzip'})
+    assert response.content == BODY
+
+
+def test_large_bodies_compress_off_the_event_loop(client, monkeypatch):
+    threads = []
+    original = compression.compress
+
+    def recording_compress(body, encoding, best=False):
+        threads.append(threading.current_thread().name)
+        return original(body, encoding, best)
+
+    monkeypatch.setattr(compression, 'compress', recording_compress)
+    client.get('/json', headers={'Accept-Encoding': 'gzip'})
+    client.get('/json?size=2000', headers={'Accept-Encoding': 'gzip'})
+    loop_thread = threads[1]
+    assert threads[0] != loop_thread
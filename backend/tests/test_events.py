@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+import events
+import server
+from events import UpcomingEvents, migrate_event_dates, parse_event_date
+from pagination import decode_cursor
+
+NOW = datetime(2025, 5, 1, 12)
+
+
+class FrozenDatetime(datetime):
+    now_value = NOW
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_value
+
+
+def _event(i, date):
+    return {'_id': f'e{i}', 'title': f'Event {i}', 'description': 'd', 'date': date, 'location': 'Gherla', 'type': 'commemoration'}
+
+
+def _ids(body):
+    return [item['_id'] for item in orjson.loads(bytes(body))['items']]
+
+
+@pytest.fixture
+def frozen(monkeypatch):
+    monkeypatch.setattr(events, 'datetime', FrozenDatetime)
+    FrozenDatetime.now_value = NOW
+    return FrozenDatetime
+
+
+@pytest.fixture
+async def upcoming(db, frozen):
+    await db.app_events.insert_many(
+        [_event(0, NOW - timedelta(days=1))] + [_event(i, NOW + timedelta(hours=i)) for i in range(1, 6)]
+    )
+    upcoming = UpcomingEvents(window=4)
+    await upcoming.load(db)
+    return upcoming
+
+
+@pytest.mark.parametrize('value, expected', [
+    (datetime(2025, 5, 1, 12), datetime(2025, 5, 1, 12)),
+    ('2025-05-01T15:00:00+03:00', datetime(2025, 5, 1, 12)),
+    (datetime(2025, 5, 1, 15, tzinfo=timezone(timedelta(hours=3))), datetime(2025, 5, 1, 12)),
+    ('next spring', None),
+])
+def test_parse_event_date(value, expected):
+    assert parse_event_date(value) == expected
+
+
+@pytest.mark.anyio
+async def test_window_holds_the_next_events(upcoming):
+    body = orjson.loads(bytes(upcoming.body(100)))
+    assert [item['_id'] for item in body['items']] == ['e1', 'e2', 'e3', 'e4']
+    assert decode_cursor(body['next_cursor'], ('date', '_id'))[1] == 'e4'
+
+
+@pytest.mark.anyio
+async def test_smaller_pages_continue_with_a_cursor(upcoming):
+    body = orjson.loads(bytes(upcoming.body(2)))
+    assert [item['_id'] for item in body['items']] == ['e1', 'e2']
+    assert decode_cursor(body['next_cursor'], ('date', '_id'))[1] == 'e2'
+
+
+@pytest.mark.anyio
+async def test_events_that_started_since_the_refresh_are_dropped(upcoming, frozen):
+    frozen.now_value = NOW + timedelta(hours=2, minutes=30)
+    assert _ids(upcoming.body(100)) == ['e3', 'e4']
+    assert _ids(upcoming.body(1)) == ['e3']
+
+
+@pytest.mark.anyio
+async def test_migrate_event_dates(db):
+    await db.app_events.insert_many([_event(1, '2025-05-01T15:00:00+03:00'), _event(2, 'soon')])
+    await migrate_event_dates(db)
+    assert (await db.app_events.find_one({'_id': 'e1'}))['date'] == datetime(2025, 5, 1, 12)
+    assert (await db.app_events.find_one({'_id': 'e2'}))['date'] == 'soon'
+
+
+def test_upcoming_route_bypasses_the_response_cache(api):
+    api.portal.call(server.db.app_events.insert_one, _event(1, datetime.utcnow() + timedelta(days=1)))
+    api.portal.call(server.upcoming_events.load, server.db)
+    before = server.response_cache.stats()
+    for _ in range(3):
+        assert _ids(api.get('/api/events?upcoming=true').content) == ['e1']
+    after = server.response_cache.stats()
+    assert (after['hits'], after['misses']) == (before['hits'], before['misses'])
+    assert after['single_flight']['leaders'] == before['single_flight']['leaders']
+
+
+def test_other_event_lists_are_cached(api):
+    api.portal.call(server.db.app_events.insert_one, _event(1, datetime(2020, 1, 1)))
+    first = api.get('/api/events')
+    assert _ids(first.content) == ['e1'] and 'etag' in first.headers
+    hits = server.response_cache.hits
+    api.get('/api/events')
+    assert server.response_cache.hits == hits + 1
@@ -0,0 +1,56 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import server
+from export import ndjson_line, stream_ndjson
+
+
+def _lines(body: bytes):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+def test_ndjson_line_encodes_bson_types():
+    oid = ObjectId()
+    line = ndjson_line({'_id': oid, 'at': datetime(1950, 1, 2), 'name': 'Țurcanu'})
+    assert line.endswith(b'\n') and 'Țurcanu' in line.decode()
+    assert json.loads(line) == {'_id': str(oid), 'at': '1950-01-02T00:00:00', 'name': 'Țurcanu'}
+
+
+@pytest.mark.anyio
+async def test_stream_yields_one_chunk_per_batch(db):
+    await db.documents.insert_many([{'_id': i} for i in range(250)])
+    chunks = [chunk async for chunk in stream_ndjson(db.documents.find(), 100)]
+    assert [len(chunk.splitlines()) for chunk in chunks] == [100, 100, 50]
+
+
+@pytest.fixture
+def documents(api):
+    docs = [{'_id': f'd{year}', 'title': 't', 'year': year, 'document_type': 'letter'} for year in range(1948, 1958)]
+    api.portal.call(server.db.documents.insert_many, docs)
+    return api
+
+
+def test_export_applies_the_list_filters(documents):
+    response = documents.get('/api/export/documents?year_from=1950&year_to=1952&unrelated=1')
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert [doc['year'] for doc in _lines(response.content)] == [1950, 1951, 1952]
+
+
+def test_export_gzip(documents):
+    response = documents.get('/api/export/documents?gzip=true', headers={'Accept-Encoding': 'identity'})
+    assert response.headers['content-disposition'] == 'attachment; filename="documents.ndjson.gz"'
+    assert len(_lines(gzip.decompress(response.content))) == 10
+
+
+def test_export_rejects_bad_filter_values(documents):
+    response = documents.get('/api/export/documents?year_from=nineteen-fifty')
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['year_from']
+
+
+def test_export_unknown_collection_is_a_404(documents):
+    assert documents.get('/api/export/users').status_code == 404
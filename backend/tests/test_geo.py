@@ -0,0 +1,23 @@
+import pytest
+from fastapi import HTTPException
+
+from geo import parse_bbox, snap_position
+
+
+def test_snap_position_rounds_coordinates():
+    assert snap_position({'lat': 47.02349, 'lng': 23.90051, 'radius': 5}) == {'lat': 47.023, 'lng': 23.901, 'radius': 5}
+
+
+def test_snap_position_widens_bbox_outward():
+    assert snap_position({'bbox': '23.9004,47.0231,23.9101,47.0299'})['bbox'] == '23.900,47.023,23.911,47.030'
+
+
+def test_snap_position_keeps_bbox_in_range():
+    assert snap_position({'bbox': '-180,-90,180,90'})['bbox'] == '-180.000,-90.000,180.000,90.000'
+
+
+@pytest.mark.parametrize('bbox', ['1,2,3', '10,0,5,1', '0,0,1,95'])
+def test_parse_bbox_rejects_bad_boxes(bbox):
+    with pytest.raises(HTTPException) as e:
+        parse_bbox(bbox)
+    assert e.value.status_code == 400
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from database import run_migrations
+
+
+def test_live(api):
+    assert api.get('/api/health/live').json() == {'status': 'alive'}
+
+
+def test_ready_after_startup(api):
+    response = api.get('/api/health/ready')
+    assert response.status_code == 200
+    assert response.json() == {'status': 'ready', 'database': 'connected'}
+
+
+def test_not_ready_while_starting(api):
+    server.app.state.ready = False
+    assert api.get('/api/health/ready').status_code == 503
+    server.app.state.ready = True
+
+
+def test_not_ready_when_the_database_is_down(api, monkeypatch):
+    async def down(db, timeout):
+        return False
+
+    monkeypatch.setattr(server, 'ping', down)
+    response = api.get('/api/health/ready')
+    assert response.status_code == 503
+    assert response.json()['database'] == 'disconnected'
+
+
+def test_failed_startup_cancels_background_tasks_and_closes_the_client(monkeypatch):
+    client = AsyncMongoMockClient()
+    closed = []
+    client.close = lambda: closed.append(True)
+    cancelled = []
+
+    async def refresher(db, interval):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def broken(db):
+        await asyncio.sleep(0)  # lets the refresher start
+        raise RuntimeError('events unavailable')
+
+    monkeypatch.setattr(server, 'create_client', lambda url: client)
+    monkeypatch.setattr(server.qr_table, 'run_refresher', refresher)
+    monkeypatch.setattr(server.upcoming_events, 'load', broken)
+    with pytest.raises(RuntimeError):
+        with TestClient(server.app):
+            pass
+    assert closed == [True]
+    assert cancelled == [True]
+    assert server.app.state.ready is False
+
+
+@pytest.mark.anyio
+async def test_migrations_run_once(db):
+    runs = []
+
+    async def migrate(db):
+        runs.append('backfill')
+
+    await run_migrations(db, [('backfill', migrate)])
+    await run_migrations(db, [('backfill', migrate)])
+    assert runs == ['backfill']
+    assert await db.migrations.count_documents({'_id': 'backfill'}) == 1
+
+
+@pytest.mark.anyio
+async def test_failed_migration_is_retried(db):
+    async def fail(db):
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await run_migrations(db, [('backfill', fail)])
+    assert await db.migrations.count_documents({}) == 0
+
+
+def test_startup_records_its_migrations(api):
+    names = api.portal.call(server.db.migrations.distinct, '_id')
+    assert sorted(names) == sorted(name for name, _ in server.STARTUP_MIGRATIONS)
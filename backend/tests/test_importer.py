@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from importer import Checkpoint, file_fingerprint, iter_rows, run_import
+
+
+def _testimony(year, **fields):
+    return {'victim_id': 'ion_popescu', 'text': f'text {year}', 'source': 'interview', 'year': year, 'type': 'written', **fields}
+
+
+@pytest.fixture
+def source(tmp_path):
+    rows = [_testimony(1950 + i) for i in range(10)]
+    rows[3]['year'] = 'unknown'
+    path = tmp_path / 'testimonies.jsonl'
+    lines = [json.dumps(row) for row in rows]
+    lines.insert(6, '{not json')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+class FlakyDb:
+    """Delegates to `db`, failing the `fail_on`-th bulk_write"""
+
+    def __init__(self, db, fail_on):
+        self.db = db
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def __getitem__(self, name):
+        collection = self.db[name]
+        outer = self
+
+        class Collection:
+            async def bulk_write(self, ops, **kwargs):
+                outer.calls += 1
+                if outer.calls == outer.fail_on:
+                    raise AutoReconnect('connection lost')
+                return await collection.bulk_write(ops, **kwargs)
+
+        return Collection()
+
+
+def test_iter_rows_skips_and_reports_bad_lines(source):
+    rows = list(iter_rows(source, 'jsonl'))
+    assert len(rows) == 11
+    assert rows[6].error.startswith('invalid JSON')
+    assert [row.line for row in iter_rows(source, 'jsonl', skip=9)] == [10, 11]
+
+
+def test_iter_rows_unflattens_csv(tmp_path):
+    path = tmp_path / 'documents.csv'
+    path.write_text('title,location.latitude,notes\nFile,46.1,\n')
+    assert [row.data for row in iter_rows(path, 'csv')] == [{'title': 'File', 'location': {'latitude': '46.1'}}]
+
+
+@pytest.mark.anyio
+async def test_import_writes_valid_rows_and_rejects_the_rest(db, source):
+    checkpoint = await run_import(db, 'testimonies', source, 'jsonl', batch_size=4, concurrency=2)
+    assert (checkpoint.rows, checkpoint.upserted, checkpoint.rejected) == (11, 9, 2)
+    assert await db.testimonies.count_documents({}) == 9
+    rejects = [json.loads(line) for line in source.with_name('testimonies.jsonl.rejects.jsonl').read_text().splitlines()]
+    assert [reject['line'] for reject in rejects] == [4, 7]
+    assert not checkpoint.path.exists()
+
+
+@pytest.mark.anyio
+async def test_reimport_updates_instead_of_duplicating(db, source):
+    await run_import(db, 'testimonies', source, 'jsonl', batch_size=4)
+    checkpoint = await run_import(db, 'testimonies', source, 'jsonl', batch_size=4)
+    assert checkpoint.upserted == 0
+    assert await db.testimonies.count_documents({}) == 9
+
+
+@pytest.mark.anyio
+async def test_failed_run_resumes_from_its_checkpoint(db, source):
+    with pytest.raises(AutoReconnect):
+        await run_import(FlakyDb(db, fail_on=2), 'testimonies', source, 'jsonl', batch_size=4, concurrency=1)
+
+    saved = Checkpoint(source.with_name('testimonies.jsonl.checkpoint.json'), 'testimonies', file_fingerprint(source))
+    assert saved.load()
+    assert saved.rows == 4 and saved.rejected == 1
+
+    checkpoint = await run_import(db, 'testimonies', source, 'jsonl', batch_size=4, concurrency=1)
+    assert (checkpoint.rows, checkpoint.upserted, checkpoint.rejected) == (11, 9, 2)
+    assert await db.testimonies.count_documents({}) == 9
+    rejects = source.with_name('testimonies.jsonl.rejects.jsonl').read_text().splitlines()
+    assert [json.loads(line)['line'] for line in rejects] == [4, 7]
+
+
+@pytest.mark.anyio
+async def test_checkpoint_for_a_changed_file_is_refused(db, source):
+    with pytest.raises(AutoReconnect):
+        await run_import(FlakyDb(db, fail_on=2), 'testimonies', source, 'jsonl', batch_size=4, concurrency=1)
+    with open(source, 'a') as f:
+        f.write(json.dumps(_testimony(1999)) + '\n')
+    with pytest.raises(SystemExit):
+        await run_import(db, 'testimonies', source, 'jsonl', batch_size=4)
+    checkpoint = await run_import(db, 'testimonies', source, 'jsonl', batch_size=4, restart=True)
+    assert checkpoint.rows == 12
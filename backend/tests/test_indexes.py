@@ -0,0 +1,76 @@
+import pytest
+
+import indexes
+from indexes import INDEXES, LOOKUP_SHAPES, QUERY_SHAPES, SYNC_SHAPES, _plan_stages, check_query_plans, ensure_indexes
+
+
+class PlannerDb:
+    """Answers explain() with an index scan, except for collections in `unindexed`"""
+
+    def __init__(self, unindexed=()):
+        self.unindexed = set(unindexed)
+        self.explained = []
+
+    def __getitem__(self, name):
+        db = self
+
+        class Cursor:
+            def __init__(self, query):
+                self.query, self.sort_spec = query, None
+
+            def sort(self, spec):
+                self.sort_spec = spec
+                return self
+
+            async def explain(self):
+                db.explained.append((name, self.query, self.sort_spec))
+                leaf = {'stage': 'COLLSCAN'} if name in db.unindexed else {'stage': 'IXSCAN'}
+                return {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'OR', 'inputStages': [leaf]}}}}
+
+        class Collection:
+            def find(self, query):
+                return Cursor(query)
+
+        return Collection()
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {'stage': 'SORT', 'inputStage': {'stage': 'OR', 'inputStages': [{'stage': 'IXSCAN'}, {'stage': 'COLLSCAN'}]}}
+    assert list(_plan_stages(plan)) == ['SORT', 'OR', 'IXSCAN', 'COLLSCAN']
+
+
+@pytest.mark.anyio
+async def test_check_reports_only_collection_scans():
+    db = PlannerDb(unindexed={'qr_locations'})
+    failures = await check_query_plans(db)
+    assert failures == [('qr_locations', query) for query in LOOKUP_SHAPES['qr_locations']]
+    explained = {name for name, _, _ in db.explained}
+    assert set(QUERY_SHAPES) <= explained
+    # Every list shape is explained both for the first page and after a cursor
+    prisons = [(query, sort) for name, query, sort in db.explained if name == 'prisons' and sort]
+    assert len(prisons) == 2 * (len(QUERY_SHAPES['prisons']) + len(SYNC_SHAPES['prisons']))
+
+
+@pytest.mark.anyio
+async def test_check_passes_when_every_shape_is_indexed():
+    assert await check_query_plans(PlannerDb()) == []
+
+
+@pytest.mark.anyio
+async def test_ensure_indexes_creates_the_registry(db):
+    await ensure_indexes(db)
+    info = await db.victims.index_information()
+    assert len(info) >= len(INDEXES['victims'])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('failures, check, status', [([], True, 0), ([('victims', {})], True, 1), ([('victims', {})], False, 0)])
+async def test_check_mode_exit_status(monkeypatch, failures, check, status):
+    from mongomock_motor import AsyncMongoMockClient
+
+    async def plans(db):
+        return failures
+
+    monkeypatch.setattr(indexes, 'AsyncIOMotorClient', lambda url: AsyncMongoMockClient())
+    monkeypatch.setattr(indexes, 'check_query_plans', plans)
+    assert await indexes.main(check) == status
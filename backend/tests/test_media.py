@@ -0,0 +1,77 @@
+import pytest
+from fastapi import HTTPException
+
+from media import ByteRange, LocalMediaStore, parse_range
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('items=0-10', None),
+    ('bytes=0-99', ByteRange(0, 99)),
+    ('bytes=100-', ByteRange(100, 999)),
+    ('bytes=900-5000', ByteRange(900, 999)),
+    ('bytes=-100', ByteRange(900, 999)),
+    ('bytes=-5000', ByteRange(0, 999)),
+    ('bytes=500-100', None),
+    ('bytes=0-10,20-30', None),
+    ('bytes=a-b', None),
+    ('bytes=-', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize('header, size', [('bytes=1000-', 1000), ('bytes=-0', 1000), ('bytes=-10', 0)])
+def test_unsatisfiable_range_is_a_416(header, size):
+    with pytest.raises(HTTPException) as e:
+        parse_range(header, size)
+    assert e.value.status_code == 416
+    assert e.value.headers['Content-Range'] == f'bytes */{size}'
+
+
+def test_range_length():
+    assert ByteRange(10, 19).length == 10
+
+
+@pytest.fixture
+def media_api(tmp_path, monkeypatch, request):
+    monkeypatch.setenv('MEDIA_BACKEND', 'local')
+    monkeypatch.setenv('MEDIA_ROOT', str(tmp_path))
+    (tmp_path / 'tours').mkdir()
+    (tmp_path / 'tours' / 'track.mp3').write_bytes(bytes(range(256)) * 40)
+    return request.getfixturevalue('api')
+
+
+def test_range_request_gets_206(media_api):
+    response = media_api.get('/api/media/tours/track.mp3', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.content == bytes(range(10, 20))
+    assert response.headers['content-range'] == 'bytes 10-19/10240'
+
+
+def test_reversed_range_gets_the_whole_file(media_api):
+    response = media_api.get('/api/media/tours/track.mp3', headers={'Range': 'bytes=500-100'})
+    assert response.status_code == 200
+    assert len(response.content) == 10240
+
+
+def test_stale_if_range_gets_the_whole_file(media_api):
+    response = media_api.get('/api/media/tours/track.mp3', headers={'Range': 'bytes=0-9', 'If-Range': '"old"'})
+    assert response.status_code == 200
+
+
+def test_etag_revalidation_and_head(media_api):
+    etag = media_api.head('/api/media/tours/track.mp3').headers['etag']
+    assert media_api.get('/api/media/tours/track.mp3', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_missing_file_is_a_404(media_api):
+    assert media_api.get('/api/media/missing.mp3').status_code == 404
+
+
+@pytest.mark.anyio
+async def test_local_store_stays_inside_its_root(tmp_path):
+    (tmp_path / 'secret.txt').write_text('x')
+    store = LocalMediaStore(tmp_path / 'media')
+    (tmp_path / 'media').mkdir()
+    assert await store.stat('../secret.txt') is None
@@ -0,0 +1,120 @@
+import base64
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from pagination import (
+    cursor_filter, decode_cursor, decode_token, encode_cursor, encode_token, fetch_page,
+)
+
+
+def _raw_token(text):
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+
+def test_token_round_trip():
+    value = [1950, ObjectId(), None, 'gherla']
+    assert decode_token(encode_token(value)) == value
+
+
+@pytest.mark.parametrize('token', [
+    '!!!',
+    'bm90IGpzb24',
+    '',
+    _raw_token('[{"$oid": "zz"}]'),
+    _raw_token('[{"$date": "x"}]'),
+])
+def test_tampered_token_is_a_400(token):
+    with pytest.raises(HTTPException) as e:
+        decode_token(token)
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize('values', [
+    {'year': 1950},
+    ['a'],
+    [{'$ne': None}, 'a'],
+    [1950, ['a']],
+])
+def test_cursor_must_hold_one_scalar_per_key(values):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(encode_token(values), ('year', '_id'))
+    assert e.value.status_code == 400
+
+
+def test_cursor_round_trip():
+    doc = {'year': 1950, '_id': ObjectId()}
+    assert decode_cursor(encode_cursor(doc, ('year', '_id')), ('year', '_id')) == [1950, doc['_id']]
+
+
+def test_cursor_filter_single_key():
+    assert cursor_filter(('_id',), ['b']) == {'_id': {'$gt': 'b'}}
+
+
+def test_cursor_filter_compound_key():
+    assert cursor_filter(('year', '_id'), [1950, 'b']) == {'$or': [
+        {'year': {'$gt': 1950}},
+        {'year': 1950, '_id': {'$gt': 'b'}},
+    ]}
+
+
+def test_cursor_filter_null_key_selects_later_rows():
+    assert cursor_filter(('date_start', '_id'), [None, 'b']) == {'$or': [
+        {'date_start': {'$ne': None}},
+        {'date_start': None, '_id': {'$gt': 'b'}},
+    ]}
+
+
+async def _walk(collection, limit, query=None):
+    seen, cursor = [], None
+    while True:
+        docs, cursor = await fetch_page(collection, query or {}, limit, cursor)
+        seen.extend(doc['_id'] for doc in docs)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.anyio
+async def test_fetch_page_walks_every_document_once(db):
+    await db.victims.insert_many([{'_id': f'v{i:03d}'} for i in range(25)])
+    assert await _walk(db.victims, 10) == [f'v{i:03d}' for i in range(25)]
+
+
+@pytest.mark.anyio
+async def test_fetch_page_exact_multiple_has_no_trailing_cursor(db):
+    await db.victims.insert_many([{'_id': f'v{i:03d}'} for i in range(20)])
+    docs, cursor = await fetch_page(db.victims, {}, 10)
+    docs, cursor = await fetch_page(db.victims, {}, 10, cursor)
+    assert len(docs) == 10 and cursor is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('limit', [0, -1])
+async def test_fetch_page_non_positive_limit_is_empty(db, limit):
+    await db.victims.insert_many([{'_id': f'v{i}'} for i in range(5)])
+    assert await fetch_page(db.victims, {}, limit) == ([], None)
+
+
+@pytest.mark.anyio
+async def test_fetch_page_pages_through_null_sort_keys(db):
+    await db.historical_events.insert_many(
+        [{'_id': f'n{i}', 'date_start': None} for i in range(3)]
+        + [{'_id': f'd{i}', 'date_start': 19500101 + i} for i in range(4)]
+    )
+    assert await _walk(db.historical_events, 2) == ['n0', 'n1', 'n2', 'd0', 'd1', 'd2', 'd3']
+
+
+@pytest.mark.parametrize('path', ['/api/prisons?limit=0', '/api/victims?limit=-1'])
+def test_non_positive_limits_are_rejected(api, path):
+    assert api.get(path).status_code == 422
+
+
+@pytest.mark.parametrize('cursor', [
+    _raw_token('[{"$oid": "zz"}]'),
+    _raw_token('[{"$date": "x"}]'),
+    encode_token([{'$ne': None}, 'a']),
+])
+@pytest.mark.parametrize('route', ['prisons', 'documents'])
+def test_tampered_cursor_is_a_400_from_the_api(api, route, cursor):
+    assert api.get(f'/api/{route}?cursor={cursor}').status_code == 400
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def gherla(api):
+    prison = {
+        '_id': 'gherla', 'name': 'Gherla', 'type': 'prison', 'coordinates': {'latitude': 47.03, 'longitude': 23.91},
+        'description': 'd', 'operational_years': [1945], 'estimated_victims': 3, 'internal_note': 'dropped',
+    }
+    victims = [
+        {'_id': f'victim_{i}', 'prison_id': 'gherla', 'name': f'Victim {i}', 'profession': 'p', 'biography': 'b',
+         'imprisonment_period': {'start': '1950'}, 'updated_at': datetime(2024, 1, 1)}
+        for i in range(3)
+    ]
+    testimony = {'prison_id': 'gherla', 'text': 't', 'source': 's', 'year': 1991, 'type': 'written'}
+    api.portal.call(server.db.prisons.insert_one, prison)
+    api.portal.call(server.db.victims.insert_many, victims)
+    api.portal.call(server.db.testimonies.insert_one, testimony)
+    api.portal.call(server.db.victims.insert_one, {**victims[0], '_id': 'elsewhere', 'prison_id': 'aiud'})
+    return api
+
+
+def test_full_returns_the_prison_and_first_pages(gherla):
+    detail = gherla.get('/api/prisons/gherla/full?victims_limit=2').json()
+    assert detail['prison']['_id'] == 'gherla'
+    assert 'internal_note' not in detail['prison']
+    assert [v['_id'] for v in detail['victims']['items']] == ['victim_0', 'victim_1']
+    assert detail['victims']['next_cursor']
+    assert len(detail['testimonies']['items']) == 1 and detail['testimonies']['next_cursor'] is None
+    assert detail['documents'] == {'items': [], 'next_cursor': None}
+    assert detail['incomplete'] == []
+
+
+def test_next_cursor_continues_on_the_list_route(gherla):
+    cursor = gherla.get('/api/prisons/gherla/full?victims_limit=2').json()['victims']['next_cursor']
+    rest = gherla.get(f'/api/victims?prison_id=gherla&fields=all&cursor={cursor}').json()['items']
+    assert [v['_id'] for v in rest] == ['victim_2']
+
+
+def test_unknown_prison_is_a_404(gherla):
+    assert gherla.get('/api/prisons/nowhere/full').status_code == 404
+
+
+def test_sections_over_budget_are_flagged_and_not_cached(gherla, monkeypatch):
+    monkeypatch.setattr(server, 'PRISON_DETAIL_BUDGET', 0)
+    original = server.fetch_page
+
+    async def slow_fetch_page(collection, *args, **kwargs):
+        if collection.name == 'documents':
+            await server.asyncio.sleep(1)
+        return await original(collection, *args, **kwargs)
+
+    monkeypatch.setattr(server, 'fetch_page', slow_fetch_page)
+    response = gherla.get('/api/prisons/gherla/full')
+    assert 'documents' in response.json()['incomplete']
+    assert 'etag' not in response.headers
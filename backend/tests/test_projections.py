@@ -0,0 +1,48 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+from models import Document, DocumentSummary, VictimSummary
+from projections import EXCERPT_LENGTH, resolve_fields
+
+
+def test_summary_computes_excerpts_and_flags_in_mongo():
+    projection = resolve_fields('victims', None)
+    assert projection.model is VictimSummary
+    assert 'biography' not in projection.mongo
+    assert projection.mongo['biography_excerpt'] == {'$substrCP': [{'$ifNull': ['$biography', '']}, 0, EXCERPT_LENGTH]}
+
+    documents = resolve_fields('documents', 'summary')
+    assert documents.model is DocumentSummary
+    assert 'transcription' not in documents.mongo
+    assert documents.mongo['has_transcription'] == {'$gt': [{'$strLenCP': {'$ifNull': ['$transcription', '']}}, 0]}
+    # The cursor needs the sort keys
+    assert documents.mongo['year'] == 1 and documents.mongo['_id'] == 1
+
+
+def test_all_is_the_full_model_unprojected():
+    projection = resolve_fields('documents', 'all')
+    assert projection.mongo is None and projection.model is Document and projection.keys is None
+
+
+def test_field_list_reads_sort_keys_but_returns_only_what_was_asked():
+    projection = resolve_fields('documents', 'title, scan_url')
+    assert projection.mongo == {'title': 1, 'scan_url': 1, 'year': 1, '_id': 1}
+    assert projection.keys == {'title', 'scan_url', '_id'}
+
+
+def test_unknown_fields_are_a_400():
+    with pytest.raises(HTTPException) as e:
+        resolve_fields('documents', 'title,password')
+    assert e.value.status_code == 400
+    assert e.value.detail == 'Unknown fields: password'
+
+
+def test_list_route_returns_the_requested_fields(api):
+    docs = [{'_id': f'd{i}', 'title': f'T{i}', 'year': 1950 + i, 'document_type': 'letter', 'scan_url': 's',
+             'transcription': 'long text'} for i in range(3)]
+    api.portal.call(server.db.documents.insert_many, docs)
+    page = api.get('/api/documents?fields=title&limit=2').json()
+    assert page['items'] == [{'_id': 'd0', 'title': 'T0'}, {'_id': 'd1', 'title': 'T1'}]
+    rest = api.get(f"/api/documents?fields=title&cursor={page['next_cursor']}").json()
+    assert rest['items'] == [{'_id': 'd2', 'title': 'T2'}]
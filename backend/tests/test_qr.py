@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import orjson
+import pytest
+
+import server
+from qr import QRTable
+
+
+def _location(code, prison_id='gherla', updated_at=datetime(2024, 1, 1), **fields):
+    return {'qr_code': code, 'prison_id': prison_id, 'content_type': 'audio_story', 'content_data': {'track': code},
+            'location_name': f'Cell {code}', 'updated_at': updated_at, **fields}
+
+
+@pytest.fixture
+async def table(db):
+    await db.qr_locations.insert_many([_location('GHERLA-001'), _location('GHERLA-002'), _location('AIUD-001', 'aiud')])
+    table = QRTable()
+    await table.load(db)
+    return table
+
+
+@pytest.mark.anyio
+async def test_known_and_unknown_codes(table):
+    assert orjson.loads(bytes(table.body('GHERLA-001'))) == {
+        'valid': True, 'content_type': 'audio_story', 'content_data': {'track': 'GHERLA-001'}, 'location_name': 'Cell GHERLA-001',
+    }
+    assert orjson.loads(bytes(table.body('NOPE'))) == {'valid': False, 'content_type': None, 'content_data': None, 'location_name': None}
+    results = table.lookup_many(['AIUD-001', 'NOPE'])
+    assert results['AIUD-001'].valid and not results['NOPE'].valid
+
+
+@pytest.mark.anyio
+async def test_codes_by_prison(table):
+    assert list(table.for_prison('gherla')) == ['GHERLA-001', 'GHERLA-002']
+    assert table.for_prison('jilava') == {}
+
+
+@pytest.mark.anyio
+async def test_refresh_picks_up_changes_and_moves(db, table):
+    await db.qr_locations.update_one(
+        {'qr_code': 'GHERLA-002'}, {'$set': {'prison_id': 'aiud', 'location_name': 'Moved', 'updated_at': datetime(2024, 2, 1)}}
+    )
+    await db.qr_locations.insert_one(_location('GHERLA-003', updated_at=datetime(2024, 2, 1)))
+    await table.refresh(db)
+    assert list(table.for_prison('gherla')) == ['GHERLA-001', 'GHERLA-003']
+    assert list(table.for_prison('aiud')) == ['AIUD-001', 'GHERLA-002']
+    assert table.lookup_many(['GHERLA-002'])['GHERLA-002'].location_name == 'Moved'
+
+
+@pytest.mark.anyio
+async def test_invalid_locations_are_skipped(db):
+    await db.qr_locations.insert_many([_location('BAD', content_type='hologram'), {'prison_id': 'gherla'}])
+    table = QRTable()
+    await table.load(db)
+    assert len(table) == 0
+
+
+def test_scan_route_is_served_from_the_table(api):
+    api.portal.call(server.db.qr_locations.insert_one, _location('GHERLA-001'))
+    api.portal.call(server.qr_table.load, server.db)
+    assert api.post('/api/qr/scan', json={'qr_code': 'GHERLA-001'}).json()['valid'] is True
+    assert api.post('/api/qr/scan', json={'qr_code': 'NOPE'}).json()['valid'] is False
@@ -0,0 +1,34 @@
+from search import fold, make_snippet, query_terms
+
+
+def test_fold_strips_diacritics_and_keeps_offsets():
+    text = 'Închisoarea Gherla, Țara Făgărașului'
+    assert fold(text) == 'inchisoarea gherla, tara fagarasului'
+    assert len(fold(text)) == len(text)
+    # Characters that decompose into several code points still fold to one
+    assert len(fold('ﬁ ǆ')) == 3
+
+
+def test_query_terms_drop_quotes_and_negations():
+    assert query_terms('"Închisoare" Gherla -Aiud') == ['inchisoare', 'gherla']
+
+
+def test_snippet_is_cut_around_the_first_term():
+    text = ' '.join(['cuvânt'] * 60) + ' deținut la Gherla ' + ' '.join(['după'] * 60)
+    snippet = make_snippet(text, ['detinut'])
+    assert snippet.startswith('…') and snippet.endswith('…')
+    assert 'deținut la Gherla' in snippet
+    assert len(snippet) <= 162
+    # Cut on word boundaries
+    assert snippet[1:].split(' ')[0] in ('cuvânt', 'deținut')
+    assert snippet[:-1].split(' ')[-1] in ('după', 'Gherla')
+
+
+def test_snippet_without_a_match_is_the_start_of_the_text():
+    assert make_snippet('Scurtă biografie', ['gherla']) == 'Scurtă biografie'
+    assert make_snippet('cuvânt ' * 50, ['gherla']).endswith('…')
+    assert make_snippet(None, ['gherla']) is None
+
+
+def test_short_text_with_a_match_is_whole():
+    assert make_snippet('A fost închis la Gherla', ['gherla']) == 'A fost închis la Gherla'
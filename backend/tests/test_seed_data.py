@@ -0,0 +1,37 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from seed_data import generate_dataset
+
+COLLECTIONS = ['prisons', 'victims', 'testimonies', 'documents', 'qr_locations']
+
+
+async def _generate(seed):
+    db = AsyncMongoMockClient()['seed_test']
+    await generate_dataset(db, prisons=3, victims=40, qr_per_prison=2, seed=seed, chunk_size=16, report_every=1e9)
+    return {name: await db[name].find({}).sort('_id').to_list(None) for name in COLLECTIONS}, db
+
+
+@pytest.mark.anyio
+async def test_same_seed_gives_the_same_data():
+    first, _ = await _generate(7)
+    second, _ = await _generate(7)
+    assert first == second
+    other, _ = await _generate(8)
+    assert other['documents'] != first['documents']
+
+
+@pytest.mark.anyio
+async def test_cross_references_resolve():
+    data, _ = await _generate(7)
+    prisons = {p['_id']: p for p in data['prisons']}
+    victims = {v['_id']: v for v in data['victims']}
+    testimonies = {str(t['_id']): t for t in data['testimonies']}
+    assert len(victims) == 40
+    for victim in victims.values():
+        assert victim['prison_id'] in prisons
+        assert all(testimonies[t]['victim_id'] == victim['_id'] for t in victim['testimonies'])
+    assert sum(len(v['testimonies']) for v in victims.values()) == len(testimonies)
+    assert all(d['victim_id'] in victims for d in data['documents'])
+    for location in data['qr_locations']:
+        assert location['qr_code'] in prisons[location['prison_id']]['qr_codes']
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+
+from models import Prison, Victim
+from serialization import dumps, fast_dump
+
+PRISON = {
+    '_id': 'gherla', 'name': 'Gherla', 'type': 'prison', 'coordinates': {'latitude': 47.03, 'longitude': 23.91, 'alt': 1},
+    'description': 'd', 'operational_years': [1945], 'estimated_victims': 3,
+    'history_timeline': [{'date': '1950', 'title': 't', 'description': 'd', 'date_start': 19500101, 'date_end': 19501231}],
+    'audio_tour_tracks': [{'id': 'a', 'title': 't', 'duration': 60, 'audio_url': '/media/a.mp3'}],
+    'location': {'type': 'Point', 'coordinates': [23.91, 47.03]},
+    'created_at': datetime(2024, 1, 1), 'updated_at': datetime(2024, 1, 2),
+}
+
+
+def test_fast_dump_matches_the_validated_model():
+    assert fast_dump(Prison, PRISON) == Prison.model_validate(PRISON).model_dump(by_alias=True)
+
+
+def test_fast_dump_fills_defaults_and_drops_unknown_fields():
+    doc = {'_id': 'v', 'prison_id': 'gherla', 'name': 'n', 'profession': 'p', 'biography': 'b',
+           'imprisonment_period': {'start': '1950'}, 'search_name': 'x'}
+    out = fast_dump(Victim, doc)
+    assert 'search_name' not in out
+    assert out['testimonies'] == [] and out['birth_year'] is None
+    assert out['imprisonment_period'] == {'start': '1950', 'end': None}
+    assert isinstance(out['created_at'], datetime)
+
+
+def test_fast_dump_keeps_only_requested_keys():
+    assert fast_dump(Prison, PRISON, frozenset({'_id', 'name'})) == {'_id': 'gherla', 'name': 'Gherla'}
+
+
+def test_dumps_encodes_object_ids_and_datetimes():
+    oid = ObjectId()
+    assert orjson.loads(bytes(dumps({'_id': oid, 'at': datetime(1950, 1, 2)}))) == {'_id': str(oid), 'at': '1950-01-02T00:00:00'}
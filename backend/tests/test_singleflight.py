@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from cache import ResponseCache
+from singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    runs = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return 'result'
+
+    waiters = [asyncio.ensure_future(flight.do('key', load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ['result'] * 5
+    assert runs == 1
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 4}
+
+
+@pytest.mark.anyio
+async def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError('boom')
+
+    results = await asyncio.gather(*(flight.do('key', fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_does_not_cancel_the_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return 42
+
+    first = asyncio.ensure_future(flight.do('key', load))
+    second = asyncio.ensure_future(flight.do('key', load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 42
+
+
+@pytest.mark.anyio
+async def test_forget_starts_a_fresh_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = []
+
+    async def load():
+        runs.append(len(runs))
+        await release.wait()
+        return len(runs)
+
+    before = asyncio.ensure_future(flight.do('key', load, tags=('victims',)))
+    await asyncio.sleep(0)
+    flight.forget('victims')
+    after = asyncio.ensure_future(flight.do('key', load, tags=('victims',)))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(before, after)
+    assert len(runs) == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_cache_misses_run_the_handler_once():
+    cache = ResponseCache()
+    runs = []
+    app = FastAPI()
+
+    @app.get('/slow')
+    @cache.cached('items')
+    async def slow():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {'ok': True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        responses = await asyncio.gather(*(client.get('/slow') for _ in range(10)))
+    assert all(r.json() == {'ok': True} for r in responses)
+    assert runs == [1]
+    assert cache.flight.stats()['coalesced'] == 9
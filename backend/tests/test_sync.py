@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import encode_token
+from sync import SYNC_COLLECTIONS, build_bundle, to_naive_utc
+
+EPOCH = datetime(2024, 1, 1)
+
+
+async def _all_batches(db, since, limit):
+    batches, cursor = [], None
+    while True:
+        bundle = await build_bundle(db, since, cursor, limit)
+        batches.append(bundle)
+        if not bundle['has_more']:
+            return batches
+        cursor = bundle['cursor']
+
+
+@pytest.fixture
+async def stocked(db):
+    # Several rows per timestamp, so paging has to break ties on _id
+    await db.victims.insert_many(
+        [{'_id': f'v{i:02d}', 'updated_at': EPOCH + timedelta(seconds=i // 3)} for i in range(7)]
+    )
+    await db.prisons.insert_one({'_id': 'gherla', 'updated_at': EPOCH})
+    return db
+
+
+def test_to_naive_utc():
+    aware = datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+    assert to_naive_utc(aware) == datetime(2024, 1, 1, 10)
+    assert to_naive_utc(EPOCH) is EPOCH
+
+
+@pytest.mark.anyio
+async def test_snapshot_pages_every_row_exactly_once(stocked):
+    batches = await _all_batches(stocked, None, 2)
+    victims = [doc['_id'] for batch in batches for doc in batch['changes']['victims']]
+    assert victims == [f'v{i:02d}' for i in range(7)]
+    assert [doc['_id'] for batch in batches for doc in batch['changes']['prisons']] == ['gherla']
+    assert all(batch['snapshot'] for batch in batches)
+    assert batches[-1]['cursor'] is None
+    assert set(batches[0]['changes']) == set(SYNC_COLLECTIONS)
+
+
+@pytest.mark.anyio
+async def test_since_returns_only_later_changes(stocked):
+    bundle = await build_bundle(stocked, EPOCH + timedelta(seconds=2), None, 100)
+    assert not bundle['snapshot'] and not bundle['has_more']
+    assert [doc['_id'] for doc in bundle['changes']['victims']] == ['v06']
+    assert bundle['changes']['prisons'] == []
+
+
+@pytest.mark.anyio
+async def test_high_water_mark_trails_now_but_never_since(db):
+    future = datetime.utcnow() + timedelta(hours=1)
+    assert (await build_bundle(db, future, None, 10))['high_water_mark'] == future
+    assert (await build_bundle(db, None, None, 10))['high_water_mark'] < datetime.utcnow()
+
+
+def _state(**fields):
+    return {'since': None, 'high_water_mark': EPOCH, 'after': {}, **fields}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('state', [
+    ['v01'],
+    {'since': None, 'after': {}},
+    _state(after=[]),
+    _state(after={'victims': 7}),
+    _state(after={'victims': 'v01'}),
+    _state(after={'victims': [EPOCH, {'$ne': None}]}),
+    _state(after={'users': True}),
+    _state(since='yesterday'),
+    _state(high_water_mark=None),
+])
+async def test_malformed_cursor_is_a_400(db, state):
+    with pytest.raises(HTTPException) as e:
+        await build_bundle(db, None, encode_token(state), 10)
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize('after', [[], {'victims': 7}])
+def test_malformed_cursor_is_a_400_from_the_api(api, after):
+    cursor = encode_token(_state(after=after))
+    assert api.get(f'/api/sync?cursor={cursor}').status_code == 400
+
+
+def test_non_positive_limit_is_rejected(api):
+    assert api.get('/api/sync?limit=0').status_code == 422
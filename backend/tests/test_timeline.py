@@ -0,0 +1,59 @@
+import pytest
+
+from timeline import parse_date_range, rebuild_timeline, with_date_range, year_range_filter
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1945', (19450101, 19451231)),
+    ('1949-06', (19490601, 19490631)),
+    ('1949-06-01', (19490601, 19490601)),
+    ('1948-1964', (19480101, 19641231)),
+    ('1948 – 1964', (19480101, 19641231)),
+    ('1964-1948', (19480101, 19641231)),
+    ('1950-03-15 to 1951', (19500315, 19511231)),
+    ('1959 până în 1962', (19590101, 19621231)),
+    ('1950s', (19500101, 19591231)),
+    ('c. 1952', (19520101, 19521231)),
+    ('Winter of 1950, released 1953', (19500101, 19531231)),
+    ('unknown', (None, None)),
+    ('', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_date_range(value, expected):
+    assert parse_date_range(value) == expected
+
+
+def test_with_date_range_sets_both_bounds():
+    assert with_date_range({'date': '1950s'}) == {'date': '1950s', 'date_start': 19500101, 'date_end': 19591231}
+
+
+def test_year_range_filter_matches_overlapping_periods():
+    assert year_range_filter() == {}
+    assert year_range_filter(1950, 1955) == {'date_end': {'$gte': 19500101}, 'date_start': {'$lte': 19551231}}
+
+
+@pytest.mark.anyio
+async def test_rebuild_merges_events_and_prison_timelines(db):
+    await db.historical_events.insert_many([
+        with_date_range({'_id': 'e1', 'date': '1947', 'title': 'Abdication', 'related_prisons': ['gherla']}),
+        with_date_range({'_id': 'e2', 'date': 'unknown', 'title': 'Undated'}),
+    ])
+    await db.prisons.insert_one({'_id': 'gherla', 'history_timeline': [{'date': '1950s', 'title': 'Reeducation'}]})
+    await db.timeline.insert_one({'_id': 'event:deleted', 'date_start': 19000101})
+    await rebuild_timeline(db)
+
+    entries = await db.timeline.find({}).sort([('date_start', 1), ('_id', 1)]).to_list(None)
+    assert [entry['_id'] for entry in entries] == ['event:e2', 'event:e1', 'prison:gherla:0']
+    assert entries[1]['prison_ids'] == ['gherla']
+    assert (entries[2]['date_start'], entries[2]['date_end']) == (19500101, 19591231)
+
+
+@pytest.mark.anyio
+async def test_year_range_filter_selects_overlapping_entries(db):
+    await db.timeline.insert_many([
+        {'_id': 'war', **dict(zip(('date_start', 'date_end'), parse_date_range('1941-1945')))},
+        {'_id': 'camps', **dict(zip(('date_start', 'date_end'), parse_date_range('1949-1964')))},
+        {'_id': 'revolution', **dict(zip(('date_start', 'date_end'), parse_date_range('1989')))},
+    ])
+    found = await db.timeline.find(year_range_filter(1945, 1950)).sort('_id').to_list(None)
+    assert [entry['_id'] for entry in found] == ['camps', 'war']
@@ -0,0 +1,79 @@
+import math
+import random
+
+import pytest
+
+import server
+from tours import EARTH_RADIUS, TrackIndex, haversine
+
+
+def _prison(prison_id, points):
+    return {'_id': prison_id, 'audio_tour_tracks': [
+        {'id': f'{prison_id}-{i}', 'title': f'Stop {i}', 'duration': 60, 'audio_url': f'/media/{i}.mp3', 'location': {'latitude': lat, 'longitude': lng}}
+        for i, (lat, lng) in enumerate(points)
+    ]}
+
+
+def test_near_matches_brute_force():
+    rng = random.Random(7)
+    index = TrackIndex()
+    points = [(47.02 + rng.uniform(-0.005, 0.005), 23.90 + rng.uniform(-0.005, 0.005)) for _ in range(300)]
+    index.put_prison(_prison('gherla', points))
+    for _ in range(50):
+        lat, lng = 47.02 + rng.uniform(-0.005, 0.005), 23.90 + rng.uniform(-0.005, 0.005)
+        radius = rng.uniform(5, 120)
+        expected = sorted(i for i, p in enumerate(points) if haversine(lat, lng, *p) <= radius)
+        found = sorted(int(point.track_id.rsplit('-', 1)[1]) for _, point in index.near(lat, lng, radius))
+        assert found == expected
+
+
+@pytest.mark.parametrize('degrees', [60.0, 80.0, -80.0])
+def test_neighbour_cells_span_the_radius_at_high_latitudes(degrees):
+    index = TrackIndex()
+    # Query at the poleward, western corner of its cell, where cells are narrowest
+    row = math.floor(degrees / index._lat_step)
+    lat = (row + 1) * index._lat_step - 1e-9 if degrees > 0 else row * index._lat_step + 1e-9
+    lng = 100 * index._lng_step(row) + 1e-9
+    # A track due west, just inside one cell's width
+    west = lng - math.degrees(49.9999 / (EARTH_RADIUS * math.cos(math.radians(lat))))
+    index.put_prison(_prison('north', [(lat, west)]))
+    assert haversine(lat, lng, lat, west) <= index.cell_size
+    assert len(index.near(lat, lng, index.cell_size)) == 1
+
+
+def test_locate_skips_played_and_prefers_tracks_ahead():
+    index = TrackIndex()
+    # One stop 20 m north, one 15 m south
+    index.put_prison(_prison('gherla', [(47.00018, 23.9), (46.999865, 23.9)]))
+    assert index.locate(47.0, 23.9, 30)[1].track_id == 'gherla-1'
+    assert index.locate(47.0, 23.9, 30, heading=0)[1].track_id == 'gherla-0'
+    assert index.locate(47.0, 23.9, 30, played=['gherla-1'])[1].track_id == 'gherla-0'
+    assert index.locate(47.0, 23.9, 30, played=['gherla-0', 'gherla-1']) is None
+    assert index.locate(47.0, 23.9, 30, prison_id='aiud') is None
+
+
+def test_reindexing_a_prison_replaces_its_tracks():
+    index = TrackIndex()
+    index.put_prison(_prison('gherla', [(47.0, 23.9), (47.001, 23.9)]))
+    index.put_prison(_prison('gherla', [(47.0, 23.9)]))
+    assert len(index) == 1
+    index.remove_prison('gherla')
+    assert len(index) == 0 and index.near(47.0, 23.9, 100) == []
+
+
+@pytest.mark.anyio
+async def test_load_reads_located_tracks(db):
+    await db.prisons.insert_many([_prison('gherla', [(47.0, 23.9)]), {'_id': 'aiud', 'audio_tour_tracks': []}])
+    index = TrackIndex()
+    await index.load(db)
+    assert len(index) == 1
+
+
+def test_locate_route(api):
+    server.track_index.put_prison(_prison('gherla', [(47.00018, 23.9)]))
+    try:
+        match = api.get('/api/tours/locate?lat=47&lng=23.9').json()['match']
+        assert match['track']['id'] == 'gherla-0' and match['prison_id'] == 'gherla'
+        assert api.get('/api/tours/locate?lat=47&lng=23.9&played=gherla-0').json() == {'match': None}
+    finally:
+        server.track_index.remove_prison('gherla')
@@ -0,0 +1,152 @@
+"""
+Normalized timeline dates and the merged, materialized timeline.
+
+Timeline dates are free-form strings ("1945", "1948-1964", "1949-06-01",
+"1950s"). When a historical event or a prison's `history_timeline` entry is
+written, the string is parsed into `date_start` / `date_end`: YYYYMMDD
+integers covering the whole period, so events sort chronologically and year
+ranges become index range scans.
+
+The `timeline` collection materializes every global historical event together
+with every prison's `history_timeline` entry in one chronological, indexed
+collection. It is rebuilt at startup and kept current by the write routes.
+"""
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+_DAY = r'(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?'
+_RANGE = re.compile(rf'^{_DAY}\s*(?:[-–—/]|\s+to\s+|\s+până\s+în\s+)\s*{_DAY}$', re.IGNORECASE)
+_SINGLE = re.compile(rf'^{_DAY}$')
+_DECADE = re.compile(r'^(\d{3})0s$')
+_YEAR = re.compile(r'\d{4}')
+
+
+def _bound(year: str, month: Optional[str], day: Optional[str], end: bool) -> int:
+    month_value = int(month) if month else (12 if end else 1)
+    day_value = int(day) if day else (31 if end else 1)
+    return int(year) * 10000 + month_value * 100 + day_value
+
+
+def parse_date_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """(date_start, date_end) as YYYYMMDD integers, or (None, None) if unparseable"""
+    text = (value or '').strip().lower().removeprefix('c.').removeprefix('circa').strip()
+    match = _RANGE.match(text)
+    if match:
+        first, last = match.group(1, 2, 3), match.group(4, 5, 6)
+        if _bound(*first, end=False) > _bound(*last, end=False):
+            first, last = last, first
+        return _bound(*first, end=False), _bound(*last, end=True)
+    match = _SINGLE.match(text)
+    if match:
+        return _bound(*match.groups(), end=False), _bound(*match.groups(), end=True)
+    match = _DECADE.match(text)
+    if match:
+        return int(match.group(1)) * 100000 + 101, int(match.group(1)) * 100000 + 91231
+    # Fall back to the first and last four-digit years mentioned
+    years = _YEAR.findall(text)
+    if years:
+        return int(years[0]) * 10000 + 101, int(years[-1]) * 10000 + 1231
+    return None, None
+
+
+def with_date_range(entry: dict) -> dict:
+    """Set `date_start` / `date_end` on a dict with a `date` string"""
+    entry['date_start'], entry['date_end'] = parse_date_range(entry.get('date'))
+    return entry
+
+
+def year_range_filter(year_from: Optional[int] = None, year_to: Optional[int] = None) -> dict:
+    """Entries whose period overlaps [year_from, year_to]"""
+    query = {}
+    if year_from:
+        query['date_end'] = {'$gte': year_from * 10000 + 101}
+    if year_to:
+        query['date_start'] = {'$lte': year_to * 10000 + 1231}
+    return query
+
+
+def event_entry(event: dict) -> dict:
+    """Timeline entry for a global historical event"""
+    return {
+        '_id': f"event:{event['_id']}",
+        'source': 'historical_event',
+        'source_id': str(event['_id']),
+        'date': event.get('date'),
+        'date_start': event.get('date_start'),
+        'date_end': event.get('date_end'),
+        'title': event.get('title'),
+        'description': event.get('description'),
+        'category': event.get('category'),
+        'prison_ids': event.get('related_prisons') or [],
+        'images': event.get('images') or [],
+    }
+
+
+def prison_entries(prison: dict) -> List[dict]:
+    """Timeline entries for a prison's own `history_timeline`"""
+    entries = []
+    for index, item in enumerate(prison.get('history_timeline') or []):
+        start, end = item.get('date_start'), item.get('date_end')
+        if start is None and end is None:
+            start, end = parse_date_range(item.get('date'))
+        entries.append({
+            '_id': f"prison:{prison['_id']}:{index}",
+            'source': 'prison',
+            'source_id': str(prison['_id']),
+            'date': item.get('date'),
+            'date_start': start,
+            'date_end': end,
+            'title': item.get('title'),
+            'description': item.get('description'),
+            'category': None,
+            'prison_ids': [str(prison['_id'])],
+            'images': [item['image_url']] if item.get('image_url') else [],
+        })
+    return entries
+
+
+async def backfill_timeline_dates(db):
+    """Parse `date_start` / `date_end` for records stored before they existed"""
+    async for event in db.historical_events.find({'date_start': {'$exists': False}}, {'date': 1}):
+        start, end = parse_date_range(event.get('date'))
+        await db.historical_events.update_one(
+            {'_id': event['_id']}, {'$set': {'date_start': start, 'date_end': end}}
+        )
+    query = {'history_timeline': {'$elemMatch': {'date_start': {'$exists': False}}}}
+    async for prison in db.prisons.find(query, {'history_timeline': 1}):
+        timeline = [with_date_range(dict(item)) for item in prison['history_timeline']]
+        await db.prisons.update_one({'_id': prison['_id']}, {'$set': {'history_timeline': timeline}})
+
+
+async def sync_event(db, event: dict):
+    """Upsert the timeline entry of a newly written historical event"""
+    entry = event_entry(event)
+    await db.timeline.replace_one({'_id': entry['_id']}, entry, upsert=True)
+
+
+async def sync_prison(db, prison: dict):
+    """Replace the timeline entries of a newly written prison"""
+    entries = prison_entries(prison)
+    await db.timeline.delete_many({'source': 'prison', 'source_id': str(prison['_id'])})
+    if entries:
+        await db.timeline.insert_many(entries)
+
+
+async def rebuild_timeline(db):
+    """Rebuild the merged timeline from historical events and prisons"""
+    entries = [event_entry(event) async for event in db.historical_events.find({})]
+    async for prison in db.prisons.find({'history_timeline.0': {'$exists': True}}, {'history_timeline': 1}):
+        entries.extend(prison_entries(prison))
+
+    if entries:
+        await db.timeline.bulk_write(
+            [ReplaceOne({'_id': entry['_id']}, entry, upsert=True) for entry in entries], ordered=False
+        )
+    # Drop entries whose source was deleted or lost timeline items
+    await db.timeline.delete_many({'_id': {'$nin': [entry['_id'] for entry in entries]}})
+    logger.info(f"Rebuilt timeline with {len(entries)} entries")
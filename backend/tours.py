@@ -0,0 +1,180 @@
+"""
+Geofence index for location-triggered audio tour tracks.
+
+Every `AudioTrack` with a `location` in any prison's `audio_tour_tracks` is
+bucketed into a uniform grid of square cells, `CELL_SIZE` meters on a side.
+A position lookup only checks the tracks in the cells its radius overlaps,
+then measures those exactly, so it costs the same however many tracks the
+memorial sites add. Lookups are plain dictionary reads with no database
+round trip, which lets every visitor post their position every few seconds.
+
+The index is loaded at startup, replaced wholesale by a background refresh
+(a new index is built aside and swapped in), and patched immediately when a
+prison is written through the API.
+"""
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import AudioTrack
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS = 6371008.8  # meters
+CELL_SIZE = 50.0  # meters; close to the typical trigger radius
+
+# Tracks behind the visitor count as up to this many times farther away
+HEADING_PENALTY = 1.0
+
+
+class TrackPoint(NamedTuple):
+    prison_id: str
+    track_id: str
+    lat: float
+    lng: float
+    track: dict  # AudioTrack, shaped for encoding
+
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bearing(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Initial compass bearing from the first point to the second, in degrees"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_lambda = math.radians(lng2 - lng1)
+    y = math.sin(d_lambda) * math.cos(phi2)
+    x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lambda)
+    return math.degrees(math.atan2(y, x)) % 360
+
+
+class TrackIndex:
+    def __init__(self, cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size
+        # Latitude rows are a fixed height; each row's cells are at least cell_size wide
+        self._lat_step = math.degrees(cell_size / EARTH_RADIUS)
+        self._cells: Dict[Tuple[int, int], List[TrackPoint]] = defaultdict(list)
+        self._prisons: Dict[str, List[TrackPoint]] = {}
+        self.empty_body = dumps({'match': None})
+
+    def __len__(self):
+        return sum(len(points) for points in self._prisons.values())
+
+    def _lng_step(self, row: int) -> float:
+        # Sized at the row's poleward edge, where meridians are closest, so every cell
+        # is at least cell_size wide across its whole band and the neighbour ring
+        # in `near` always spans the radius
+        lat = max(abs(row), abs(row + 1)) * self._lat_step
+        return self._lat_step / max(math.cos(math.radians(min(lat, 89.0))), 1e-6)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        row = math.floor(lat / self._lat_step)
+        return row, math.floor(lng / self._lng_step(row))
+
+    def put_prison(self, prison: dict):
+        """Index (or reindex) the located tracks of one prison document"""
+        prison_id = str(prison['_id'])
+        self.remove_prison(prison_id)
+        points = []
+        for raw in prison.get('audio_tour_tracks') or []:
+            if not raw or not raw.get('location'):
+                continue
+            try:
+                track = AudioTrack.model_validate(raw)
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid audio track in {prison_id}: {e}")
+                continue
+            point = TrackPoint(prison_id, track.id, track.location.latitude, track.location.longitude, track.model_dump())
+            self._cells[self._cell(point.lat, point.lng)].append(point)
+            points.append(point)
+        if points:
+            self._prisons[prison_id] = points
+
+    def remove_prison(self, prison_id: str):
+        for point in self._prisons.pop(prison_id, ()):
+            cell = self._cell(point.lat, point.lng)
+            remaining = [p for p in self._cells[cell] if p is not point]
+            if remaining:
+                self._cells[cell] = remaining
+            else:
+                del self._cells[cell]
+
+    async def load(self, db):
+        """Replace the index with the tracks currently stored on prisons"""
+        index = TrackIndex(self.cell_size)
+        async for prison in db.prisons.find(
+            {'audio_tour_tracks.location': {'$type': 'object'}}, {'audio_tour_tracks': 1}
+        ):
+            index.put_prison(prison)
+        self.__dict__.update(index.__dict__)
+        logger.info(f"Indexed {len(self)} audio tour tracks")
+
+    async def run_refresher(self, db, interval: float):
+        """Reload every `interval` seconds to pick up writes made outside the API"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load(db)
+            except Exception as e:
+                logger.error(f"Audio track index refresh failed: {e}")
+
+    def near(self, lat: float, lng: float, radius: float, prison_id: Optional[str] = None) -> List[Tuple[float, TrackPoint]]:
+        """(distance, track) for every track within `radius` meters"""
+        rows = math.ceil(radius / self.cell_size)
+        center_row = math.floor(lat / self._lat_step)
+        found = []
+        for row in range(center_row - rows, center_row + rows + 1):
+            lng_step = self._lng_step(row)
+            center_col = math.floor(lng / lng_step)
+            for col in range(center_col - rows, center_col + rows + 1):
+                for point in self._cells.get((row, col), ()):
+                    if prison_id is not None and point.prison_id != prison_id:
+                        continue
+                    distance = haversine(lat, lng, point.lat, point.lng)
+                    if distance <= radius:
+                        found.append((distance, point))
+        return found
+
+    def locate(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        heading: Optional[float] = None,
+        played: Iterable[str] = (),
+        prison_id: Optional[str] = None,
+    ) -> Optional[Tuple[float, TrackPoint]]:
+        """The track to play at a position: the nearest one not played yet, favoring those ahead"""
+        candidates = self.near(lat, lng, radius, prison_id)
+        if not candidates:
+            return None
+        played = set(played)
+        unplayed = [c for c in candidates if c[1].track_id not in played]
+        if not unplayed:
+            return None
+
+        def score(candidate: Tuple[float, TrackPoint]) -> float:
+            distance, point = candidate
+            if heading is None:
+                return distance
+            off = abs((bearing(lat, lng, point.lat, point.lng) - heading + 180) % 360 - 180)
+            return distance * (1 + HEADING_PENALTY * off / 180)
+
+        return min(unplayed, key=score)
+
+    def body(self, match: Optional[Tuple[float, TrackPoint]]) -> bytes:
+        """Encoded locate response"""
+        if match is None:
+            return self.empty_body
+        distance, point = match
+        return dumps({'match': {'prison_id': point.prison_id, 'distance': round(distance, 1), 'track': point.track}})
@@ -110,7 +110,7 @@ export default function DocumentsScreen() {
             label={getTypeLabel(item.document_type)}
             variant="default"
           />
-          {item.transcription && (
+          {item.has_transcription && (
             <View style={styles.transcriptionTag}>
               <Ionicons name="text" size={14} color={Colors.successGreen} />
               <Text style={styles.transcriptionText}>Transcris</Text>
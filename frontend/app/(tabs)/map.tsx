@@ -25,6 +25,9 @@ import { fetchPrisons } from '../../src/services/api';
 import { Prison } from '../../src/types';
 import { calculateDistance, formatDistance } from '../../src/utils/helpers';
 
+// The selected-prison panel also shows visit info, which the summary omits
+const MAP_FIELDS = 'name,type,coordinates,description,operational_years,estimated_victims,images,visit_info';
+
 // Import MapView only for native platforms
 let MapView: any = null;
 let Marker: any = null;
@@ -68,7 +71,7 @@ export default function MapScreen() {
 
   const loadPrisons = async () => {
     try {
-      const data = await fetchPrisons();
+      const data = await fetchPrisons(MAP_FIELDS);
       setPrisons(data);
     } catch (error) {
       console.error('Failed to load prisons:', error);
@@ -88,7 +88,7 @@ export default function VictimsScreen() {
         </View>
 
         <Text style={styles.victimBio} numberOfLines={2}>
-          {item.biography}
+          {item.biography_excerpt ?? item.biography}
         </Text>
 
         <View style={styles.victimFooter}>
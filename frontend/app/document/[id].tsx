@@ -33,7 +33,7 @@ export default function DocumentDetailScreen() {
   const loadDocument = async () => {
     try {
       // Since we don't have a fetchDocumentById, we fetch all and filter
-      const docs = await fetchDocuments();
+      const docs = await fetchDocuments({ fields: 'all' });
       const foundDoc = docs.find(d => (d.id || d._id) === id);
       setDocument(foundDoc || null);
     } catch (error) {
@@ -17,7 +17,7 @@ import Layout from '../../src/constants/layout';
 import Card from '../../src/components/ui/Card';
 import Badge from '../../src/components/ui/Badge';
 import Button from '../../src/components/ui/Button';
-import { fetchPrisonById, fetchVictims, fetchTestimonies } from '../../src/services/api';
+import { fetchPrisonFull } from '../../src/services/api';
 import { Prison, Victim, Testimony } from '../../src/types';
 
 const { width } = Dimensions.get('window');
@@ -37,14 +37,10 @@ export default function PrisonDetailScreen() {
 
   const loadPrisonData = async () => {
     try {
-      const [prisonData, victimsData, testimoniesData] = await Promise.all([
-        fetchPrisonById(id),
-        fetchVictims(id),
-        fetchTestimonies(id),
-      ]);
-      setPrison(prisonData);
-      setVictims(victimsData);
-      setTestimonies(testimoniesData);
+      const data = await fetchPrisonFull(id);
+      setPrison(data.prison);
+      setVictims(data.victims.items);
+      setTestimonies(data.testimonies.items);
     } catch (error) {
       console.error('Failed to load prison data:', error);
     } finally {
@@ -1,7 +1,7 @@
 // API Service for Memorial Gherla App
 import axios from 'axios';
 import Constants from 'expo-constants';
-import { Prison, Victim, Testimony, Document, HistoricalEvent, AppEvent } from '../types';
+import { Prison, Victim, Testimony, Document, HistoricalEvent, TimelineEntry, AppEvent, Page, PrisonDetail, BatchResult, TrackMatch } from '../types';
 
 const BACKEND_URL = process.env.EXPO_PUBLIC_BACKEND_URL || '';
 
@@ -14,9 +14,10 @@ const api = axios.create({
 });
 
 // Prisons
-export const fetchPrisons = async (): Promise<Prison[]> => {
-  const response = await api.get('/prisons');
-  return response.data;
+// List endpoints return a summary projection unless `fields` asks for more
+export const fetchPrisons = async (fields?: string): Promise<Prison[]> => {
+  const response = await api.get<Page<Prison>>('/prisons', { params: { fields } });
+  return response.data.items;
 };
 
 export const fetchPrisonById = async (id: string): Promise<Prison> => {
@@ -24,11 +25,16 @@ export const fetchPrisonById = async (id: string): Promise<Prison> => {
   return response.data;
 };
 
+export const fetchPrisonFull = async (id: string): Promise<PrisonDetail> => {
+  const response = await api.get<PrisonDetail>(`/prisons/${id}/full`);
+  return response.data;
+};
+
 // Victims
 export const fetchVictims = async (prisonId?: string): Promise<Victim[]> => {
   const url = prisonId ? `/victims?prison_id=${prisonId}` : '/victims';
-  const response = await api.get(url);
-  return response.data;
+  const response = await api.get<Page<Victim>>(url);
+  return response.data.items;
 };
 
 export const fetchVictimById = async (id: string): Promise<Victim> => {
@@ -36,11 +42,27 @@ export const fetchVictimById = async (id: string): Promise<Victim> => {
   return response.data;
 };
 
+// Batch lookups: one round trip for a list of cross-referenced ids
+export const fetchVictimsByIds = async (ids: string[]): Promise<BatchResult<Victim>> => {
+  const response = await api.post<BatchResult<Victim>>('/victims/batch', { ids });
+  return response.data;
+};
+
+export const fetchTestimoniesByIds = async (ids: string[]): Promise<BatchResult<Testimony>> => {
+  const response = await api.post<BatchResult<Testimony>>('/testimonies/batch', { ids });
+  return response.data;
+};
+
+export const fetchDocumentsByIds = async (ids: string[]): Promise<BatchResult<Document>> => {
+  const response = await api.post<BatchResult<Document>>('/documents/batch', { ids });
+  return response.data;
+};
+
 // Testimonies
 export const fetchTestimonies = async (prisonId?: string): Promise<Testimony[]> => {
   const url = prisonId ? `/testimonies?prison_id=${prisonId}` : '/testimonies';
-  const response = await api.get(url);
-  return response.data;
+  const response = await api.get<Page<Testimony>>(url);
+  return response.data.items;
 };
 
 // Documents
@@ -48,26 +70,65 @@ export const fetchDocuments = async (filters?: {
   type?: string;
   prisonId?: string;
   victimId?: string;
+  fields?: string;
 }): Promise<Document[]> => {
   const params = new URLSearchParams();
   if (filters?.type) params.append('type', filters.type);
   if (filters?.prisonId) params.append('prison_id', filters.prisonId);
   if (filters?.victimId) params.append('victim_id', filters.victimId);
+  if (filters?.fields) params.append('fields', filters.fields);
   
-  const response = await api.get(`/documents?${params.toString()}`);
-  return response.data;
+  const response = await api.get<Page<Document>>(`/documents?${params.toString()}`);
+  return response.data.items;
 };
 
 // Historical Events
 export const fetchHistoricalTimeline = async (): Promise<HistoricalEvent[]> => {
-  const response = await api.get('/historical-timeline');
-  return response.data;
+  const response = await api.get<Page<HistoricalEvent>>('/historical-timeline');
+  return response.data.items;
+};
+
+export const fetchTimeline = async (filters?: {
+  prisonId?: string;
+  yearFrom?: number;
+  yearTo?: number;
+}): Promise<TimelineEntry[]> => {
+  const params = new URLSearchParams();
+  if (filters?.prisonId) params.append('prison_id', filters.prisonId);
+  if (filters?.yearFrom) params.append('year_from', String(filters.yearFrom));
+  if (filters?.yearTo) params.append('year_to', String(filters.yearTo));
+
+  const response = await api.get<Page<TimelineEntry>>(`/timeline?${params.toString()}`);
+  return response.data.items;
 };
 
 // App Events
 export const fetchEvents = async (): Promise<AppEvent[]> => {
-  const response = await api.get('/events');
-  return response.data;
+  const response = await api.get<Page<AppEvent>>('/events');
+  return response.data.items;
+};
+
+// Audio Tours
+// Called on every position update while a tour is running
+export const locateTourTrack = async (position: {
+  latitude: number;
+  longitude: number;
+  heading?: number;
+  radius?: number;
+  played?: string[];
+  prisonId?: string;
+}): Promise<TrackMatch | null> => {
+  const response = await api.get<{ match: TrackMatch | null }>('/tours/locate', {
+    params: {
+      lat: position.latitude,
+      lng: position.longitude,
+      heading: position.heading,
+      radius: position.radius,
+      played: position.played?.length ? position.played.join(',') : undefined,
+      prison_id: position.prisonId,
+    },
+  });
+  return response.data.match;
 };
 
 // QR Code
@@ -36,6 +36,7 @@ export interface Victim {
   death_year?: number;
   profession: string;
   biography: string;
+  biography_excerpt?: string;
   photo_url?: string;
   testimonies: string[];
   imprisonment_period: {
@@ -49,6 +50,7 @@ export interface Testimony {
   prison_id?: string;
   victim_id?: string;
   text: string;
+  text_excerpt?: string;
   audio_url?: string;
   source: string;
   year: number;
@@ -61,6 +63,7 @@ export interface Document {
   document_type: DocumentType;
   scan_url: string;
   transcription?: string;
+  has_transcription?: boolean;
   prison_id?: string;
   victim_id?: string;
   year: number;
@@ -72,11 +75,15 @@ export interface TimelineEvent {
   title: string;
   description: string;
   image_url?: string;
+  date_start?: number;
+  date_end?: number;
 }
 
 export interface HistoricalEvent {
   _id: string;
   date: string;
+  date_start?: number;
+  date_end?: number;
   title: string;
   description: string;
   related_prisons: string[];
@@ -84,6 +91,20 @@ export interface HistoricalEvent {
   images: string[];
 }
 
+export interface TimelineEntry {
+  _id: string;
+  source: 'historical_event' | 'prison';
+  source_id: string;
+  date?: string;
+  date_start?: number;
+  date_end?: number;
+  title?: string;
+  description?: string;
+  category?: EventCategory;
+  prison_ids: string[];
+  images: string[];
+}
+
 export interface VisitInfo {
   address: string;
   schedule?: string;
@@ -105,6 +126,12 @@ export interface AudioTrack {
   location?: Coordinates;
 }
 
+export interface TrackMatch {
+  prison_id: string;
+  distance: number;
+  track: AudioTrack;
+}
+
 export interface QRLocation {
   _id: string;
   prison_id: string;
@@ -141,4 +168,22 @@ export interface Badge {
   icon: string;
   requirement: number;
   progress: number;
-}
\ No newline at end of file
+}
+
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+export interface BatchResult<T> {
+  items: T[];
+  missing: string[];
+}
+
+export interface PrisonDetail {
+  prison: Prison;
+  victims: Page<Victim>;
+  testimonies: Page<Testimony>;
+  documents: Page<Document>;
+  incomplete: string[];
+}